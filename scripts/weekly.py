@@ -16,6 +16,7 @@ from aiogram.enums import ParseMode
 from d_brain.config import get_settings
 from d_brain.services.git import VaultGit
 from d_brain.services.processor import ClaudeProcessor
+from d_brain.services.session import create_session_store
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,7 +28,9 @@ logger = logging.getLogger(__name__)
 async def main() -> None:
     """Generate weekly digest and send to Telegram."""
     settings = get_settings()
-    processor = ClaudeProcessor(settings.vault_path, settings.todoist_api_key)
+    processor = ClaudeProcessor(
+        settings.vault_path, session=create_session_store(settings)
+    )
     git = VaultGit(settings.vault_path)
 
     logger.info("Starting weekly digest generation...")
@@ -0,0 +1,75 @@
+"""Streaming downloads of Telegram files."""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import BinaryIO
+
+from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+# Total download timeout; large documents on a slow VPS uplink need more
+# than aiogram's 30 s default
+DOWNLOAD_TIMEOUT = 300
+
+
+async def get_file_path(bot: Bot, file_id: str) -> str | None:
+    """Resolve a Telegram file_id to its server-side file path."""
+    file = await bot.get_file(file_id)
+    return file.file_path
+
+
+def file_extension(file_path: str, default: str) -> str:
+    """Extension of a Telegram file path, without the dot."""
+    name = file_path.rsplit("/", 1)[-1]
+    if "." in name:
+        return name.rsplit(".", 1)[-1]
+    return default
+
+
+class _HashingWriter:
+    """Binary file wrapper that hashes everything written through it."""
+
+    def __init__(self, file: BinaryIO) -> None:
+        self._file = file
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+
+async def stream_to_file(bot: Bot, file_path: str, destination: Path) -> str:
+    """Stream a Telegram file to disk without holding it in memory.
+
+    The content is hashed while it is written, so callers can deduplicate
+    without reading the file back. A partial file is removed on failure.
+
+    Args:
+        bot: Bot instance
+        file_path: Telegram server-side file path
+        destination: File to write (e.g. VaultStorage.staging_path())
+
+    Returns:
+        SHA-256 hex digest of the content
+    """
+    try:
+        with destination.open("wb") as f:
+            writer = _HashingWriter(f)
+            await bot.download_file(
+                file_path,
+                destination=writer,  # type: ignore[arg-type]
+                timeout=DOWNLOAD_TIMEOUT,
+                seek=False,
+            )
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+
+    size = destination.stat().st_size
+    logger.info("Downloaded %s (%d bytes)", file_path, size)
+    return writer.sha256.hexdigest()
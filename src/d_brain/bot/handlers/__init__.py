@@ -5,6 +5,7 @@ from d_brain.bot.handlers import (
     callbacks,
     commands,
     do,
+    document,
     forward,
     photo,
     process,
@@ -18,6 +19,7 @@ __all__ = [
     "callbacks",
     "commands",
     "do",
+    "document",
     "forward",
     "photo",
     "process",
@@ -7,9 +7,9 @@ from aiogram.filters import Command
 from aiogram.types import Message
 
 from d_brain.bot.keyboards import get_main_keyboard
-from d_brain.config import get_settings
 from d_brain.services.session import SessionStore
-from d_brain.services.storage import VaultStorage
+from d_brain.services.session_sqlite import SQLiteSessionStore
+from d_brain.services.transcription_queue import TranscriptionScheduler
 
 router = Router(name="commands")
 
@@ -23,7 +23,8 @@ async def cmd_start(message: Message) -> None:
         "1️⃣ <b>Capture:</b> Отправляй мне голосовые, текст, фото\n"
         "🎤 Голосовые — автоматически транскрибирую\n"
         "💬 Текст — сохраню как есть\n"
-        "📷 Фото — архивирую\n\n"
+        "📷 Фото — архивирую\n"
+        "📎 Файлы — сохраняю во вложения\n\n"
         "2️⃣ <b>Organize:</b> Используй кнопки ниже для навигации\n"
         "📥 Inbox — необработанные записи\n"
         "✅ Next Actions — твои задачи\n"
@@ -67,51 +68,64 @@ async def cmd_help(message: Message) -> None:
 
 
 @router.message(Command("status"))
-async def cmd_status(message: Message) -> None:
+async def cmd_status(
+    message: Message,
+    session_store: SessionStore | SQLiteSessionStore,
+    transcription_scheduler: TranscriptionScheduler,
+) -> None:
     """Handle /status command."""
     user_id = message.from_user.id if message.from_user else 0
-    settings = get_settings()
-    storage = VaultStorage(settings.vault_path)
 
     # Log command
-    session = SessionStore(settings.vault_path)
-    session.append(user_id, "command", cmd="/status")
+    await session_store.append(user_id, "command", cmd="/status")
 
+    # Today's numbers come from the session counters, not the daily file
     today = date.today()
-    content = storage.read_daily(today)
+    counts = session_store.get_counts(user_id, today)
 
-    if not content:
+    voice_count = counts.get("voice", 0)
+    text_count = counts.get("text", 0)
+    photo_count = counts.get("photo", 0)
+    forward_count = counts.get("forward", 0)
+    document_count = counts.get("document", 0)
+
+    total = voice_count + text_count + photo_count + forward_count + document_count
+
+    if not total:
         await message.answer(
             f"📅 <b>{today}</b>\n\nЗаписей пока нет.",
             reply_markup=get_main_keyboard()
         )
         return
 
-    lines = content.strip().split("\n")
-    entries = [line for line in lines if line.startswith("## ")]
-
-    voice_count = sum(1 for e in entries if "[voice]" in e)
-    text_count = sum(1 for e in entries if "[text]" in e)
-    photo_count = sum(1 for e in entries if "[photo]" in e)
-    forward_count = sum(1 for e in entries if "[forward from:" in e)
-
-    total = len(entries)
-
     # Get weekly stats from session
     week_stats = ""
-    stats = session.get_stats(user_id, days=7)
+    stats = session_store.get_stats(user_id, days=7)
     if stats:
         week_stats = "\n\n<b>За 7 дней:</b>"
         for entry_type, count in sorted(stats.items()):
             week_stats += f"\n• {entry_type}: {count}"
 
+    # Transcription queue health (process-wide, all users)
+    queue_stats = ""
+    queue = transcription_scheduler.metrics()
+    if queue["queued"] or queue["running"] or queue["completed"] or queue["failed"]:
+        queue_stats = (
+            f"\n\n<b>Распознавание:</b> в очереди {queue['queued']:.0f}, "
+            f"в работе {queue['running']:.0f}, "
+            f"ожидание ~{queue['wait_avg_seconds']:.1f} с "
+            f"(макс {queue['wait_max_seconds']:.1f} с)"
+        )
+
     await message.answer(
         f"📅 <b>{today}</b>\n\n"
         f"Всего записей: <b>{total}</b>\n"
         f"- 🎤 Голосовых: {voice_count}\n"
         f"- 💬 Текстовых: {text_count}\n"
         f"- 📷 Фото: {photo_count}\n"
-        f"- ↩️ Пересланных: {forward_count}"
-        f"{week_stats}",
+        f"- ↩️ Пересланных: {forward_count}\n"
+        f"- 📎 Документов: {document_count}"
+        f"{week_stats}"
+        f"{queue_stats}",
         reply_markup=get_main_keyboard()
     )
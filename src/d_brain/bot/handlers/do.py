@@ -1,42 +1,71 @@
 """Handler for /do command - arbitrary Claude requests."""
 
-import asyncio
+import html
 import logging
+from typing import Any
 
 from aiogram import Bot, Router
 from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
+from d_brain.bot.progress import ThrottledEditor
 from d_brain.bot.states import DoCommandState
-from d_brain.config import get_settings
+from d_brain.bot.transcribe import VoiceDownloadError, transcribe_voice
 from d_brain.services.claude_api_processor import ClaudeAPIProcessor
-from d_brain.services.transcription import WhisperTranscriber
+from d_brain.services.transcript_cache import TranscriptCache
+from d_brain.services.transcription_queue import Priority, TranscriptionScheduler
 
 router = Router(name="do")
 logger = logging.getLogger(__name__)
 
+# Seconds between status message edits while the answer streams in
+PROGRESS_EDIT_INTERVAL = 1.0
+
+# "/do ! text" processes the entry even if the ledger has it
+FORCE_PREFIX = "!"
+
+
+def split_force(prompt: str) -> tuple[str, bool]:
+    """Strip a leading FORCE_PREFIX; returns the prompt and whether it was there."""
+    if prompt.startswith(FORCE_PREFIX):
+        return prompt.removeprefix(FORCE_PREFIX).lstrip(), True
+    return prompt, False
+
 
 @router.message(Command("do"))
-async def cmd_do(message: Message, command: CommandObject, state: FSMContext) -> None:
+async def cmd_do(
+    message: Message,
+    command: CommandObject,
+    state: FSMContext,
+    claude_processor: ClaudeAPIProcessor,
+) -> None:
     """Handle /do command."""
     user_id = message.from_user.id if message.from_user else 0
 
     # Check for inline text: /do move overdue tasks
     if command.args:
-        await process_request(message, command.args, user_id)
+        await process_request(message, command.args, user_id, claude_processor)
         return
 
     # Otherwise, wait for next message
     await state.set_state(DoCommandState.waiting_for_input)
     await message.answer(
         "🎯 <b>Что сделать?</b>\n\n"
-        "Отправь голосовое или текстовое сообщение с запросом."
+        "Отправь голосовое или текстовое сообщение с запросом.\n"
+        f"Начни текст с «{FORCE_PREFIX}», чтобы обработать запись повторно."
     )
 
 
 @router.message(DoCommandState.waiting_for_input)
-async def handle_do_input(message: Message, bot: Bot, state: FSMContext) -> None:
+async def handle_do_input(
+    message: Message,
+    bot: Bot,
+    state: FSMContext,
+    transcription_scheduler: TranscriptionScheduler,
+    transcript_cache: TranscriptCache | None,
+    claude_processor: ClaudeAPIProcessor,
+) -> None:
     """Handle voice/text input after /do command."""
     await state.clear()  # Clear state immediately
 
@@ -45,22 +74,18 @@ async def handle_do_input(message: Message, bot: Bot, state: FSMContext) -> None
     # Handle voice input
     if message.voice:
         await message.chat.do(action="typing")
-        settings = get_settings()
-        transcriber = WhisperTranscriber(settings.openai_api_key)
 
         try:
-            file = await bot.get_file(message.voice.file_id)
-            if not file.file_path:
-                await message.answer("❌ Не удалось скачать голосовое")
-                return
-
-            file_bytes = await bot.download_file(file.file_path)
-            if not file_bytes:
-                await message.answer("❌ Не удалось скачать голосовое")
-                return
-
-            audio_bytes = file_bytes.read()
-            prompt = await transcriber.transcribe(audio_bytes)
+            prompt = await transcribe_voice(
+                bot,
+                message,
+                transcription_scheduler,
+                transcript_cache,
+                priority=Priority.INTERACTIVE,
+            )
+        except VoiceDownloadError:
+            await message.answer("❌ Не удалось скачать голосовое")
+            return
         except Exception as e:
             logger.exception("Failed to transcribe voice for /do")
             await message.answer(f"❌ Не удалось транскрибировать: {e}")
@@ -82,33 +107,67 @@ async def handle_do_input(message: Message, bot: Bot, state: FSMContext) -> None
         return
 
     user_id = message.from_user.id if message.from_user else 0
-    await process_request(message, prompt, user_id)
-
+    await process_request(message, prompt, user_id, claude_processor)
+
+
+async def process_request(
+    message: Message,
+    prompt: str,
+    user_id: int,
+    processor: ClaudeAPIProcessor,
+) -> None:
+    """Process the user's request with Claude API and create tasks/notes.
+
+    The answer is streamed: the status message shows the type and title as
+    soon as Claude has written them, before the task or note is created.
+    A prompt starting with FORCE_PREFIX bypasses the processing ledger.
+    The processor is shared, so its usage and tier metrics cover all requests.
+    """
+    prompt, force = split_force(prompt)
+    if not prompt:
+        await message.answer("❌ Пустой запрос")
+        return
 
-async def process_request(message: Message, prompt: str, user_id: int = 0) -> None:
-    """Process the user's request with Claude API and create tasks/notes."""
     status_msg = await message.answer("⏳ Обрабатываю...")
-
-    settings = get_settings()
-    processor = ClaudeAPIProcessor(
-        settings.vault_path,
-        str(settings.google_credentials_path),
-    )
+    editor = ThrottledEditor(status_msg, interval=PROGRESS_EDIT_INTERVAL)
+
+    async def show_progress(fields: dict[str, Any]) -> None:
+        lines = []
+        if fields.get("type"):
+            lines.append(f"<b>{html.escape(str(fields['type']).upper())}</b>")
+        if fields.get("title"):
+            lines.append(f"<b>{html.escape(str(fields['title']))}</b>")
+        # Partial answers carry only type and title; the full one has more
+        status = "Создаю..." if fields.keys() - {"type", "title"} else "Разбираю..."
+        lines.append(f"<i>{status}</i>")
+        await editor.update("⏳ " + "\n".join(lines))
 
     try:
-        result = await asyncio.to_thread(processor.process_entry, prompt, user_id)
+        result = await processor.process_entry_async(
+            prompt, user_id, force=force, on_progress=show_progress
+        )
 
-        # Format response for Telegram
+        # Format response for Telegram; titles and errors are not HTML
         if result.get("type") == "error":
-            response = f"❌ {result.get('status', 'Unknown error')}"
+            status = str(result.get("status", "Unknown error"))
+            response = f"❌ {html.escape(status)}"
         else:
+            item_type = str(result.get("type", "unknown")).upper()
+            title = str(result.get("title", "Untitled"))
+            status = str(result.get("status", "Processing..."))
             response = (
-                f"✓ <b>{result.get('type', 'unknown').upper()}</b>\n"
-                f"<b>{result.get('title', 'Untitled')}</b>\n"
-                f"<i>{result.get('status', 'Processing...')}</i>"
+                f"✓ <b>{html.escape(item_type)}</b>\n"
+                f"<b>{html.escape(title)}</b>\n"
+                f"<i>{html.escape(status)}</i>"
             )
-
-        await status_msg.edit_text(response)
+            if result.get("skipped"):
+                response += (
+                    "\n\nЧтобы создать заново: "
+                    f"/do {FORCE_PREFIX} {html.escape(prompt)}"
+                )
+
+        await editor.finish(response)
+        logger.debug("Tier metrics so far: %s", processor.tier_metrics())
     except Exception as e:
         logger.exception("Error processing request")
-        await status_msg.edit_text(f"❌ Ошибка: {e}")
+        await editor.finish(f"❌ Ошибка: {html.escape(str(e))}")
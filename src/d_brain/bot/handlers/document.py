@@ -0,0 +1,95 @@
+"""Document message handler."""
+
+import logging
+from datetime import datetime
+
+from aiogram import Bot, Router
+from aiogram.types import Message
+
+from d_brain.bot.files import file_extension, get_file_path, stream_to_file
+from d_brain.config import get_settings
+from d_brain.services.git import CommitScheduler
+from d_brain.services.session import SessionStore
+from d_brain.services.session_sqlite import SQLiteSessionStore
+from d_brain.services.storage import VaultStorage
+from d_brain.services.writer import VaultWriter
+
+router = Router(name="document")
+logger = logging.getLogger(__name__)
+
+
+@router.message(lambda m: m.document is not None)
+async def handle_document(
+    message: Message,
+    bot: Bot,
+    commit_scheduler: CommitScheduler,
+    vault_writer: VaultWriter,
+    session_store: SessionStore | SQLiteSessionStore,
+) -> None:
+    """Handle documents (files sent without compression)."""
+    if not message.document or not message.from_user:
+        return
+
+    settings = get_settings()
+    storage = VaultStorage(
+        settings.vault_path,
+        writer=vault_writer,
+        content_addressed=settings.attachment_store == "content",
+    )
+    document = message.document
+
+    try:
+        file_path = await get_file_path(bot, document.file_id)
+        if not file_path:
+            await message.answer("Failed to download document")
+            return
+
+        timestamp = datetime.fromtimestamp(message.date.timestamp())
+        filename = (
+            document.file_name
+            or f"doc-{timestamp:%H%M%S}.{file_extension(file_path, 'bin')}"
+        )
+
+        # Stream document straight into the vault and get relative path
+        staged = storage.staging_path()
+        sha256 = await stream_to_file(bot, file_path, staged)
+        stored = storage.store_attachment(
+            staged, timestamp.date(), filename, sha256
+        )
+
+        # Create content with Obsidian embed
+        content = stored.embed
+        if message.caption:
+            content += f"\n\n{message.caption}"
+
+        daily_saved = storage.append_to_daily(content, timestamp, "[document]")
+
+        # Log to session
+        session_saved = session_store.append(
+            message.from_user.id,
+            "document",
+            path=stored.path,
+            file_name=document.file_name,
+            mime_type=document.mime_type,
+            size=document.file_size,
+            caption=message.caption,
+            msg_id=message.message_id,
+        )
+
+        # Confirm only once both entries are durable
+        await daily_saved
+        await session_saved
+
+        # Commit & push happen in background
+        commit_scheduler.mark_dirty(
+            f"document entry {timestamp:%H:%M}",
+            storage.touched_paths
+            | session_store.take_touched_paths(message.from_user.id),
+        )
+
+        await message.answer("📎 ✓ Сохранено")
+        logger.info("Document saved: %s", stored.path)
+
+    except Exception as e:
+        logger.exception("Error processing document")
+        await message.answer(f"Error: {e}")
@@ -7,21 +7,29 @@ from aiogram import Router
 from aiogram.types import Message
 
 from d_brain.config import get_settings
+from d_brain.services.git import CommitScheduler
 from d_brain.services.session import SessionStore
+from d_brain.services.session_sqlite import SQLiteSessionStore
 from d_brain.services.storage import VaultStorage
+from d_brain.services.writer import VaultWriter
 
 router = Router(name="forward")
 logger = logging.getLogger(__name__)
 
 
 @router.message(lambda m: m.forward_origin is not None)
-async def handle_forward(message: Message) -> None:
+async def handle_forward(
+    message: Message,
+    commit_scheduler: CommitScheduler,
+    vault_writer: VaultWriter,
+    session_store: SessionStore | SQLiteSessionStore,
+) -> None:
     """Handle forwarded messages."""
     if not message.from_user:
         return
 
     settings = get_settings()
-    storage = VaultStorage(settings.vault_path)
+    storage = VaultStorage(settings.vault_path, writer=vault_writer)
 
     # Determine source name
     source_name = "Unknown"
@@ -42,11 +50,10 @@ async def handle_forward(message: Message) -> None:
     msg_type = f"[forward from: {source_name}]"
 
     timestamp = datetime.fromtimestamp(message.date.timestamp())
-    storage.append_to_daily(content, timestamp, msg_type)
+    daily_saved = storage.append_to_daily(content, timestamp, msg_type)
 
     # Log to session
-    session = SessionStore(settings.vault_path)
-    session.append(
+    session_saved = session_store.append(
         message.from_user.id,
         "forward",
         text=content,
@@ -54,5 +61,16 @@ async def handle_forward(message: Message) -> None:
         msg_id=message.message_id,
     )
 
+    # Confirm only once both entries are durable
+    await daily_saved
+    await session_saved
+
+    # Commit & push happen in background
+    commit_scheduler.mark_dirty(
+        f"forward entry {timestamp:%H:%M}",
+        storage.touched_paths
+        | session_store.take_touched_paths(message.from_user.id),
+    )
+
     await message.answer(f"✓ Сохранено (от {source_name})")
     logger.info("Forwarded message saved from: %s", source_name)
@@ -6,72 +6,85 @@ from datetime import datetime
 from aiogram import Bot, Router
 from aiogram.types import Message
 
+from d_brain.bot.files import file_extension, get_file_path, stream_to_file
 from d_brain.config import get_settings
+from d_brain.services.git import CommitScheduler
 from d_brain.services.session import SessionStore
+from d_brain.services.session_sqlite import SQLiteSessionStore
 from d_brain.services.storage import VaultStorage
+from d_brain.services.writer import VaultWriter
 
 router = Router(name="photo")
 logger = logging.getLogger(__name__)
 
 
 @router.message(lambda m: m.photo is not None)
-async def handle_photo(message: Message, bot: Bot) -> None:
+async def handle_photo(
+    message: Message,
+    bot: Bot,
+    commit_scheduler: CommitScheduler,
+    vault_writer: VaultWriter,
+    session_store: SessionStore | SQLiteSessionStore,
+) -> None:
     """Handle photo messages."""
     if not message.photo or not message.from_user:
         return
 
     settings = get_settings()
-    storage = VaultStorage(settings.vault_path)
+    storage = VaultStorage(
+        settings.vault_path,
+        writer=vault_writer,
+        content_addressed=settings.attachment_store == "content",
+    )
 
     # Get largest photo
     photo = message.photo[-1]
 
     try:
-        file = await bot.get_file(photo.file_id)
-        if not file.file_path:
-            await message.answer("Failed to download photo")
-            return
-
-        file_bytes = await bot.download_file(file.file_path)
-        if not file_bytes:
+        file_path = await get_file_path(bot, photo.file_id)
+        if not file_path:
             await message.answer("Failed to download photo")
             return
 
         timestamp = datetime.fromtimestamp(message.date.timestamp())
-        photo_bytes = file_bytes.read()
-
-        # Determine extension from file path
-        extension = "jpg"
-        if file.file_path and "." in file.file_path:
-            extension = file.file_path.rsplit(".", 1)[-1]
-
-        # Save photo and get relative path
-        relative_path = storage.save_attachment(
-            photo_bytes,
-            timestamp.date(),
-            timestamp,
-            extension,
+        extension = file_extension(file_path, "jpg")
+
+        # Stream photo straight into the vault and get relative path
+        staged = storage.staging_path()
+        sha256 = await stream_to_file(bot, file_path, staged)
+        stored = storage.store_attachment(
+            staged, timestamp.date(), f"img-{timestamp:%H%M%S}.{extension}", sha256
         )
 
         # Create content with Obsidian embed
-        content = f"![[{relative_path}]]"
+        content = stored.embed
         if message.caption:
             content += f"\n\n{message.caption}"
 
-        storage.append_to_daily(content, timestamp, "[photo]")
+        daily_saved = storage.append_to_daily(content, timestamp, "[photo]")
 
         # Log to session
-        session = SessionStore(settings.vault_path)
-        session.append(
+        session_saved = session_store.append(
             message.from_user.id,
             "photo",
-            path=relative_path,
+            path=stored.path,
             caption=message.caption,
             msg_id=message.message_id,
         )
 
+        # Confirm only once both entries are durable
+        await daily_saved
+        await session_saved
+
+        # Commit & push happen in background
+        commit_scheduler.mark_dirty(
+            f"photo entry {timestamp:%H:%M}",
+            storage.touched_paths
+            | session_store.take_touched_paths(message.from_user.id),
+        )
+
         await message.answer("📷 ✓ Сохранено")
-        logger.info("Photo saved: %s", relative_path)
+        logger.info("Photo saved: %s", stored.path)
 
     except Exception as e:
         logger.exception("Error processing photo")
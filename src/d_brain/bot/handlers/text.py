@@ -7,38 +7,51 @@ from aiogram import Router
 from aiogram.types import Message
 
 from d_brain.config import get_settings
-from d_brain.services.git import VaultGit
+from d_brain.services.git import CommitScheduler
 from d_brain.services.session import SessionStore
+from d_brain.services.session_sqlite import SQLiteSessionStore
 from d_brain.services.storage import VaultStorage
+from d_brain.services.writer import VaultWriter
 
 router = Router(name="text")
 logger = logging.getLogger(__name__)
 
 
 @router.message(lambda m: m.text is not None and not m.text.startswith("/"))
-async def handle_text(message: Message) -> None:
+async def handle_text(
+    message: Message,
+    commit_scheduler: CommitScheduler,
+    vault_writer: VaultWriter,
+    session_store: SessionStore | SQLiteSessionStore,
+) -> None:
     """Handle text messages (excluding commands)."""
     if not message.text or not message.from_user:
         return
 
     settings = get_settings()
-    storage = VaultStorage(settings.vault_path)
+    storage = VaultStorage(settings.vault_path, writer=vault_writer)
 
     timestamp = datetime.fromtimestamp(message.date.timestamp())
-    storage.append_to_daily(message.text, timestamp, "[text]")
+    daily_saved = storage.append_to_daily(message.text, timestamp, "[text]")
 
     # Log to session
-    session = SessionStore(settings.vault_path)
-    session.append(
+    session_saved = session_store.append(
         message.from_user.id,
         "text",
         text=message.text,
         msg_id=message.message_id,
     )
 
-    # Git commit & push
-    git = VaultGit(settings.vault_path)
-    git.commit_and_push(f"vault: text entry {timestamp:%H:%M}")
+    # Confirm only once both entries are durable
+    await daily_saved
+    await session_saved
+
+    # Commit & push happen in background
+    commit_scheduler.mark_dirty(
+        f"text entry {timestamp:%H:%M}",
+        storage.touched_paths
+        | session_store.take_touched_paths(message.from_user.id),
+    )
 
     await message.answer("✓ Сохранено")
     logger.info("Text message saved: %d chars", len(message.text))
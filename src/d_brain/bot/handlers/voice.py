@@ -6,18 +6,30 @@ from datetime import datetime
 from aiogram import Bot, Router
 from aiogram.types import Message
 
+from d_brain.bot.transcribe import VoiceDownloadError, transcribe_voice
 from d_brain.config import get_settings
-from d_brain.services.git import VaultGit
+from d_brain.services.git import CommitScheduler
 from d_brain.services.session import SessionStore
+from d_brain.services.session_sqlite import SQLiteSessionStore
 from d_brain.services.storage import VaultStorage
-from d_brain.services.transcription import WhisperTranscriber
+from d_brain.services.transcript_cache import TranscriptCache
+from d_brain.services.transcription_queue import TranscriptionScheduler
+from d_brain.services.writer import VaultWriter
 
 router = Router(name="voice")
 logger = logging.getLogger(__name__)
 
 
 @router.message(lambda m: m.voice is not None)
-async def handle_voice(message: Message, bot: Bot) -> None:
+async def handle_voice(
+    message: Message,
+    bot: Bot,
+    commit_scheduler: CommitScheduler,
+    vault_writer: VaultWriter,
+    session_store: SessionStore | SQLiteSessionStore,
+    transcription_scheduler: TranscriptionScheduler,
+    transcript_cache: TranscriptCache | None,
+) -> None:
     """Handle voice messages."""
     if not message.voice or not message.from_user:
         return
@@ -25,33 +37,22 @@ async def handle_voice(message: Message, bot: Bot) -> None:
     await message.chat.do(action="typing")
 
     settings = get_settings()
-    storage = VaultStorage(settings.vault_path)
-    transcriber = WhisperTranscriber(settings.openai_api_key)
+    storage = VaultStorage(settings.vault_path, writer=vault_writer)
 
     try:
-        file = await bot.get_file(message.voice.file_id)
-        if not file.file_path:
-            await message.answer("Failed to download voice message")
-            return
-
-        file_bytes = await bot.download_file(file.file_path)
-        if not file_bytes:
-            await message.answer("Failed to download voice message")
-            return
-
-        audio_bytes = file_bytes.read()
-        transcript = await transcriber.transcribe(audio_bytes)
+        transcript = await transcribe_voice(
+            bot, message, transcription_scheduler, transcript_cache
+        )
 
         if not transcript:
             await message.answer("Could not transcribe audio")
             return
 
         timestamp = datetime.fromtimestamp(message.date.timestamp())
-        storage.append_to_daily(transcript, timestamp, "[voice]")
+        daily_saved = storage.append_to_daily(transcript, timestamp, "[voice]")
 
         # Log to session
-        session = SessionStore(settings.vault_path)
-        session.append(
+        session_saved = session_store.append(
             message.from_user.id,
             "voice",
             text=transcript,
@@ -59,13 +60,22 @@ async def handle_voice(message: Message, bot: Bot) -> None:
             msg_id=message.message_id,
         )
 
-        # Git commit & push
-        git = VaultGit(settings.vault_path)
-        git.commit_and_push(f"vault: voice entry {timestamp:%H:%M}")
+        # Confirm only once both entries are durable
+        await daily_saved
+        await session_saved
+
+        # Commit & push happen in background
+        commit_scheduler.mark_dirty(
+            f"voice entry {timestamp:%H:%M}",
+            storage.touched_paths
+            | session_store.take_touched_paths(message.from_user.id),
+        )
 
         await message.answer(f"🎤 {transcript}\n\n✓ Сохранено")
         logger.info("Voice message saved: %d chars", len(transcript))
 
+    except VoiceDownloadError:
+        await message.answer("Failed to download voice message")
     except Exception as e:
         logger.exception("Error processing voice message")
         await message.answer(f"Error: {e}")
@@ -11,6 +11,16 @@ from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import Update
 
 from d_brain.config import Settings
+from d_brain.services.claude_api_processor import create_claude_api_processor
+from d_brain.services.claude_client import create_claude_client
+from d_brain.services.git import CommitScheduler, VaultGit
+from d_brain.services.google_clients import create_google_clients
+from d_brain.services.ledger import create_ledger
+from d_brain.services.session import create_session_store
+from d_brain.services.transcript_cache import TranscriptCache
+from d_brain.services.transcription import create_transcriber
+from d_brain.services.transcription_queue import TranscriptionScheduler
+from d_brain.services.writer import VaultWriter
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +35,7 @@ def create_bot(settings: Settings) -> Bot:
 
 def create_dispatcher() -> Dispatcher:
     """Create and configure the dispatcher with routers."""
-    from d_brain.bot.handlers import buttons, callbacks, commands, do, forward, photo, process, text, voice, weekly
+    from d_brain.bot.handlers import buttons, callbacks, commands, do, document, forward, photo, process, text, voice, weekly
 
     # Use memory storage for FSM (required for /do command state)
     dp = Dispatcher(storage=MemoryStorage())
@@ -39,6 +49,7 @@ def create_dispatcher() -> Dispatcher:
     dp.include_router(buttons.router)  # Reply keyboard buttons
     dp.include_router(voice.router)
     dp.include_router(photo.router)
+    dp.include_router(document.router)
     dp.include_router(forward.router)
     dp.include_router(text.router)  # Must be last (catch-all for text)
     return dp
@@ -89,8 +100,91 @@ async def run_bot(settings: Settings) -> None:
     # Always add auth middleware for security (it handles allow_all_users internally)
     dp.update.middleware(create_auth_middleware(settings))
 
+    # Daily notes and session appends are group-committed by one writer task
+    vault_writer = VaultWriter(
+        batch_window=settings.vault_write_batch_ms / 1000,
+        durability=settings.vault_write_durability,
+    )
+    dp["vault_writer"] = vault_writer
+    vault_writer.start()
+
+    # Handlers only mark the vault dirty; commits and pushes run in background
+    vault_git = VaultGit(settings.vault_path)
+    vault_git.configure_performance(fsmonitor=settings.git_fsmonitor)
+    commit_scheduler = CommitScheduler(
+        vault_git,
+        debounce=settings.git_commit_debounce_seconds,
+        max_latency=settings.git_commit_max_latency_seconds,
+        push_retries=settings.git_push_retries,
+        push_backoff=settings.git_push_backoff_seconds,
+        scoped_staging=settings.git_staging_mode == "paths",
+    )
+    dp["commit_scheduler"] = commit_scheduler
+    commit_scheduler.start()
+
+    # One session store per process; with SQLite this is one open connection
+    session_store = create_session_store(settings, writer=vault_writer)
+    dp["session_store"] = session_store
+
+    # One transcriber per process keeps API connections or the local model warm
+    transcriber = create_transcriber(settings)
+    await transcriber.start()
+
+    # Bounded, fair worker pool in front of the transcriber
+    transcription_scheduler = TranscriptionScheduler(
+        transcriber, workers=settings.transcription_workers
+    )
+    dp["transcription_scheduler"] = transcription_scheduler
+    transcription_scheduler.start()
+
+    # Repeated voice messages (forwards, capture then /do) skip transcription
+    transcript_cache = None
+    if settings.transcript_cache_entries > 0:
+        transcript_cache = TranscriptCache(
+            settings.transcript_cache_path,
+            max_entries=settings.transcript_cache_entries,
+        )
+    dp["transcript_cache"] = transcript_cache
+
+    # One Anthropic client per process, with a cap on concurrent requests
+    claude_client = create_claude_client(settings)
+    dp["claude_client"] = claude_client
+
+    # Entries already turned into tasks/notes are not classified or created again
+    processing_ledger = create_ledger(settings)
+    dp["processing_ledger"] = processing_ledger
+
+    # Google API clients are built once from offline discovery documents;
+    # the access token is renewed in the background before it expires (if
+    # credentials are configured)
+    google_clients = create_google_clients(settings)
+    dp["google_clients"] = google_clients
+    google_clients.start()
+
+    # One processor per process, so /do usage and tier metrics accumulate
+    claude_processor = create_claude_api_processor(
+        settings,
+        session=session_store,
+        async_client=claude_client,
+        ledger=processing_ledger,
+        google_clients=google_clients,
+    )
+    dp["claude_processor"] = claude_processor
+
     logger.info("Starting bot polling...")
     try:
         await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
     finally:
+        claude_processor.log_metrics()
+        await vault_writer.stop()
+        session_store.close()
+        await commit_scheduler.stop()
+        await transcription_scheduler.stop()
+        await transcriber.aclose()
+        await claude_client.aclose()
+        await google_clients.stop()
+        if transcript_cache is not None:
+            transcript_cache.close()
+        if processing_ledger is not None:
+            processing_ledger.close()
         await bot.session.close()
@@ -0,0 +1,77 @@
+"""Progressive status message updates within Telegram's edit limits."""
+
+import asyncio
+import contextlib
+import logging
+import time
+
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from aiogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottledEditor:
+    """Edits a message at most once per interval, always ending on the latest text.
+
+    update() only records the text and returns at once; a background task
+    applies it when the interval allows, so callers (e.g. a streaming
+    response) are never slowed down by Telegram.
+
+    Args:
+        message: Message to edit, usually a status message sent by the bot
+        interval: Minimum seconds between edits
+    """
+
+    def __init__(self, message: Message, interval: float = 1.0) -> None:
+        self.message = message
+        self.interval = interval
+        self._shown = message.text or ""
+        self._pending: str | None = None
+        self._last_edit = 0.0
+        self._flusher: asyncio.Task[None] | None = None
+
+    async def update(self, text: str) -> None:
+        """Show text soon; intermediate texts may be skipped."""
+        self._pending = text
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    async def finish(self, text: str) -> None:
+        """Show the final text now, dropping any pending update."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+        self._pending = None
+        await self._edit(text, final=True)
+
+    async def _flush_later(self) -> None:
+        # Texts that arrive during an edit are shown in the next slot
+        while self._pending is not None:
+            delay = self._last_edit + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            text, self._pending = self._pending, None
+            await self._edit(text)
+
+    async def _edit(self, text: str, final: bool = False) -> None:
+        if text == self._shown:
+            return
+        try:
+            await self.message.edit_text(text)
+        except TelegramRetryAfter as e:
+            if not final:
+                # Skip this one; a later update or finish() shows newer text
+                logger.debug("Edit throttled by Telegram for %s s", e.retry_after)
+                return
+            await asyncio.sleep(e.retry_after)
+            await self.message.edit_text(text)
+        except TelegramAPIError as e:
+            if final:
+                raise
+            logger.debug("Progress edit failed: %s", e)
+            return
+        finally:
+            self._last_edit = time.monotonic()
+        self._shown = text
@@ -0,0 +1,96 @@
+"""Voice message transcription shared by the capture and /do handlers."""
+
+import contextlib
+import logging
+import tempfile
+from pathlib import Path
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import Message
+
+from d_brain.bot.files import get_file_path, stream_to_file
+from d_brain.services.transcript_cache import TranscriptCache
+from d_brain.services.transcription_queue import Priority, TranscriptionScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceDownloadError(Exception):
+    """Raised when Telegram does not return a downloadable voice file."""
+
+
+async def transcribe_voice(
+    bot: Bot,
+    message: Message,
+    scheduler: TranscriptionScheduler,
+    cache: TranscriptCache | None = None,
+    priority: Priority = Priority.CAPTURE,
+) -> str:
+    """Transcribe a voice message, reusing a cached transcript if possible.
+
+    The cache is checked by file_unique_id before anything is downloaded,
+    and by audio hash before the job is queued. While the job waits behind
+    others, a status message shows its place in the queue.
+
+    Args:
+        bot: Bot instance
+        message: Message with a voice attachment
+        scheduler: Shared transcription scheduler
+        cache: Transcript cache, or None to always transcribe
+        priority: Queue priority
+
+    Returns:
+        Transcript (may be empty if nothing was recognized)
+
+    Raises:
+        VoiceDownloadError: If the file could not be resolved
+    """
+    assert message.voice is not None
+    voice = message.voice
+    user_id = message.from_user.id if message.from_user else 0
+
+    if cache is not None:
+        cached = cache.get(voice.file_unique_id)
+        if cached is not None:
+            logger.info("Transcript cache hit for %s", voice.file_unique_id)
+            return cached
+
+    file_path = await get_file_path(bot, voice.file_id)
+    if not file_path:
+        raise VoiceDownloadError(voice.file_id)
+
+    status_msg: Message | None = None
+
+    async def show_position(position: int) -> None:
+        nonlocal status_msg
+        text = f"⏳ В очереди на распознавание: {position + 1}"
+        with contextlib.suppress(TelegramAPIError):
+            if status_msg is None:
+                status_msg = await message.answer(text)
+            else:
+                await status_msg.edit_text(text)
+
+    # Stream to a temp file; the transcriber also reads it from disk
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audio_path = Path(tmp_dir) / "voice.ogg"
+        sha256 = await stream_to_file(bot, file_path, audio_path)
+
+        cached = cache.get_by_hash(sha256) if cache is not None else None
+        if cached is not None:
+            logger.info("Transcript cache hit for audio %s", sha256[:12])
+            transcript = cached
+        else:
+            try:
+                transcript = await scheduler.transcribe(
+                    user_id, audio_path, priority, on_position=show_position
+                )
+            finally:
+                if status_msg is not None:
+                    with contextlib.suppress(TelegramAPIError):
+                        await status_msg.delete()
+
+    # Empty transcripts are not cached: the next attempt may succeed
+    if cache is not None and transcript:
+        cache.put(voice.file_unique_id, sha256, transcript)
+    return transcript
@@ -1,8 +1,9 @@
 """Application configuration using Pydantic Settings."""
 
 from pathlib import Path
+from typing import Literal, Self
 
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -33,6 +34,174 @@ class Settings(BaseSettings):
         default=False,
         description="Whether to allow access to all users (security risk!)",
     )
+    git_commit_debounce_seconds: float = Field(
+        default=10.0,
+        description="Quiet period after the last vault change before committing",
+    )
+    git_commit_max_latency_seconds: float = Field(
+        default=60.0,
+        description="Maximum delay between the first pending change and its commit",
+    )
+    git_push_retries: int = Field(
+        default=5,
+        description="Number of push attempts before giving up until the next commit",
+    )
+    git_push_backoff_seconds: float = Field(
+        default=2.0,
+        description="Initial delay between push attempts (doubles each retry)",
+    )
+    git_staging_mode: Literal["paths", "all"] = Field(
+        default="paths",
+        description="Stage only files the bot wrote ('paths') "
+        "or run git add -A ('all')",
+    )
+    git_fsmonitor: bool = Field(
+        default=False,
+        description="Enable git's builtin fsmonitor daemon for the vault repo",
+    )
+    session_backend: Literal["jsonl", "sqlite"] = Field(
+        default="jsonl",
+        description="Session history backend: JSONL segments or SQLite database",
+    )
+    vault_write_batch_ms: float = Field(
+        default=5.0,
+        description="Window for grouping daily note and session appends into one write",
+    )
+    vault_write_durability: Literal["flush", "fsync"] = Field(
+        default="flush",
+        description="Per-batch durability: flush to the OS, or flush and fsync",
+    )
+    attachment_store: Literal["dated", "content"] = Field(
+        default="dated",
+        description="Store attachments by date, or deduplicated by content hash",
+    )
+    transcription_backend: Literal["openai", "local"] = Field(
+        default="openai",
+        description="Transcribe with the OpenAI Whisper API or a local CPU model",
+    )
+    transcription_workers: int = Field(
+        default=2,
+        description="Voice notes transcribed at once across all users",
+    )
+    local_whisper_model: str = Field(
+        default="small",
+        description="faster-whisper model directory, "
+        "or a model name in the local cache",
+    )
+    local_whisper_workers: int = Field(
+        default=1,
+        description="Worker processes for local transcription (one model copy each)",
+    )
+    local_whisper_cpu_threads: int = Field(
+        default=4,
+        description="Inference threads per local transcription worker",
+    )
+    local_whisper_compute_type: str = Field(
+        default="int8",
+        description="CTranslate2 compute type for the local model (int8, float32, ...)",
+    )
+    transcript_cache_entries: int = Field(
+        default=2000,
+        description="Voice transcripts kept in the cache (0 disables the cache)",
+    )
+    daily_batch_size: int = Field(
+        default=20,
+        description="Entries classified per Claude request by the daily processor",
+    )
+    claude_model: str = Field(
+        default="claude-opus-4-1-20250805",
+        description="Model for entries the fast model cannot settle",
+    )
+    claude_fast_model: str = Field(
+        default="claude-haiku-4-5",
+        description="Model tried first for classification (empty disables tiering)",
+    )
+    claude_escalation_confidence: float = Field(
+        default=0.7,
+        description="Fast-model answers below this self-reported confidence escalate",
+    )
+    quick_classify_threshold: float = Field(
+        default=0.8,
+        description="Rule-based classifications this confident skip Claude",
+    )
+    google_tasks_routing: Literal["single", "gtd"] = Field(
+        default="single",
+        description="Task lists: one Second Brain list, or GTD lists by type",
+    )
+    ledger_ttl_days: float = Field(
+        default=30,
+        description="Days a processed entry is remembered to skip duplicates",
+    )
+    ledger_max_entries: int = Field(
+        default=5000,
+        description="Processed entries remembered (0 disables the ledger)",
+    )
+    claude_max_concurrency: int = Field(
+        default=4,
+        description="Claude API requests in flight at once",
+    )
+    claude_max_retries: int = Field(
+        default=5,
+        description="Retries for rate-limited or overloaded Claude API requests",
+    )
+    whisper_base_url: str = Field(
+        default="https://api.openai.com/v1",
+        description="Base URL of the Whisper transcription API",
+    )
+    whisper_timeout_seconds: float = Field(
+        default=60.0,
+        description="Read/write timeout for a transcription request",
+    )
+    whisper_connect_timeout_seconds: float = Field(
+        default=10.0,
+        description="Timeout for opening a connection to the Whisper API",
+    )
+    whisper_max_connections: int = Field(
+        default=4,
+        description="Maximum pooled connections to the Whisper API",
+    )
+    whisper_keepalive_seconds: float = Field(
+        default=60.0,
+        description="How long idle Whisper API connections are kept open",
+    )
+    whisper_http2: bool = Field(
+        default=True,
+        description="Use HTTP/2 for the Whisper API when the h2 package is installed",
+    )
+    whisper_chunk_seconds: float = Field(
+        default=120.0,
+        description="Split longer voice notes at silences and transcribe chunks "
+        "concurrently (0 disables; needs ffmpeg)",
+    )
+    whisper_chunk_overlap_seconds: float = Field(
+        default=1.0,
+        description="Chunk overlap where no silence was found to cut at",
+    )
+    whisper_chunk_concurrency: int = Field(
+        default=4,
+        description="Maximum voice note chunks transcribed at once",
+    )
+    whisper_transcode_min_bytes: int = Field(
+        default=256 * 1024,
+        description="Re-encode voice notes at least this large to 16 kHz mono Opus "
+        "before transcription (0 disables; needs ffmpeg)",
+    )
+    whisper_transcode_bitrate: str = Field(
+        default="16k",
+        description="Opus bitrate for transcoded voice notes",
+    )
+
+    @model_validator(mode="after")
+    def check_chunk_overlap(self) -> Self:
+        """Keep chunk overlap below the shortest chunk plan_chunks makes."""
+        if self.whisper_chunk_seconds > 0 and not (
+            0 <= self.whisper_chunk_overlap_seconds < self.whisper_chunk_seconds / 4
+        ):
+            raise ValueError(
+                "whisper_chunk_overlap_seconds must be at least 0 and less than "
+                "a quarter of whisper_chunk_seconds"
+            )
+        return self
 
     @property
     def daily_path(self) -> Path:
@@ -49,6 +218,31 @@ class Settings(BaseSettings):
         """Path to thoughts directory."""
         return self.vault_path / "thoughts"
 
+    @property
+    def state_path(self) -> Path:
+        """Path to hidden, git-ignored state directory (caches, databases)."""
+        return self.vault_path / ".state"
+
+    @property
+    def session_db_path(self) -> Path:
+        """Path to SQLite session database."""
+        return self.state_path / "sessions.db"
+
+    @property
+    def transcript_cache_path(self) -> Path:
+        """Path to SQLite transcript cache."""
+        return self.state_path / "transcripts.db"
+
+    @property
+    def tasklist_cache_path(self) -> Path:
+        """Path to cached Google Tasks list IDs."""
+        return self.state_path / "tasklists.json"
+
+    @property
+    def ledger_path(self) -> Path:
+        """Path to SQLite ledger of processed entries."""
+        return self.state_path / "ledger.db"
+
 
 def get_settings() -> Settings:
     """Get application settings instance."""
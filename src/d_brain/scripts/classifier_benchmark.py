@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Measure the rule-based classifier against a labeled entry set.
+
+Usage:
+    python -m d_brain.scripts.classifier_benchmark
+    python -m d_brain.scripts.classifier_benchmark --threshold 0.7
+    python -m d_brain.scripts.classifier_benchmark --llm
+
+Reports how many entries the rules answer at the threshold, how accurate
+those answers are, and how long they take. With --llm every entry is also
+sent to Claude (needs ANTHROPIC_API_KEY and Google credentials in .env),
+which gives Claude's accuracy on the same set and the latency the fast path
+saves. Due dates are checked for the rules only: the labels are relative to
+BENCHMARK_DATE, while Claude resolves them against the real date.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from d_brain.config import Settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+)
+logger = logging.getLogger(__name__)
+
+DATASET = Path(__file__).with_name('classifier_benchmark.jsonl')
+
+# Wednesday; the "today" the due-date labels were written for
+BENCHMARK_DATE = date(2025, 1, 15)
+
+
+def load_dataset(path: Path) -> list[dict[str, Any]]:
+    """Labeled entries: text, type and, for tasks and waiting, due_date."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def bench_rules(
+    samples: list[dict[str, Any]], threshold: float
+) -> list[dict[str, Any] | None]:
+    """Classify every sample with the rules and log the report."""
+    from d_brain.services.quick_classifier import quick_classify
+
+    started = time.perf_counter()
+    results = [quick_classify(s['text'], today=BENCHMARK_DATE) for s in samples]
+    elapsed = time.perf_counter() - started
+
+    confident = [
+        (sample, result)
+        for sample, result in zip(samples, results, strict=True)
+        if result is not None and result['confidence'] >= threshold
+    ]
+    correct = sum(1 for sample, result in confident if result['type'] == sample['type'])
+    dated = [(s, r) for s, r in confident if 'due_date' in s and s['type'] == r['type']]
+    dates_ok = sum(1 for s, r in dated if r.get('due_date') == s['due_date'])
+
+    logger.info(f"Rules at threshold {threshold}:")
+    logger.info(
+        f"  Answered: {len(confident)}/{len(samples)} "
+        f"({len(confident) / len(samples):.0%})"
+    )
+    if confident:
+        logger.info(
+            f"  Type accuracy: {correct}/{len(confident)} "
+            f"({correct / len(confident):.0%})"
+        )
+    if dated:
+        logger.info(f"  Due date accuracy: {dates_ok}/{len(dated)}")
+    logger.info(f"  Latency: {elapsed / len(samples) * 1e6:.0f} µs per entry")
+
+    for sample, result in confident:
+        if result['type'] != sample['type']:
+            logger.info(
+                f"  ✗ {sample['text'][:50]!r}: {result['type']} "
+                f"(expected {sample['type']}, confidence {result['confidence']})"
+            )
+    return [
+        result if result is not None and result['confidence'] >= threshold else None
+        for result in results
+    ]
+
+
+async def bench_llm(
+    settings: "Settings",
+    samples: list[dict[str, Any]],
+    quick: list[dict[str, Any] | None],
+) -> None:
+    """Classify every sample with Claude and log accuracy and time saved."""
+    from d_brain.services.claude_api_processor import ClaudeAPIProcessor
+    from d_brain.services.claude_client import create_claude_client
+
+    claude_client = create_claude_client(settings)
+    processor = ClaudeAPIProcessor(
+        settings.vault_path,
+        str(settings.google_credentials_path),
+        async_client=claude_client,
+        quick_threshold=float('inf'),  # always ask Claude
+    )
+
+    async def timed(text: str) -> tuple[dict[str, Any] | None, float]:
+        started = time.perf_counter()
+        try:
+            result = await processor.classify_async(text)
+        except Exception as e:
+            logger.error(f"  ✗ {text[:50]!r}: {e}")
+            result = None
+        return result, time.perf_counter() - started
+
+    try:
+        timings = await asyncio.gather(*(timed(s['text']) for s in samples))
+    finally:
+        await claude_client.aclose()
+
+    # quick is aligned with samples, so filter all three lists together
+    answered = [
+        (s, r, t, q)
+        for s, (r, t), q in zip(samples, timings, quick, strict=True)
+        if r is not None
+    ]
+    if not answered:
+        logger.error("Claude answered no entries")
+        return
+
+    correct = sum(1 for s, r, _, _ in answered if r.get('type') == s['type'])
+    latency = sum(t for _, _, t, _ in answered) / len(answered)
+    skipped = [(r, q) for _, r, _, q in answered if q is not None]
+    agree = sum(1 for r, q in skipped if r.get('type') == q['type'])
+
+    logger.info("Claude:")
+    logger.info(
+        f"  Type accuracy: {correct}/{len(answered)} ({correct / len(answered):.0%})"
+    )
+    logger.info(f"  Latency: {latency:.2f} s per entry")
+    logger.info(f"  Agrees with the rules on {agree}/{len(skipped)} fast-path entries")
+    logger.info(
+        f"  Fast path saves ~{latency * len(skipped):.1f} s of request time "
+        f"and {len(skipped)} of {len(samples)} requests"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dataset', type=Path, default=DATASET)
+    parser.add_argument(
+        '--threshold', type=float, help='Confidence threshold (default: from .env)'
+    )
+    parser.add_argument('--llm', action='store_true', help='Also ask Claude')
+    args = parser.parse_args(argv)
+
+    # Add src to path for imports
+    project_root = Path(__file__).parent.parent.parent.parent
+    sys.path.insert(0, str(project_root / 'src'))
+
+    from d_brain.config import Settings
+
+    settings = Settings(_env_file=project_root / '.env')  # type: ignore[call-arg]
+    threshold = args.threshold
+    if threshold is None:
+        threshold = settings.quick_classify_threshold
+
+    samples = load_dataset(args.dataset)
+    logger.info(f"Loaded {len(samples)} labeled entries from {args.dataset}")
+
+    quick = bench_rules(samples, threshold)
+    if args.llm:
+        asyncio.run(bench_llm(settings, samples, quick))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
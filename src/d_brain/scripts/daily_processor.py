@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Daily GTD processing script for VPS cron execution."""
 
+import argparse
 import asyncio
 import logging
 import sys
@@ -19,8 +20,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def main():
-    """Run daily GTD processing."""
+async def main(force: bool = False) -> dict[str, int] | None:
+    """Run daily GTD processing.
+
+    Args:
+        force: Process entries again even if the ledger says they are done
+    """
     today = date.today()
     logger.info("="*60)
     logger.info(f"Starting daily GTD processing for {today}")
@@ -32,31 +37,42 @@ async def main():
         src_path = project_root / 'src'
         sys.path.insert(0, str(src_path))
         
-        from d_brain.services.session import SessionStore
-        from d_brain.services.claude_api_processor import ClaudeAPIProcessor
+        from d_brain.services.session import create_session_store
+        from d_brain.services.claude_api_processor import (
+            create_claude_api_processor,
+        )
+        from d_brain.services.claude_client import create_claude_client
+        from d_brain.services.google_clients import create_google_clients
+        from d_brain.services.ledger import create_ledger
         from d_brain.config import Settings
         
         # Load settings
-        settings = Settings(_env_file=project_root / '.env')
+        settings = Settings(_env_file=project_root / '.env')  # type: ignore[call-arg]
         logger.info(f"✓ Settings loaded from {project_root / '.env'}")
         logger.info(f"  Vault path: {settings.vault_path}")
         logger.info(f"  Daily path: {settings.daily_path}")
         
         # Get today's entries
-        session = SessionStore(settings.vault_path)
+        session = create_session_store(settings)
         today_entries = session.get_today(0)  # user_id=0 for system processing
         
         if not today_entries:
             logger.info("No entries captured today")
             logger.info("="*60)
-            return
+            return None
         
         logger.info(f"Found {len(today_entries)} entries to process")
         
-        # Process each entry
-        processor = ClaudeAPIProcessor(
-            settings.vault_path,
-            str(settings.google_credentials_path)
+        # Process entries; batches run concurrently up to the client's limit
+        claude_client = create_claude_client(settings)
+        ledger = create_ledger(settings)
+        google_clients = create_google_clients(settings)
+        processor = create_claude_api_processor(
+            settings,
+            session=session,
+            async_client=claude_client,
+            ledger=ledger,
+            google_clients=google_clients,
         )
         
         results = {
@@ -65,38 +81,55 @@ async def main():
             'notes': 0,
             'waiting': 0,
             'someday': 0,
+            'skipped': 0,
             'errors': 0
         }
         
-        for i, entry in enumerate(today_entries, 1):
-            text = entry.get('text', '').strip()
-            if not text:
-                continue
-            
-            logger.info(f"\n[{i}/{len(today_entries)}] Processing: {text[:50]}...")
-            
-            try:
-                result = processor.process_entry(text, user_id=0)
-                
-                # Track results
-                entry_type = result.get('type', 'unknown')
-                if entry_type == 'task':
-                    results['tasks'] += 1
-                elif entry_type == 'note':
-                    results['notes'] += 1
-                elif entry_type == 'waiting':
-                    results['waiting'] += 1
-                elif entry_type == 'someday':
-                    results['someday'] += 1
-                elif entry_type == 'error':
-                    results['errors'] += 1
-                
-                status = result.get('status', 'Unknown')
-                logger.info(f"  ✓ {entry_type.upper()}: {status}")
-                
-            except Exception as e:
-                logger.error(f"  ✗ Error: {e}")
+        texts = [entry.get('text', '').strip() for entry in today_entries]
+        texts = [text for text in texts if text]
+
+        # Classify in batches: a handful of requests instead of one per entry
+        logger.info(
+            f"Classifying {len(texts)} entries in batches of "
+            f"{settings.daily_batch_size}, "
+            f"{settings.claude_max_concurrency} requests at a time"
+        )
+        try:
+            # The Google token is kept fresh while tasks and notes are created
+            async with google_clients:
+                processed = await processor.process_entries_async(
+                    texts, user_id=0, batch_size=settings.daily_batch_size, force=force
+                )
+        except Exception as e:
+            logger.error(f"  ✗ Error: {e}")
+            processed = []
+            results['errors'] += len(texts)
+        finally:
+            await claude_client.aclose()
+            if ledger is not None:
+                ledger.close()
+
+        # processed is empty if classification failed as a whole
+        for i, (text, result) in enumerate(zip(texts, processed, strict=False), 1):
+            logger.info(f"\n[{i}/{len(texts)}] {text[:50]}...")
+
+            # Track results
+            entry_type = result.get('type', 'unknown')
+            if result.get('skipped'):
+                results['skipped'] += 1
+            elif entry_type == 'task':
+                results['tasks'] += 1
+            elif entry_type == 'note':
+                results['notes'] += 1
+            elif entry_type == 'waiting':
+                results['waiting'] += 1
+            elif entry_type == 'someday':
+                results['someday'] += 1
+            elif entry_type == 'error':
                 results['errors'] += 1
+
+            status = result.get('status', 'Unknown')
+            logger.info(f"  ✓ {entry_type.upper()}: {status}")
         
         # Log summary
         logger.info("\n" + "="*60)
@@ -106,7 +139,22 @@ async def main():
         logger.info(f"  Notes created: {results['notes']}")
         logger.info(f"  Waiting items: {results['waiting']}")
         logger.info(f"  Someday items: {results['someday']}")
+        logger.info(f"  Already processed: {results['skipped']}")
         logger.info(f"  Errors: {results['errors']}")
+        logger.info(f"  Classified locally: {processor.quick_hits}")
+        usage = processor.usage
+        logger.info(
+            f"  Claude tokens: {usage['input_tokens']} input, "
+            f"{usage['cache_read_input_tokens']} cache read, "
+            f"{usage['cache_creation_input_tokens']} cache write, "
+            f"{usage['output_tokens']} output"
+        )
+        for model, stats in processor.tier_metrics().items():
+            logger.info(
+                f"  {model}: {stats['requests']} requests, "
+                f"{stats['latency_avg_seconds']:.1f} s avg, "
+                f"{stats['escalation_rate']:.0%} escalated"
+            )
         logger.info("="*60)
         
         return results
@@ -117,8 +165,16 @@ async def main():
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reprocess entries the ledger already has (may create duplicates)',
+    )
+    args = parser.parse_args()
+
     try:
-        asyncio.run(main())
+        asyncio.run(main(force=args.force))
     except KeyboardInterrupt:
         logger.info("Processing interrupted by user")
         sys.exit(1)
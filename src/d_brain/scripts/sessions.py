@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Session store maintenance commands.
+
+Usage:
+    python -m d_brain.scripts.sessions migrate
+    python -m d_brain.scripts.sessions reindex
+    python -m d_brain.scripts.sessions import-sqlite
+    python -m d_brain.scripts.sessions export-jsonl
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from d_brain.config import Settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+)
+logger = logging.getLogger(__name__)
+
+
+def cmd_migrate(settings: "Settings") -> int:
+    """Split legacy per-user JSONL files into daily segments."""
+    from d_brain.services.session import SessionStore
+
+    session = SessionStore(settings.vault_path)
+    migrated = session.migrate_all()
+    if not migrated:
+        logger.info("No legacy session files found")
+    for user_id, count in migrated.items():
+        logger.info("  user %s: %d entries", user_id, count)
+    return 0
+
+
+def cmd_reindex(settings: "Settings") -> int:
+    """Rebuild segment indexes and usage counters from the raw JSONL."""
+    from d_brain.services.session import SessionStore
+
+    session = SessionStore(settings.vault_path)
+    session.migrate_all()
+    for user_dir in sorted(session.sessions_dir.iterdir()):
+        if user_dir.is_dir() and user_dir.name.lstrip('-').isdigit():
+            index = session.reindex(int(user_dir.name))
+            total = sum(segment['count'] for segment in index.values())
+            logger.info(f"  user {user_dir.name}: {len(index)} days, {total} entries")
+    return 0
+
+
+def cmd_import_sqlite(settings: "Settings") -> int:
+    """Load JSONL session history into the SQLite backend."""
+    from d_brain.services.session import SessionStore
+    from d_brain.services.session_sqlite import SQLiteSessionStore
+
+    db = SQLiteSessionStore(settings.session_db_path)
+    try:
+        imported = db.import_jsonl(SessionStore(settings.vault_path))
+    finally:
+        db.close()
+    logger.info(f"Imported {sum(imported.values())} entries into {db.db_path}")
+    return 0
+
+
+def cmd_export_jsonl(settings: "Settings") -> int:
+    """Write SQLite session history back to JSONL segments."""
+    from d_brain.services.session import SessionStore
+    from d_brain.services.session_sqlite import SQLiteSessionStore
+
+    db = SQLiteSessionStore(settings.session_db_path)
+    try:
+        exported = db.export_jsonl(SessionStore(settings.vault_path))
+    finally:
+        db.close()
+    logger.info(f"Exported {sum(exported.values())} entries from {db.db_path}")
+    return 0
+
+
+COMMANDS = {
+    'migrate': cmd_migrate,
+    'reindex': cmd_reindex,
+    'import-sqlite': cmd_import_sqlite,
+    'export-jsonl': cmd_export_jsonl,
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+
+    # Add src to path for imports
+    project_root = Path(__file__).parent.parent.parent.parent
+    sys.path.insert(0, str(project_root / 'src'))
+
+    from d_brain.config import Settings
+
+    settings = Settings(_env_file=project_root / '.env')  # type: ignore[call-arg]
+    logger.info(f"Vault path: {settings.vault_path}")
+    return COMMANDS[args.command](settings)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Audio helpers built on ffmpeg: probing, silence detection and splitting."""
+
+import asyncio
+import logging
+import re
+import shutil
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_SILENCE_START = re.compile(r"silence_start: (-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end: (-?[\d.]+)")
+_WORD = re.compile(r"\w+")
+
+
+class AudioToolError(RuntimeError):
+    """Raised when ffmpeg or ffprobe fails."""
+
+
+def ffmpeg_available() -> bool:
+    """Whether ffmpeg and ffprobe are on PATH."""
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+async def _run(*args: str) -> tuple[str, str]:
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise AudioToolError(
+            f"{args[0]} exited with {process.returncode}: "
+            f"{stderr.decode(errors='replace')[-500:]}"
+        )
+    return stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+async def probe_duration(path: Path) -> float:
+    """Duration of an audio file in seconds."""
+    stdout, _ = await _run(
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        str(path),
+    )  # fmt: skip
+    return float(stdout.strip())
+
+
+async def detect_silences(
+    path: Path,
+    noise_db: float = -35.0,
+    min_silence: float = 0.4,
+) -> list[tuple[float, float]]:
+    """Find silent stretches with ffmpeg's silencedetect filter.
+
+    Args:
+        path: Audio file
+        noise_db: Level below which audio counts as silence
+        min_silence: Minimum silence length in seconds
+
+    Returns:
+        List of (start, end) pairs in seconds, in order
+    """
+    _, stderr = await _run(
+        "ffmpeg",
+        "-hide_banner", "-nostats",
+        "-i", str(path),
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}",
+        "-f", "null", "-",
+    )  # fmt: skip
+
+    silences = []
+    start = None
+    for line in stderr.splitlines():
+        if match := _SILENCE_START.search(line):
+            start = max(0.0, float(match.group(1)))
+        elif (match := _SILENCE_END.search(line)) and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def plan_chunks(
+    duration: float,
+    silences: list[tuple[float, float]],
+    max_chunk: float,
+    overlap: float = 1.0,
+) -> list[tuple[float, float]]:
+    """Choose chunk boundaries no longer than max_chunk seconds.
+
+    Each chunk ends in the middle of the last silence that fits. When a
+    stretch has no usable silence it is cut hard, and the next chunk starts
+    ``overlap`` seconds early so no word is lost at the cut.
+
+    Args:
+        duration: Total audio duration in seconds
+        silences: (start, end) silent stretches, in order
+        max_chunk: Maximum chunk length in seconds
+        overlap: Overlap added after a hard cut (at most max_chunk / 4, so
+            every chunk moves forward)
+
+    Returns:
+        List of (start, end) pairs covering the whole audio
+    """
+    # Don't cut in the first quarter of a chunk: avoids runs of tiny chunks
+    min_chunk = max_chunk / 4
+    overlap = min(max(overlap, 0.0), min_chunk)
+    cut_points = [(start + end) / 2 for start, end in silences]
+
+    chunks = []
+    start = 0.0
+    while duration - start > max_chunk:
+        limit = start + max_chunk
+        candidates = [p for p in cut_points if start + min_chunk <= p <= limit]
+        if candidates:
+            end = candidates[-1]
+            next_start = end
+        else:
+            end = limit
+            next_start = end - overlap
+        chunks.append((start, end))
+        start = next_start
+    chunks.append((start, duration))
+    return chunks
+
+
+async def extract_chunk(
+    source: Path, start: float, end: float, destination: Path
+) -> None:
+    """Copy the [start, end) range of an audio file without re-encoding."""
+    await _run(
+        "ffmpeg",
+        "-hide_banner", "-loglevel", "error", "-y",
+        "-ss", f"{start:.3f}",
+        "-to", f"{end:.3f}",
+        "-i", str(source),
+        "-c", "copy",
+        str(destination),
+    )  # fmt: skip
+
+
+async def transcode_to_opus(
+    source: Path,
+    destination: Path,
+    bitrate: str = "16k",
+    sample_rate: int = 16000,
+) -> None:
+    """Re-encode audio as mono Opus in an Ogg container.
+
+    Speech recognition models work at 16 kHz, so a low-bitrate mono
+    encoding loses nothing they use while making the upload much smaller.
+    """
+    await _run(
+        "ffmpeg",
+        "-hide_banner", "-loglevel", "error", "-y",
+        "-i", str(source),
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-c:a", "libopus", "-b:a", bitrate, "-application", "voip",
+        str(destination),
+    )  # fmt: skip
+
+
+def _normalize(word: str) -> str:
+    return "".join(_WORD.findall(word.lower()))
+
+
+def merge_transcripts(
+    parts: list[str],
+    overlapping: list[bool] | None = None,
+    max_overlap_words: int = 12,
+) -> str:
+    """Join chunk transcripts in order, dropping words repeated at the seams.
+
+    Overlapping chunks transcribe the same audio twice; the longest run of
+    words that ends one part and starts the next (ignoring case and
+    punctuation) is kept only once.
+
+    Args:
+        parts: Transcripts in audio order
+        overlapping: Per part, whether its audio overlaps the previous part;
+            seams cut at a silence are joined as they are. Default: all
+        max_overlap_words: Longest seam repetition to look for
+
+    Returns:
+        Combined transcript
+    """
+    if overlapping is None:
+        overlapping = [True] * len(parts)
+
+    words: list[str] = []
+    for part, overlaps in zip(parts, overlapping, strict=True):
+        new_words = part.split()
+        if not new_words:
+            continue
+
+        skip = 0
+        if overlaps:
+            tail = [_normalize(w) for w in words[-max_overlap_words:]]
+            head = [_normalize(w) for w in new_words[:max_overlap_words]]
+            for size in range(min(len(tail), len(head)), 0, -1):
+                if tail[-size:] == head[:size] and any(head[:size]):
+                    skip = size
+                    break
+        words.extend(new_words[skip:])
+    return " ".join(words)
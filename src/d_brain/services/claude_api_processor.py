@@ -1,63 +1,41 @@
 """Claude API processor for task/note extraction and creation."""
 
+import asyncio
 import json
 import logging
+import re
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 import anthropic
 
+from d_brain.services.claude_client import ClaudeClient
+from d_brain.services.google_clients import GoogleClientRegistry
 from d_brain.services.google_keep import GoogleKeepService
-from d_brain.services.google_tasks import GoogleTasksService
+from d_brain.services.google_tasks import DEFAULT_TASKLIST, GoogleTasksService
+from d_brain.services.ledger import ProcessingLedger, text_hash
+from d_brain.services.quick_classifier import quick_classify
 from d_brain.services.session import SessionStore
+from d_brain.services.session_sqlite import SQLiteSessionStore
 
-logger = logging.getLogger(__name__)
-
-
-class ClaudeAPIProcessor:
-    """Service for processing entries with Claude API and creating Google Tasks/Keep."""
-
-    def __init__(self, vault_path: Path, google_credentials_path: str) -> None:
-        """Initialize with vault path and Google credentials.
-
-        Args:
-            vault_path: Path to vault directory
-            google_credentials_path: Path to Google Service Account credentials JSON
-        """
-        self.vault_path = Path(vault_path)
-        self.client = anthropic.Anthropic()
-        self.tasks_service = GoogleTasksService(google_credentials_path)
-        self.keep_service = GoogleKeepService(google_credentials_path)
-
-    def process_entry(self, text: str, user_id: int = 0) -> dict[str, Any]:
-        """Process a single entry with Claude and create tasks/notes.
-
-        Args:
-            text: The entry text to process
-            user_id: Telegram user ID for context
-
-        Returns:
-            Processing report as dict
-        """
-        today = date.today()
+if TYPE_CHECKING:
+    from d_brain.config import Settings
 
-        # Get session context for GTD processing
-        session_context = self._get_session_context(user_id)
+logger = logging.getLogger(__name__)
 
-        prompt = f"""Ты - GTD-ассистент. Твоя задача правильно обработать эту запись используя Getting Things Done методологию.
+MODEL = "claude-opus-4-1-20250805"
+FAST_MODEL = "claude-haiku-4-5"
 
-Контекст:
-- Дата сегодня: {today}
-- Язык: русский
-- Вчерашние записи для контекста:
+ITEM_TYPES = ("task", "note", "waiting", "someday")
+CONTEXTS = ("@work", "@home", "@phone", "@computer")
+PRIORITIES = ("high", "medium", "low")
 
-{session_context}
-
-ЗАПИСЬ ДЛЯ ОБРАБОТКИ:
-"{text}"
-
-=== ИНСТРУКЦИИ ===
+# Classification rules and answer formats
+GTD_RULES = """=== ИНСТРУКЦИИ ===
 
 ПЕРВОЕ: Определи тип записи:
 
@@ -95,9 +73,9 @@ class ClaudeAPIProcessor:
   - "не указан" → null
 - Определи контекст (@work, @home, @phone, @computer)
 
-ТРЕТЬЕ: Верни ТОЛЬКО JSON (БЕЗ других текстов):
+"""
 
-{{
+GTD_FORMATS = """{
   "type": "task",
   "title": "короткий заголовок",
   "content": "полное описание задачи",
@@ -106,162 +84,995 @@ class ClaudeAPIProcessor:
   "priority": "high или medium или low",
   "is_project": false,
   "notes": "доп. заметки если нужны"
-}}
+}
 
 ИЛИ для справки:
 
-{{
+{
   "type": "note",
   "title": "заголовок справки",
   "content": "содержание справки",
   "tags": ["метка1", "метка2"]
-}}
+}
 
 ИЛИ для ожидания:
 
-{{
+{
   "type": "waiting",
   "title": "ждём ответ от кого",
   "content": "описание",
   "waiting_for": "имя человека или информация",
   "due_date": null
-}}
+}
 
 ИЛИ для когда-нибудь:
 
-{{
+{
   "type": "someday",
   "title": "название идеи",
   "content": "описание",
   "tags": ["идея"]
-}}"""
+}"""
+
+# Static part of every classification request. Sent as a system block with a
+# cache breakpoint, so it is cached and only the date, session context and
+# entries after it are processed anew.
+SYSTEM_PROMPT = f"""Ты - GTD-ассистент. Твоя задача правильно обрабатывать записи \
+используя Getting Things Done методологию. Язык записей: русский.
+
+{GTD_RULES}ФОРМАТЫ ОТВЕТА:
+
+{GTD_FORMATS}
+
+В каждый объект добавь поле "confidence": уверенность в типе и сроке от 0 до 1."""
+
+# Complete "type"/"title" string values in a partial JSON answer
+_PARTIAL_FIELD = re.compile(r'"(type|title)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+ProgressCallback = Callable[[dict[str, Any]], Awaitable[None]]
 
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+def partial_fields(response_text: str) -> dict[str, str]:
+    """Type and title from an answer that is still being streamed.
+
+    Args:
+        response_text: Answer text received so far
+
+    Returns:
+        The fields whose string value is complete so far
+    """
+    fields: dict[str, str] = {}
+    for name, value in _PARTIAL_FIELD.findall(response_text):
         try:
-            message = self.client.messages.create(
-                model="claude-opus-4-1-20250805",
-                max_tokens=1024,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
+            fields.setdefault(name, json.loads(f'"{value}"'))
+        except json.JSONDecodeError:
+            continue
+    return fields
+
+
+def validate_classification(item: dict[str, Any]) -> bool:
+    """Check a classification against the answer formats.
+
+    Args:
+        item: Parsed classification object
+
+    Returns:
+        True if the type, title and the type's optional fields are well-formed
+    """
+    if not _has_type_and_title(item):
+        return False
+    if not isinstance(item.get("content", ""), str):
+        return False
+
+    due_date = item.get("due_date")
+    if due_date is not None:
+        try:
+            date.fromisoformat(due_date)
+        except (TypeError, ValueError):
+            return False
+
+    if item["type"] == "task":
+        if item.get("priority", "medium") not in PRIORITIES:
+            return False
+        if item.get("context") not in (None, *CONTEXTS):
+            return False
+    if item["type"] in ("note", "someday"):
+        tags = item.get("tags", [])
+        if not isinstance(tags, list):
+            return False
+    return True
+
+
+def _has_type_and_title(item: dict[str, Any]) -> bool:
+    """The fields every item needs before it can be created."""
+    title = item.get("title")
+    return (
+        item.get("type") in ITEM_TYPES
+        and isinstance(title, str)
+        and bool(title.strip())
+    )
+
+
+@dataclass
+class TierStats:
+    """Counters for one model tier."""
+
+    requests: int = 0
+    entries: int = 0
+    accepted: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        escalated = self.entries - self.accepted
+        return {
+            "requests": self.requests,
+            "entries": self.entries,
+            "escalated": escalated,
+            "escalation_rate": escalated / self.entries if self.entries else 0.0,
+            "latency_avg_seconds": (
+                self.seconds / self.requests if self.requests else 0.0
+            ),
+        }
+
+
+class _ItemRequest(NamedTuple):
+    """A Google Tasks or Keep item to create for a classification."""
+
+    kind: str  # "task" or "note"
+    kwargs: dict[str, Any]
+    done_status: str
+    error_prefix: str
+
+
+class ClaudeAPIProcessor:
+    """Service for processing entries with Claude API and creating Google Tasks/Keep."""
+
+    def __init__(
+        self,
+        vault_path: Path,
+        google_credentials_path: str,
+        session: SessionStore | SQLiteSessionStore | None = None,
+        async_client: ClaudeClient | None = None,
+        quick_threshold: float = 0.8,
+        ledger: ProcessingLedger | None = None,
+        model: str = MODEL,
+        fast_model: str | None = FAST_MODEL,
+        escalation_threshold: float = 0.7,
+        google_clients: GoogleClientRegistry | None = None,
+        task_routing: str = "single",
+        tasklist_cache_path: Path | None = None,
+    ) -> None:
+        """Initialize with vault path and Google credentials.
+
+        Args:
+            vault_path: Path to vault directory
+            google_credentials_path: Path to Google Service Account credentials JSON
+            session: Session store for context (default: JSONL store in vault)
+            async_client: Shared client for the *_async methods (default: own)
+            quick_threshold: Rule-based classifications at least this
+                confident skip Claude (above 1 sends everything to Claude)
+            ledger: Ledger of processed entries; entries found in it are not
+                classified or created again (default: no ledger)
+            model: Model for entries the fast model cannot settle
+            fast_model: Model tried first, or None to use only model
+            escalation_threshold: Fast-model answers reporting a lower
+                confidence are escalated to model
+            google_clients: Shared Google client registry (default: own)
+            task_routing: "single" puts every task in the Second Brain list,
+                "gtd" routes to Next Actions, Projects and Waiting
+            tasklist_cache_path: File remembering tasklist IDs between runs
+        """
+        self.vault_path = Path(vault_path)
+        self.session = session or SessionStore(self.vault_path)
+        # The sync client is only built if a sync method is used
+        self._client: anthropic.Anthropic | None = None
+        self.async_client = async_client
+        self.usage = dict.fromkeys(USAGE_FIELDS, 0)
+        self.quick_threshold = quick_threshold
+        self.quick_hits = 0
+        self.ledger = ledger
+        self.models = (fast_model, model) if fast_model else (model,)
+        self.escalation_threshold = escalation_threshold
+        self.tier_stats: dict[str, TierStats] = {}
+        google_clients = google_clients or GoogleClientRegistry(google_credentials_path)
+        self.task_routing = task_routing
+        self.tasks_service = GoogleTasksService(
+            google_credentials_path, google_clients, cache_path=tasklist_cache_path
+        )
+        self.keep_service = GoogleKeepService(google_credentials_path, google_clients)
+
+    def process_entry(
+        self, text: str, user_id: int = 0, force: bool = False
+    ) -> dict[str, Any]:
+        """Process a single entry with Claude and create tasks/notes.
+
+        Args:
+            text: The entry text to process
+            user_id: Telegram user ID for context
+            force: Process the entry even if the ledger has it
+
+        Returns:
+            Processing report as dict
+        """
+        if not force and (done := self._from_ledger(text, user_id)) is not None:
+            return done
+        try:
+            result = self.classify(text, user_id)
+        except Exception as e:
+            return self._error_result(e)
+        return self._remember(text, user_id, self.create_item(result))
+
+    async def process_entry_async(
+        self,
+        text: str,
+        user_id: int = 0,
+        force: bool = False,
+        on_progress: ProgressCallback | None = None,
+    ) -> dict[str, Any]:
+        """Async variant of process_entry using the shared Claude client.
+
+        Args:
+            text: The entry text to process
+            user_id: Telegram user ID for context
+            force: Process the entry even if the ledger has it
+            on_progress: If given, the answer is streamed and this is called
+                with the type and title as soon as they are parsed, then
+                with the full classification before the item is created
+
+        Returns:
+            Processing report as dict
+        """
+        if not force and (done := self._from_ledger(text, user_id)) is not None:
+            return done
+        try:
+            result = await self.classify_async(text, user_id, on_progress)
+        except Exception as e:
+            return self._error_result(e)
+        if on_progress is not None:
+            await on_progress(result)
+        created = await asyncio.to_thread(self.create_item, result)
+        return self._remember(text, user_id, created)
+
+    def process_entries(
+        self,
+        texts: list[str],
+        user_id: int = 0,
+        batch_size: int = 20,
+        force: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Classify entries in batches, then create tasks/notes for each.
+
+        Entries in the ledger, and repeats of an earlier entry in texts,
+        are neither classified nor created again.
+
+        Args:
+            texts: Entry texts to process
+            user_id: Telegram user ID for context
+            batch_size: Entries classified per Claude request
+            force: Process entries even if the ledger has them
+
+        Returns:
+            Processing reports, in the same order as texts
+        """
+        results, pending = self._pending_entries(texts, user_id, force)
+        classified = self.classify_batch(
+            [texts[i] for i in pending], user_id, batch_size
+        )
+        to_create = []
+        for i, result in zip(pending, classified, strict=True):
+            results[i] = result
+            if result["type"] != "error":
+                to_create.append((texts[i], result))
+
+        # Tasks and notes are created with a few batch requests
+        self.create_items([result for _, result in to_create])
+        for text, result in to_create:
+            self._remember(text, user_id, result)
+        return self._fill_repeats(texts, results)
+
+    async def process_entries_async(
+        self,
+        texts: list[str],
+        user_id: int = 0,
+        batch_size: int = 20,
+        force: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Async variant of process_entries: batches are classified concurrently.
+
+        Args:
+            texts: Entry texts to process
+            user_id: Telegram user ID for context
+            batch_size: Entries classified per Claude request
+            force: Process entries even if the ledger has them
+
+        Returns:
+            Processing reports, in the same order as texts
+        """
+        results, pending = self._pending_entries(texts, user_id, force)
+        classified = await self.classify_batch_async(
+            [texts[i] for i in pending], user_id, batch_size
+        )
+
+        to_create = []
+        for i, result in zip(pending, classified, strict=True):
+            results[i] = result
+            if result["type"] != "error":
+                to_create.append((texts[i], result))
+
+        # Tasks and notes are created with a few batch requests
+        await asyncio.to_thread(self.create_items, [result for _, result in to_create])
+        for text, result in to_create:
+            self._remember(text, user_id, result)
+        return self._fill_repeats(texts, results)
+
+    def classify(self, text: str, user_id: int = 0) -> dict[str, Any]:
+        """Classify a single entry with Claude.
+
+        The fast model answers first; the answer goes to the next tier if
+        it fails validation or reports confidence below the threshold.
+
+        Args:
+            text: The entry text to classify
+            user_id: Telegram user ID for context
+
+        Returns:
+            Classification dict (falls back to a note if the answer is not
+            JSON or has no known type or no title)
+
+        Raises:
+            anthropic.APIError: If the request to the last tier fails
+        """
+        if (quick := self._quick(text)) is not None:
+            return quick
+        return self._classify_tiers(text, user_id, self.models)
+
+    async def classify_async(
+        self,
+        text: str,
+        user_id: int = 0,
+        on_progress: ProgressCallback | None = None,
+    ) -> dict[str, Any]:
+        """Async variant of classify using the shared Claude client.
+
+        With on_progress the answer is streamed, and on_progress gets the
+        type and title parsed from it so far whenever they change.
+        """
+        if (quick := self._quick(text)) is not None:
+            return quick
+        return await self._classify_tiers_async(
+            text, user_id, self.models, on_progress
+        )
+
+    def classify_batch(
+        self, texts: list[str], user_id: int = 0, batch_size: int = 20
+    ) -> list[dict[str, Any]]:
+        """Classify many entries with one Claude request per batch.
+
+        Entries the rules classify confidently are answered locally. The
+        rest are numbered in the prompt and Claude answers with a JSON
+        array whose items carry that index. Each model tier gets the
+        entries the previous one did not answer validly and confidently;
+        entries the last tier also misses are classified one by one.
+
+        Args:
+            texts: Entry texts to classify
+            user_id: Telegram user ID for context
+            batch_size: Entries per request
+
+        Returns:
+            Classification dicts in the same order as texts; an entry whose
+            fallback request also fails gets type "error"
+        """
+        results: list[dict[str, Any] | None] = [self._quick(t) for t in texts]
+        for tier, model in enumerate(self.models):
+            final = tier == len(self.models) - 1
+            pending = [i for i, result in enumerate(results) if result is None]
+            for offset in range(0, len(pending), batch_size):
+                chunk = pending[offset : offset + batch_size]
+                batch = [texts[i] for i in chunk]
+                started = time.perf_counter()
+                try:
+                    message = self.client.messages.create(
+                        **self._request(
+                            self._batch_prompt(batch, user_id),
+                            max_tokens=min(8192, 512 * len(batch)),
+                            model=model,
+                        )
+                    )
+                except anthropic.APIError as e:
+                    logger.error("Claude API error for batch at %d: %s", offset, e)
+                    continue
+                accepted = self._accept_batch(model, final, batch, message, started)
+                for index, item in accepted.items():
+                    results[chunk[index]] = item
+
+        for i in self._missing(results):
+            try:
+                results[i] = self._classify_tiers(texts[i], user_id, self.models[-1:])
+            except Exception as e:
+                logger.error("Failed to classify entry %d: %s", i, e)
+                results[i] = self._error_result(e)
+
+        return [result for result in results if result is not None]
+
+    async def classify_batch_async(
+        self, texts: list[str], user_id: int = 0, batch_size: int = 20
+    ) -> list[dict[str, Any]]:
+        """Async variant of classify_batch.
+
+        All batches of a tier, and then all per-entry fallbacks, are sent
+        at once; the shared client's concurrency limit decides how many run
+        in parallel, so wall-clock time scales with batches / concurrency.
+        """
+        results: list[dict[str, Any] | None] = [self._quick(t) for t in texts]
+
+        async def classify_chunk(chunk: list[int], model: str, final: bool) -> None:
+            batch = [texts[i] for i in chunk]
+            started = time.perf_counter()
+            try:
+                message = await self._async_client.create_message(
+                    **self._request(
+                        self._batch_prompt(batch, user_id),
+                        max_tokens=min(8192, 512 * len(batch)),
+                        model=model,
+                    )
+                )
+            except anthropic.APIError as e:
+                logger.error("Claude API error for batch at %d: %s", chunk[0], e)
+                return
+            accepted = self._accept_batch(model, final, batch, message, started)
+            for index, item in accepted.items():
+                results[chunk[index]] = item
+
+        async def classify_one(i: int) -> None:
+            try:
+                results[i] = await self._classify_tiers_async(
+                    texts[i], user_id, self.models[-1:]
+                )
+            except Exception as e:
+                logger.error("Failed to classify entry %d: %s", i, e)
+                results[i] = self._error_result(e)
+
+        for tier, model in enumerate(self.models):
+            final = tier == len(self.models) - 1
+            pending = [i for i, result in enumerate(results) if result is None]
+            async with asyncio.TaskGroup() as tg:
+                for offset in range(0, len(pending), batch_size):
+                    chunk = pending[offset : offset + batch_size]
+                    tg.create_task(classify_chunk(chunk, model, final))
+        async with asyncio.TaskGroup() as tg:
+            for i in self._missing(results):
+                tg.create_task(classify_one(i))
+
+        return [result for result in results if result is not None]
+
+    def tier_metrics(self) -> dict[str, dict[str, float]]:
+        """Per-model request count, latency and escalation rate."""
+        return {model: stats.as_dict() for model, stats in self.tier_stats.items()}
+
+    def log_metrics(self) -> None:
+        """Log token usage and per-tier metrics accumulated so far."""
+        logger.info(
+            "Claude tokens: %d input, %d cache read, %d cache write, %d output; "
+            "%d entries classified locally",
+            self.usage["input_tokens"],
+            self.usage["cache_read_input_tokens"],
+            self.usage["cache_creation_input_tokens"],
+            self.usage["output_tokens"],
+            self.quick_hits,
+        )
+        for model, stats in self.tier_metrics().items():
+            logger.info(
+                "%s: %d requests, %.1f s avg, %.0f%% escalated",
+                model,
+                stats["requests"],
+                stats["latency_avg_seconds"],
+                stats["escalation_rate"] * 100,
             )
 
-            response_text = message.content[0].text
+    def _classify_tiers(
+        self, text: str, user_id: int, models: tuple[str, ...]
+    ) -> dict[str, Any]:
+        prompt = self._single_prompt(text, user_id)
+        for model in models[:-1]:
+            started = time.perf_counter()
+            try:
+                message = self.client.messages.create(
+                    **self._request(prompt, max_tokens=1024, model=model)
+                )
+            except anthropic.APIError as e:
+                logger.warning("%s failed, escalating: %s", model, e)
+                self._record_tier(model, 1, 0, time.perf_counter() - started)
+                continue
+            if (item := self._accept_single(model, message, started)) is not None:
+                return item
+
+        started = time.perf_counter()
+        message = self.client.messages.create(
+            **self._request(prompt, max_tokens=1024, model=models[-1])
+        )
+        self._record_usage(message.usage)
+        self._record_tier(models[-1], 1, 1, time.perf_counter() - started)
+        return self._parse_single(text, message.content[0].text)
 
-            # Try to extract JSON from response
+    async def _classify_tiers_async(
+        self,
+        text: str,
+        user_id: int,
+        models: tuple[str, ...],
+        on_progress: ProgressCallback | None = None,
+    ) -> dict[str, Any]:
+        prompt = self._single_prompt(text, user_id)
+        for model in models[:-1]:
+            started = time.perf_counter()
             try:
-                # Find JSON in response (it might be wrapped in text)
-                json_start = response_text.find("{")
-                json_end = response_text.rfind("}") + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response_text[json_start:json_end]
-                    result = json.loads(json_str)
-                else:
-                    # Fallback: return as note
-                    result = {
-                        "type": "note",
-                        "title": text[:50],
-                        "content": text,
-                        "created": False,
-                        "status": "Не удалось распарсить ответ Claude",
-                    }
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse Claude response as JSON")
+                message = await self._create_async(
+                    self._request(prompt, max_tokens=1024, model=model), on_progress
+                )
+            except anthropic.APIError as e:
+                logger.warning("%s failed, escalating: %s", model, e)
+                self._record_tier(model, 1, 0, time.perf_counter() - started)
+                continue
+            if (item := self._accept_single(model, message, started)) is not None:
+                return item
+
+        started = time.perf_counter()
+        message = await self._create_async(
+            self._request(prompt, max_tokens=1024, model=models[-1]), on_progress
+        )
+        self._record_usage(message.usage)
+        self._record_tier(models[-1], 1, 1, time.perf_counter() - started)
+        return self._parse_single(text, message.content[0].text)
+
+    async def _create_async(
+        self, request: dict[str, Any], on_progress: ProgressCallback | None
+    ) -> Any:
+        """Send a request, streaming it if progress is wanted."""
+        if on_progress is None:
+            return await self._async_client.create_message(**request)
+
+        shown: dict[str, str] = {}
+
+        async def on_text(response_text: str) -> None:
+            nonlocal shown
+            fields = partial_fields(response_text)
+            if fields and fields != shown:
+                shown = fields
+                await on_progress(fields)
+
+        return await self._async_client.stream_message(on_text, **request)
+
+    def _accept_single(
+        self, model: str, message: Any, started: float
+    ) -> dict[str, Any] | None:
+        """Classification from a lower tier, or None to escalate."""
+        self._record_usage(message.usage)
+        item = self._extract_object(message.content[0].text)
+        accepted = item is not None and self._confident(item)
+        self._record_tier(model, 1, int(accepted), time.perf_counter() - started)
+        if not accepted:
+            logger.info("Escalating entry from %s: %s", model, self._why_rejected(item))
+            return None
+        return item
+
+    def _accept_batch(
+        self, model: str, final: bool, batch: list[str], message: Any, started: float
+    ) -> dict[int, dict[str, Any]]:
+        """Items of a batch answer to keep; the rest go to the next tier."""
+        self._record_usage(message.usage)
+        parsed = self._parse_batch(batch, message.content[0].text)
+        accepted = {
+            index: item
+            for index, item in parsed.items()
+            if final or self._confident(item)
+        }
+        self._record_tier(
+            model, len(batch), len(accepted), time.perf_counter() - started
+        )
+        if not final and len(accepted) < len(batch):
+            logger.info(
+                "Escalating %d of %d entries from %s",
+                len(batch) - len(accepted),
+                len(batch),
+                model,
+            )
+        return accepted
+
+    def _confident(self, item: dict[str, Any]) -> bool:
+        """Whether a lower tier's answer is valid and confident enough."""
+        confidence = item.get("confidence")
+        return (
+            validate_classification(item)
+            and isinstance(confidence, (int, float))
+            and confidence >= self.escalation_threshold
+        )
+
+    def _why_rejected(self, item: dict[str, Any] | None) -> str:
+        if item is None:
+            return "no JSON object"
+        if not validate_classification(item):
+            return "invalid answer"
+        return f"confidence {item.get('confidence')}"
+
+    def _record_tier(
+        self, model: str, entries: int, accepted: int, seconds: float
+    ) -> None:
+        stats = self.tier_stats.setdefault(model, TierStats())
+        stats.requests += 1
+        stats.entries += entries
+        stats.accepted += accepted
+        stats.seconds += seconds
+
+    @property
+    def client(self) -> anthropic.Anthropic:
+        """Sync Anthropic client, created on first use."""
+        if self._client is None:
+            self._client = anthropic.Anthropic()
+        return self._client
+
+    @property
+    def _async_client(self) -> ClaudeClient:
+        if self.async_client is None:
+            self.async_client = ClaudeClient()
+        return self.async_client
+
+    def _from_ledger(self, text: str, user_id: int) -> dict[str, Any] | None:
+        """Earlier report for an already processed entry, marked as skipped."""
+        if self.ledger is None:
+            return None
+        done = self.ledger.get(text, user_id)
+        if done is None:
+            return None
+        logger.info("Entry already processed as %s, skipping", done.get("type"))
+        done["skipped"] = True
+        done["status"] = f"↺ Уже обработано ранее: {done.get('status', '')}"
+        return done
+
+    def _remember(
+        self, text: str, user_id: int, result: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Record a created item in the ledger; returns result unchanged."""
+        if self.ledger is not None and result.get("created"):
+            self.ledger.put(text, result, user_id)
+        return result
+
+    def _pending_entries(
+        self, texts: list[str], user_id: int, force: bool
+    ) -> tuple[list[dict[str, Any] | None], list[int]]:
+        """Ledger hits by position, and indexes of first occurrences to process."""
+        results = [
+            None if force else self._from_ledger(text, user_id) for text in texts
+        ]
+        seen = set()
+        pending = []
+        for i, text in enumerate(texts):
+            key = text_hash(text)
+            if results[i] is None and key not in seen:
+                pending.append(i)
+            seen.add(key)
+        return results, pending
+
+    def _fill_repeats(
+        self, texts: list[str], results: list[dict[str, Any] | None]
+    ) -> list[dict[str, Any]]:
+        """Give repeated entries the report of their first occurrence."""
+        first: dict[str, dict[str, Any]] = {}
+        filled = []
+        for text, result in zip(texts, results, strict=True):
+            key = text_hash(text)
+            if result is None:
                 result = {
-                    "type": "note",
-                    "title": text[:50],
-                    "content": text,
-                    "created": False,
-                    "status": "Parsing error",
+                    **first[key],
+                    "skipped": True,
+                    "status": "↺ Повтор записи выше",
                 }
+            first.setdefault(key, result)
+            filled.append(result)
+        return filled
 
-            # Create task or note based on classification
-            if result["type"] == "task":
-                try:
-                    # Determine which list to add to based on context/priority
-                    list_name = "Next Actions"
-                    if result.get("priority") == "high" or result.get("context") == "@phone":
-                        list_name = "Next Actions"
-                    elif result.get("is_project"):
-                        list_name = "Projects"
-                    
-                    task = self.tasks_service.create_task(
-                        title=result["title"],
-                        notes=result["content"],
-                        due_date=result.get("due_date", ""),
-                    )
-                    result["created"] = True
-                    result["status"] = f"✓ Создана задача в {list_name}"
-                    logger.info("Created task: %s", task.get("id"))
-                except Exception as e:
-                    logger.error("Failed to create task: %s", e)
-                    result["created"] = False
-                    result["status"] = f"Ошибка создания задачи: {e}"
-
-            elif result["type"] == "note":
-                try:
-                    note = self.keep_service.create_note(
-                        title=result["title"],
-                        content=result["content"],
-                    )
-                    result["created"] = True
-                    result["status"] = "✓ Создана заметка в Google Keep"
-                    logger.info("Created note: %s", note.get("name"))
-                except Exception as e:
-                    logger.error("Failed to create note: %s", e)
-                    result["created"] = False
-                    result["status"] = f"Ошибка создания заметки: {e}"
-
-            elif result["type"] == "waiting":
-                try:
-                    # Create as task with note that we're waiting
-                    waiting_note = f"⏳ Ожидаем: {result.get('waiting_for', 'ответ')}\n\n{result.get('content', '')}"
-                    task = self.tasks_service.create_task(
-                        title=f"⏳ {result['title']}",
-                        notes=waiting_note,
-                        due_date=result.get("due_date", ""),
-                    )
-                    result["created"] = True
-                    result["status"] = "✓ Добавлено в Waiting For"
-                    logger.info("Created waiting task: %s", task.get("id"))
-                except Exception as e:
-                    logger.error("Failed to create waiting task: %s", e)
-                    result["created"] = False
-                    result["status"] = f"Ошибка: {e}"
-
-            elif result["type"] == "someday":
-                try:
-                    # Create as note in Google Keep with someday tag
-                    note = self.keep_service.create_note(
-                        title=f"📚 {result['title']}",
-                        content=result["content"],
-                    )
-                    result["created"] = True
-                    result["status"] = "✓ Добавлено в Someday/Maybe"
-                    logger.info("Created someday note: %s", note.get("name"))
-                except Exception as e:
-                    logger.error("Failed to create someday note: %s", e)
-                    result["created"] = False
-                    result["status"] = f"Ошибка: {e}"
+    def _quick(self, text: str) -> dict[str, Any] | None:
+        """Rule-based classification, if it clears the confidence threshold."""
+        result = quick_classify(text)
+        if result is None or result["confidence"] < self.quick_threshold:
+            return None
+        self.quick_hits += 1
+        logger.info(
+            "Classified locally as %s (confidence %.2f)",
+            result["type"],
+            result["confidence"],
+        )
+        return result
 
-            return result
+    def _missing(self, results: list[dict[str, Any] | None]) -> list[int]:
+        """Indexes a batch answer did not cover."""
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            logger.info(
+                "Batch classification missed %d of %d entries, retrying singly",
+                len(missing),
+                len(results),
+            )
+        return missing
+
+    def _single_prompt(self, text: str, user_id: int) -> str:
+        today = date.today()
 
-        except anthropic.APIError as e:
-            logger.error("Claude API error: %s", e)
+        # Get session context for GTD processing
+        session_context = self._get_session_context(user_id)
+
+        return f"""Контекст:
+- Дата сегодня: {today}
+- Вчерашние записи для контекста:
+
+{session_context}
+
+ЗАПИСЬ ДЛЯ ОБРАБОТКИ:
+"{text}"
+
+ТРЕТЬЕ: Верни ТОЛЬКО JSON (БЕЗ других текстов) в одном из форматов ответа."""
+
+    def _batch_prompt(self, texts: list[str], user_id: int) -> str:
+        today = date.today()
+        session_context = self._get_session_context(user_id)
+        entries = "\n\n".join(
+            f"[{i}] {json.dumps(text, ensure_ascii=False)}"
+            for i, text in enumerate(texts)
+        )
+
+        return f"""Контекст:
+- Дата сегодня: {today}
+- Вчерашние записи для контекста:
+
+{session_context}
+
+ЗАПИСИ ДЛЯ ОБРАБОТКИ ({len(texts)} шт., номер в квадратных скобках):
+
+{entries}
+
+ТРЕТЬЕ: Верни ТОЛЬКО JSON-массив (БЕЗ других текстов) с одним объектом на каждую \
+запись, в том же порядке, в форматах ответа. В каждый объект добавь поле "index" с \
+номером записи."""
+
+    def _extract_object(self, response_text: str) -> dict[str, Any] | None:
+        """The JSON object in an answer (it might be wrapped in text)."""
+        json_start = response_text.find("{")
+        json_end = response_text.rfind("}") + 1
+        if json_start < 0 or json_end <= json_start:
+            return None
+        try:
+            item = json.loads(response_text[json_start:json_end])
+        except json.JSONDecodeError:
+            logger.warning("Failed to parse Claude response as JSON")
+            return None
+        return item if isinstance(item, dict) else None
+
+    def _parse_single(self, text: str, response_text: str) -> dict[str, Any]:
+        """Extract the classification object from a single-entry answer."""
+        item = self._extract_object(response_text)
+        if item is not None and _has_type_and_title(item):
+            return item
+        if item is not None:
+            logger.warning("Claude answer has no known type or no title")
+
+        # Fallback: return as note
+        return {
+            "type": "note",
+            "title": text[:50],
+            "content": text,
+            "created": False,
+            "status": "Не удалось распарсить ответ Claude",
+        }
+
+    def _parse_batch(
+        self, texts: list[str], response_text: str
+    ) -> dict[int, dict[str, Any]]:
+        """Valid classifications from a batch answer, by index."""
+        json_start = response_text.find("[")
+        json_end = response_text.rfind("]") + 1
+        try:
+            items = json.loads(response_text[json_start:json_end])
+        except json.JSONDecodeError:
+            logger.warning("Failed to parse batch response as a JSON array")
+            return {}
+        if json_start < 0 or not isinstance(items, list):
+            return {}
+
+        parsed = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index = item.pop("index", None)
+            if (
+                isinstance(index, int)
+                and 0 <= index < len(texts)
+                and _has_type_and_title(item)
+            ):
+                parsed[index] = item
+        return parsed
+
+    def _request(self, prompt: str, max_tokens: int, model: str) -> dict[str, Any]:
+        """messages.create arguments, with the cached system block."""
+        return {
+            "model": model,
+            "max_tokens": max_tokens,
+            "system": [
+                {
+                    "type": "text",
+                    "text": SYSTEM_PROMPT,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt,
+                }
+            ],
+        }
+
+    def _error_result(self, error: Exception) -> dict[str, Any]:
+        if isinstance(error, anthropic.APIError):
+            logger.error("Claude API error: %s", error)
             return {
                 "type": "error",
-                "status": f"API error: {e}",
+                "status": f"API error: {error}",
                 "created": False,
             }
+        logger.exception("Unexpected error during processing")
+        return {
+            "type": "error",
+            "status": f"Error: {error}",
+            "created": False,
+        }
+
+    def _record_usage(self, usage: Any) -> None:
+        """Add a response's token usage to the running totals."""
+        counts = {field: getattr(usage, field, None) or 0 for field in USAGE_FIELDS}
+        for field, count in counts.items():
+            self.usage[field] += count
+        logger.info(
+            "Claude usage: %d input, %d cache read, %d cache write, %d output tokens",
+            counts["input_tokens"],
+            counts["cache_read_input_tokens"],
+            counts["cache_creation_input_tokens"],
+            counts["output_tokens"],
+        )
+
+    def create_item(self, result: dict[str, Any]) -> dict[str, Any]:
+        """Create the task or note for a classified entry.
+
+        Args:
+            result: Classification from classify()
+
+        Returns:
+            The same dict with "created" and "status" filled in
+        """
+        request = self._item_request(result)
+        if request is None:
+            return result
+        item: dict[str, Any] | Exception
+        try:
+            if request.kind == "task":
+                item = self.tasks_service.create_task(**request.kwargs)
+            else:
+                item = self.keep_service.create_note(**request.kwargs)
         except Exception as e:
-            logger.exception("Unexpected error during processing")
-            return {
-                "type": "error",
-                "status": f"Error: {e}",
-                "created": False,
-            }
+            item = e
+        return self._item_created(result, request, item)
+
+    def create_items(self, results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Create tasks and notes for many entries with batched Google requests.
+
+        Args:
+            results: Classifications from classify_batch()
+
+        Returns:
+            The same dicts with "created" and "status" filled in; a failed
+            request only marks its own entry
+        """
+        requests = [(result, self._item_request(result)) for result in results]
+        tasks = [(r, req) for r, req in requests if req and req.kind == "task"]
+        notes = [(r, req) for r, req in requests if req and req.kind == "note"]
+
+        if tasks:
+            created = self.tasks_service.create_tasks([req.kwargs for _, req in tasks])
+            for (result, request), item in zip(tasks, created, strict=True):
+                self._item_created(result, request, item)
+        if notes:
+            created = self.keep_service.create_notes([req.kwargs for _, req in notes])
+            for (result, request), item in zip(notes, created, strict=True):
+                self._item_created(result, request, item)
+        return results
+
+    def _item_request(self, result: dict[str, Any]) -> _ItemRequest | None:
+        """What to create for a classification, or None for unknown types."""
+        # Create task or note based on classification
+        if result["type"] == "task":
+            # GTD routing: projects get their own list, everything else is
+            # a next action
+            list_name = DEFAULT_TASKLIST
+            if self.task_routing == "gtd":
+                list_name = "Projects" if result.get("is_project") else "Next Actions"
+
+            return _ItemRequest(
+                "task",
+                {
+                    "title": result["title"],
+                    "notes": result.get("content", ""),
+                    "due_date": result.get("due_date", ""),
+                    "list_name": list_name,
+                },
+                f"✓ Создана задача в {list_name}",
+                "Ошибка создания задачи",
+            )
+
+        if result["type"] == "note":
+            return _ItemRequest(
+                "note",
+                {"title": result["title"], "content": result.get("content", "")},
+                "✓ Создана заметка в Google Keep",
+                "Ошибка создания заметки",
+            )
+
+        if result["type"] == "waiting":
+            # Create as task with note that we're waiting
+            list_name = DEFAULT_TASKLIST
+            if self.task_routing == "gtd":
+                list_name = "Waiting"
+            waiting_for = result.get("waiting_for", "ответ")
+            waiting_note = f"⏳ Ожидаем: {waiting_for}\n\n{result.get('content', '')}"
+            return _ItemRequest(
+                "task",
+                {
+                    "title": f"⏳ {result['title']}",
+                    "notes": waiting_note,
+                    "due_date": result.get("due_date", ""),
+                    "list_name": list_name,
+                },
+                "✓ Добавлено в Waiting For",
+                "Ошибка",
+            )
+
+        if result["type"] == "someday":
+            # Create as note in Google Keep with someday tag
+            return _ItemRequest(
+                "note",
+                {
+                    "title": f"📚 {result['title']}",
+                    "content": result.get("content", ""),
+                },
+                "✓ Добавлено в Someday/Maybe",
+                "Ошибка",
+            )
+
+        return None
+
+    def _item_created(
+        self,
+        result: dict[str, Any],
+        request: _ItemRequest,
+        item: dict[str, Any] | Exception,
+    ) -> dict[str, Any]:
+        """Fill in "created" and "status" from the Google API outcome."""
+        if isinstance(item, Exception):
+            logger.error("Failed to create %s: %s", result["type"], item)
+            result["created"] = False
+            result["status"] = f"{request.error_prefix}: {item}"
+            return result
+
+        item_id = item.get("id") if request.kind == "task" else item.get("name")
+        result["created"] = True
+        result["item_id"] = item_id
+        result["status"] = request.done_status
+        logger.info("Created %s: %s", result["type"], item_id)
+        return result
 
     def _get_session_context(self, user_id: int) -> str:
         """Get today's session context for Claude.
@@ -276,8 +1087,7 @@ class ClaudeAPIProcessor:
             return ""
 
         try:
-            session = SessionStore(self.vault_path)
-            today_entries = session.get_today(user_id)
+            today_entries = self.session.get_today(user_id)
             if not today_entries:
                 return ""
 
@@ -293,3 +1103,30 @@ class ClaudeAPIProcessor:
         except Exception as e:
             logger.warning("Failed to get session context: %s", e)
             return ""
+
+
+def create_claude_api_processor(
+    settings: "Settings",
+    session: SessionStore | SQLiteSessionStore | None = None,
+    async_client: ClaudeClient | None = None,
+    ledger: ProcessingLedger | None = None,
+    google_clients: GoogleClientRegistry | None = None,
+) -> ClaudeAPIProcessor:
+    """Create the processor configured in settings; share one per process.
+
+    Token usage and per-tier metrics accumulate on the shared instance.
+    """
+    return ClaudeAPIProcessor(
+        settings.vault_path,
+        str(settings.google_credentials_path),
+        session=session,
+        async_client=async_client,
+        quick_threshold=settings.quick_classify_threshold,
+        ledger=ledger,
+        model=settings.claude_model,
+        fast_model=settings.claude_fast_model or None,
+        escalation_threshold=settings.claude_escalation_confidence,
+        google_clients=google_clients,
+        task_routing=settings.google_tasks_routing,
+        tasklist_cache_path=settings.tasklist_cache_path,
+    )
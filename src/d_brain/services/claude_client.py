@@ -0,0 +1,159 @@
+"""Shared async Anthropic client with a concurrency limit.
+
+One AsyncAnthropic instance per process keeps its connection pool warm.
+A semaphore bounds the number of requests in flight. Rate-limit and
+overload errors are retried after the delay the API asks for
+(retry-after), or with exponential backoff. The wait happens outside the
+semaphore so a sleeping retry does not hold a slot.
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from typing import TYPE_CHECKING, Any
+
+import anthropic
+
+if TYPE_CHECKING:
+    from d_brain.config import Settings
+
+logger = logging.getLogger(__name__)
+
+TextCallback = Callable[[str], Awaitable[None]]
+
+# 408 timeout, 409 lock conflict, 429 rate limit, 5xx and 529 overloaded
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> float | None:
+    """Delay requested by the API, from retry-after-ms or retry-after."""
+    if value := headers.get("retry-after-ms"):
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+class ClaudeClient:
+    """AsyncAnthropic wrapper that bounds concurrency and retries politely.
+
+    Args:
+        max_concurrency: Requests in flight at once
+        max_retries: Retries after the first attempt
+        backoff: Initial delay when the API gives no retry-after
+        max_backoff: Upper bound for any single delay
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        # Retries are done here, not by the SDK, so waits do not hold a slot
+        self.client = anthropic.AsyncAnthropic(max_retries=0)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def create_message(self, **kwargs: Any) -> Any:
+        """Call messages.create with the concurrency limit and retries.
+
+        Args:
+            **kwargs: Arguments for AsyncAnthropic.messages.create
+
+        Returns:
+            The API message
+
+        Raises:
+            anthropic.APIError: If the request fails for good
+        """
+        return await self._with_retries(lambda: self.client.messages.create(**kwargs))
+
+    async def stream_message(self, on_text: TextCallback, **kwargs: Any) -> Any:
+        """Stream a message, with the same limit and retries as create_message.
+
+        Args:
+            on_text: Called with the text generated so far after each chunk
+                (from scratch again if the request is retried); keep it quick,
+                it runs while the request holds a slot
+            **kwargs: Arguments for AsyncAnthropic.messages.stream
+
+        Returns:
+            The complete API message
+
+        Raises:
+            anthropic.APIError: If the request fails for good
+        """
+
+        async def attempt() -> Any:
+            text = ""
+            async with self.client.messages.stream(**kwargs) as stream:
+                async for chunk in stream.text_stream:
+                    text += chunk
+                    await on_text(text)
+                return await stream.get_final_message()
+
+        return await self._with_retries(attempt)
+
+    async def _with_retries(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                try:
+                    return await request()
+                except anthropic.APIStatusError as e:
+                    retryable = e.status_code in RETRYABLE_STATUS
+                    if not retryable or attempt >= self.max_retries:
+                        raise
+                    delay = retry_after_seconds(e.response.headers)
+                    error: anthropic.APIError = e
+                except anthropic.APIConnectionError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = None
+                    error = e
+
+            if delay is None:
+                delay = self.backoff * 2**attempt * random.uniform(0.8, 1.2)
+            delay = min(delay, self.max_backoff)
+            attempt += 1
+            logger.warning(
+                "Claude request failed (%s), retry %d/%d in %.1f s",
+                error.__class__.__name__,
+                attempt,
+                self.max_retries,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self.client.close()
+
+
+def create_claude_client(settings: "Settings") -> ClaudeClient:
+    """Create a client configured from settings; share one per process."""
+    return ClaudeClient(
+        max_concurrency=settings.claude_max_concurrency,
+        max_retries=settings.claude_max_retries,
+    )
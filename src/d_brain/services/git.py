@@ -1,7 +1,10 @@
 """Git automation service for vault."""
 
+import asyncio
 import logging
 import subprocess
+import time
+from collections.abc import Iterable
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -23,14 +26,49 @@ class VaultGit:
             check=False,
         )
 
-    def get_status(self) -> str:
-        """Get git status."""
-        result = self._run_git("status", "--porcelain")
+    def configure_performance(self, fsmonitor: bool = False) -> None:
+        """Enable git settings that keep status/add cheap on a large vault.
+
+        Args:
+            fsmonitor: Also enable the builtin filesystem monitor daemon
+                (supported on macOS and Windows)
+        """
+        settings = [("core.untrackedCache", "true")]
+        if fsmonitor:
+            settings.append(("core.fsmonitor", "true"))
+
+        for key, value in settings:
+            result = self._run_git("config", key, value)
+            if result.returncode != 0:
+                logger.warning("Failed to set %s: %s", key, result.stderr)
+
+    def get_status(self, pathspec: Iterable[str] | None = None) -> str:
+        """Get git status, optionally limited to vault-relative paths."""
+        if pathspec is None:
+            result = self._run_git("status", "--porcelain")
+        else:
+            result = self._run_git(
+                "--literal-pathspecs", "status", "--porcelain", "--", *pathspec
+            )
         return result.stdout
 
-    def has_changes(self) -> bool:
-        """Check if there are uncommitted changes."""
-        return bool(self.get_status().strip())
+    def has_changes(self, paths: Iterable[Path] | None = None) -> bool:
+        """Check if there are uncommitted changes (in paths, if given)."""
+        if paths is None:
+            return bool(self.get_status().strip())
+        pathspec = self._pathspec(paths)
+        return bool(pathspec) and bool(self.get_status(pathspec).strip())
+
+    def _pathspec(self, paths: Iterable[Path]) -> list[str]:
+        """Sorted vault-relative paths; paths outside the vault are skipped."""
+        vault_root = self.vault_path.resolve()
+        relative = set()
+        for path in paths:
+            try:
+                relative.add(str(Path(path).resolve().relative_to(vault_root)))
+            except ValueError:
+                logger.warning("Not committing %s: outside the vault", path)
+        return sorted(relative)
 
     def commit_changes(self, message: str) -> bool:
         """Stage all changes and commit.
@@ -60,6 +98,77 @@ class VaultGit:
         logger.info("Committed: %s", message)
         return True
 
+    def commit_paths(self, paths: Iterable[Path], message: str) -> bool:
+        """Stage and commit only the given paths.
+
+        Unlike commit_changes this never scans the whole vault, so its cost
+        depends on the number of touched files rather than the vault size.
+        Paths are matched literally (a note named "a*b.md" is not a glob),
+        and paths outside the vault are skipped.
+
+        Args:
+            paths: Files written since the last commit
+            message: Commit message
+
+        Returns:
+            True if commit was made, False otherwise
+        """
+        vault_root = self.vault_path.resolve()
+        pathspec = self._pathspec(paths)
+        if not pathspec:
+            logger.info("No changes to commit")
+            return False
+
+        existing = [p for p in pathspec if (vault_root / p).exists()]
+        removed = [p for p in pathspec if not (vault_root / p).exists()]
+        if existing:
+            add_result = self._run_git(
+                "--literal-pathspecs", "add", "-A", "--", *existing
+            )
+            if add_result.returncode != 0:
+                logger.error("Git add failed: %s", add_result.stderr)
+                return False
+        if removed:
+            rm_result = self._run_git(
+                "--literal-pathspecs",
+                "rm",
+                "--cached",
+                "--ignore-unmatch",
+                "-q",
+                "--",
+                *removed,
+            )
+            if rm_result.returncode != 0:
+                logger.error("Git rm failed: %s", rm_result.stderr)
+                return False
+
+        # Only commit paths git actually sees as changed
+        diff_result = self._run_git(
+            "--literal-pathspecs",
+            "diff",
+            "--cached",
+            "--name-only",
+            "--no-renames",
+            "--relative",
+            "-z",
+            "--",
+            *pathspec,
+        )
+        changed = [p for p in diff_result.stdout.split("\0") if p]
+        if not changed:
+            logger.info("No changes to commit")
+            return False
+
+        commit_result = self._run_git(
+            "--literal-pathspecs", "commit", "-m", message, "--", *changed
+        )
+        if commit_result.returncode != 0:
+            logger.error("Git commit failed: %s", commit_result.stderr)
+            return False
+
+        logger.info("Committed %d paths: %s", len(changed), message)
+        return True
+
     def push(self) -> bool:
         """Push to remote.
 
@@ -86,3 +195,195 @@ class VaultGit:
         if self.commit_changes(message):
             return self.push()
         return True  # No changes is not an error
+
+
+class CommitScheduler:
+    """Coalesce vault changes into background commits and pushes.
+
+    Handlers call ``mark_dirty`` and return immediately. Changes are gathered
+    until the vault has been quiet for ``debounce`` seconds (or ``max_latency``
+    seconds have passed since the first pending change), then committed once.
+    Pushes run in a separate task with exponential backoff, so a slow or
+    unreachable remote never delays the next commit.
+
+    With ``scoped_staging`` enabled, changes reported with their paths are
+    committed via ``VaultGit.commit_paths``; a change marked without paths
+    falls back to a full ``git add -A`` for that batch.
+    """
+
+    def __init__(
+        self,
+        git: VaultGit,
+        debounce: float = 10.0,
+        max_latency: float = 60.0,
+        push_retries: int = 5,
+        push_backoff: float = 2.0,
+        scoped_staging: bool = True,
+    ) -> None:
+        self.git = git
+        self.debounce = debounce
+        self.max_latency = max_latency
+        self.push_retries = push_retries
+        self.push_backoff = push_backoff
+        self.scoped_staging = scoped_staging
+
+        self._pending: list[str] = []
+        self._paths: set[Path] = set()
+        self._needs_full_scan = False
+        self._first_dirty = 0.0
+        self._last_dirty = 0.0
+        self._dirty = asyncio.Event()
+        self._push_requested = asyncio.Event()
+        self._commit_lock = asyncio.Lock()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def mark_dirty(self, label: str, paths: Iterable[Path] | None = None) -> None:
+        """Record a vault change to be included in the next commit.
+
+        Args:
+            label: Short description like "text entry 14:05"
+            paths: Files touched by the change (None = unknown, stage all)
+        """
+        now = time.monotonic()
+        if not self._pending:
+            self._first_dirty = now
+        self._last_dirty = now
+        self._pending.append(label)
+        if paths is None:
+            self._needs_full_scan = True
+        else:
+            self._paths.update(paths)
+        self._dirty.set()
+
+    def start(self) -> None:
+        """Start background commit and push loops."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._commit_loop(), name="vault-commit"),
+            asyncio.create_task(self._push_loop(), name="vault-push"),
+        ]
+
+    async def stop(self) -> None:
+        """Stop background loops, committing and pushing anything pending."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        await self.flush()
+        if self._push_requested.is_set():
+            self._push_requested.clear()
+            await self._push_with_retry(attempts=1)
+
+    async def flush(self) -> bool:
+        """Commit pending changes now and schedule a push.
+
+        If the commit fails (index lock, hook, git error) and the changes are
+        still uncommitted, they are kept and retried after the debounce.
+
+        Returns:
+            True if a commit was made
+        """
+        async with self._commit_lock:
+            if not self._pending:
+                return False
+            labels, self._pending = self._pending, []
+            paths, self._paths = self._paths, set()
+            needs_full_scan = self._needs_full_scan
+            full_scan = needs_full_scan or not self.scoped_staging
+            self._needs_full_scan = False
+            self._dirty.clear()
+
+            message = self._build_message(labels)
+            try:
+                if full_scan:
+                    committed = await asyncio.to_thread(
+                        self.git.commit_changes, message
+                    )
+                else:
+                    committed = await asyncio.to_thread(
+                        self.git.commit_paths, paths, message
+                    )
+                # False also means "nothing to commit"; retry only real leftovers
+                failed = not committed and await asyncio.to_thread(
+                    self.git.has_changes, None if full_scan else paths
+                )
+            except Exception:
+                logger.exception("Vault commit failed")
+                committed, failed = False, True
+
+            if failed:
+                self._restore(labels, paths, needs_full_scan)
+
+        if committed:
+            self._push_requested.set()
+        return committed
+
+    def _restore(
+        self, labels: list[str], paths: set[Path], needs_full_scan: bool
+    ) -> None:
+        """Put back changes whose commit failed, to retry after the debounce."""
+        logger.warning("Keeping %d uncommitted changes for a retry", len(labels))
+        now = time.monotonic()
+        self._pending = labels + self._pending
+        self._paths |= paths
+        self._needs_full_scan = self._needs_full_scan or needs_full_scan
+        self._first_dirty = self._last_dirty = now
+        self._dirty.set()
+
+    @staticmethod
+    def _build_message(labels: list[str]) -> str:
+        """Build one commit message for a batch of changes."""
+        if len(labels) == 1:
+            return f"vault: {labels[0]}"
+        body = "\n".join(f"- {label}" for label in labels)
+        return f"vault: {len(labels)} entries\n\n{body}"
+
+    async def _commit_loop(self) -> None:
+        while True:
+            await self._dirty.wait()
+
+            # Wait for a quiet period, but never longer than max_latency
+            while self._pending:
+                deadline = min(
+                    self._last_dirty + self.debounce,
+                    self._first_dirty + self.max_latency,
+                )
+                delay = deadline - time.monotonic()
+                if delay <= 0:
+                    break
+                self._dirty.clear()
+                try:
+                    await asyncio.wait_for(self._dirty.wait(), timeout=delay)
+                except TimeoutError:
+                    pass
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Background commit failed")
+
+    async def _push_loop(self) -> None:
+        while True:
+            await self._push_requested.wait()
+            # Clear before pushing: commits made meanwhile trigger another push
+            self._push_requested.clear()
+            await self._push_with_retry(attempts=self.push_retries)
+
+    async def _push_with_retry(self, attempts: int) -> bool:
+        delay = self.push_backoff
+        for attempt in range(1, attempts + 1):
+            if await asyncio.to_thread(self.git.push):
+                return True
+            if attempt < attempts:
+                logger.warning(
+                    "Push attempt %d/%d failed, retrying in %.0fs",
+                    attempt,
+                    attempts,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+        logger.error("Push failed after %d attempts", attempts)
+        return False
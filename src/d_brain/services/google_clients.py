@@ -0,0 +1,186 @@
+"""Process-wide registry of Google API clients.
+
+googleapiclient.discovery.build() parses (and without a bundled copy,
+downloads) the API's discovery document on every call, and each service
+used to load the service-account credentials on its own. The registry
+keeps the parsed documents and one GoogleAuthService for the whole process.
+Documents come from the copies bundled with google-api-python-client, or
+from an on-disk cache filled on first use, so building a client after
+startup makes no network round trip.
+
+Client objects wrap an httplib2 connection, which is not thread-safe, so
+each thread gets its own client built from the shared document and
+credentials.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Self
+
+import httplib2
+from google.auth.transport.requests import Request
+from googleapiclient import discovery, discovery_cache
+
+from d_brain.services.google_auth import GoogleAuthService
+from d_brain.services.state import ensure_state_dir
+
+if TYPE_CHECKING:
+    from d_brain.config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class GoogleClientRegistry:
+    """Builds each Google API client once per thread from cached documents.
+
+    Used as an async context manager, the background token refresh runs
+    for the duration of the block.
+
+    Args:
+        credentials_path: Path to service account JSON file
+        discovery_dir: Directory for discovery documents that are not
+            bundled with the client library (default: not cached on disk)
+        refresh_margin: Seconds before expiry at which refresh_token()
+            renews the access token
+    """
+
+    def __init__(
+        self,
+        credentials_path: str | Path,
+        discovery_dir: Path | None = None,
+        refresh_margin: float = 600,
+    ) -> None:
+        self.auth = GoogleAuthService(credentials_path)
+        self.discovery_dir = discovery_dir
+        self.refresh_margin = refresh_margin
+
+        self._documents: dict[tuple[str, str], dict[str, Any]] = {}
+        self._documents_lock = threading.Lock()
+        self._local = threading.local()
+        self._refresh_task: asyncio.Task[None] | None = None
+
+    def service(self, api: str, version: str) -> Any:
+        """The calling thread's client for an API.
+
+        Args:
+            api: API name, e.g. "tasks"
+            version: API version, e.g. "v1"
+
+        Returns:
+            googleapiclient Resource
+        """
+        clients = self._local.__dict__.setdefault("clients", {})
+        key = (api, version)
+        if key not in clients:
+            clients[key] = discovery.build_from_document(
+                self._document(api, version), credentials=self.auth.credentials
+            )
+        return clients[key]
+
+    def refresh_token(self) -> bool:
+        """Renew the access token if it expires within refresh_margin.
+
+        Returns:
+            True if the token was refreshed
+        """
+        credentials = self.auth.credentials
+        expiry = credentials.expiry
+        if credentials.token and expiry is not None:
+            # google-auth keeps expiry as naive UTC
+            now = datetime.now(UTC).replace(tzinfo=None)
+            if expiry - now > timedelta(seconds=self.refresh_margin):
+                return False
+        credentials.refresh(Request())  # type: ignore[no-untyped-call]
+        logger.info("Google access token refreshed, expires %s", credentials.expiry)
+        return True
+
+    def start(self, interval: float = 60) -> None:
+        """Refresh the token in the background so requests never wait for it.
+
+        Does nothing without a credentials file; Google requests then fail
+        on their own when made.
+        """
+        if self._refresh_task is not None:
+            return
+        if not self.auth.credentials_path.exists():
+            logger.info(
+                "No Google credentials at %s, token refresh not started",
+                self.auth.credentials_path,
+            )
+            return
+        self._refresh_task = asyncio.create_task(
+            self._refresh_loop(interval), name="google-token-refresh"
+        )
+
+    async def stop(self) -> None:
+        """Stop the background refresh."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def _refresh_loop(self, interval: float) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh_token)
+            except Exception as e:
+                logger.warning("Google token refresh failed: %s", e)
+            await asyncio.sleep(interval)
+
+    def _document(self, api: str, version: str) -> dict[str, Any]:
+        key = (api, version)
+        with self._documents_lock:
+            if key not in self._documents:
+                self._documents[key] = json.loads(self._load_document(api, version))
+            return self._documents[key]
+
+    def _load_document(self, api: str, version: str) -> str:
+        """Discovery document: bundled, then cached on disk, then downloaded."""
+        content: str | None = discovery_cache.get_static_doc(api, version)
+        if content:
+            return content
+
+        cached = None
+        if self.discovery_dir is not None:
+            cached = self.discovery_dir / f"{api}.{version}.json"
+            if cached.exists():
+                return cached.read_text(encoding="utf-8")
+
+        url = discovery.V2_DISCOVERY_URI.format(api=api, apiVersion=version)
+        logger.info("Downloading discovery document for %s %s", api, version)
+        response, body = httplib2.Http(timeout=30).request(url)
+        if response.status >= 400:
+            raise RuntimeError(
+                f"Discovery document for {api} {version}: HTTP {response.status}"
+            )
+        content = body.decode("utf-8")
+        if cached is not None:
+            ensure_state_dir(cached.parent.parent)
+            cached.parent.mkdir(exist_ok=True)
+            cached.write_text(content, encoding="utf-8")
+        return content
+
+
+def create_google_clients(settings: "Settings") -> GoogleClientRegistry:
+    """Create the registry for settings; share one per process."""
+    return GoogleClientRegistry(
+        settings.google_credentials_path,
+        discovery_dir=settings.state_path / "discovery",
+    )
@@ -1,27 +1,39 @@
 """Google Keep service for saving notes."""
 
 import logging
+from typing import Any
 
-from googleapiclient.discovery import build
-
-from d_brain.services.google_auth import GoogleAuthService
+from d_brain.services.google_clients import GoogleClientRegistry
 
 logger = logging.getLogger(__name__)
 
+# Requests per batch HTTP call; Google allows up to 1000, fewer is kinder
+BATCH_SIZE = 100
+
 
 class GoogleKeepService:
     """Service for saving notes to Google Keep."""
 
-    def __init__(self, credentials_path: str) -> None:
+    def __init__(
+        self, credentials_path: str, registry: GoogleClientRegistry | None = None
+    ) -> None:
         """Initialize with Google credentials.
 
         Args:
             credentials_path: Path to service account JSON file
+            registry: Shared client registry (default: a private one)
         """
-        self.auth = GoogleAuthService(credentials_path)
-        self.service = build("keep", "v1", credentials=self.auth.credentials)
+        self.registry = registry or GoogleClientRegistry(credentials_path)
+        self.auth = self.registry.auth
 
-    def create_note(self, title: str, content: str, labels: list[str] = None) -> dict:
+    @property
+    def service(self) -> Any:
+        """Keep API client for the calling thread."""
+        return self.registry.service("keep", "v1")
+
+    def create_note(
+        self, title: str, content: str, labels: list[str] | None = None
+    ) -> dict[str, Any]:
         """Create a note in Google Keep.
 
         Args:
@@ -33,15 +45,8 @@ class GoogleKeepService:
             Created note object
         """
         try:
-            note_body = {
-                "title": title,
-                "body": {"text": {"text": content}},
-            }
-
-            if labels:
-                note_body["labels"] = {label: {} for label in labels}
-
-            note = self.service.notes().create(body=note_body).execute()
+            note_body = self._note_body(title, content, labels)
+            note: dict[str, Any] = self.service.notes().create(body=note_body).execute()
 
             logger.info("Created note: %s", note["name"])
             return note
@@ -49,3 +54,58 @@ class GoogleKeepService:
         except Exception as e:
             logger.error("Failed to create note: %s", e)
             raise
+
+    def create_notes(
+        self, notes: list[dict[str, Any]], batch_size: int = BATCH_SIZE
+    ) -> list[dict[str, Any] | Exception]:
+        """Create many notes with one batch HTTP request per batch_size notes.
+
+        Args:
+            notes: create_note() keyword arguments, one dict per note
+            batch_size: Creates per batch request
+
+        Returns:
+            For each note, in order, the created note object or the error
+            its request failed with
+        """
+        results: list[dict[str, Any] | Exception | None] = [None] * len(notes)
+
+        def collect(
+            request_id: str, response: Any, exception: Exception | None
+        ) -> None:
+            results[int(request_id)] = response if exception is None else exception
+
+        requests = 0
+        for offset in range(0, len(notes), batch_size):
+            batch = self.service.new_batch_http_request(callback=collect)
+            for i, note in enumerate(notes[offset : offset + batch_size], offset):
+                body = self._note_body(
+                    note["title"], note["content"], note.get("labels")
+                )
+                batch.add(self.service.notes().create(body=body), request_id=str(i))
+            try:
+                batch.execute()
+                requests += 1
+            except Exception as e:
+                logger.error("Batch note create failed: %s", e)
+                for i in range(offset, min(offset + batch_size, len(notes))):
+                    results[i] = e
+        logger.info("Sent %d notes in %d batch requests", len(notes), requests)
+        return [
+            RuntimeError("No response to batched note create")
+            if result is None
+            else result
+            for result in results
+        ]
+
+    @staticmethod
+    def _note_body(
+        title: str, content: str, labels: list[str] | None = None
+    ) -> dict[str, Any]:
+        note_body: dict[str, Any] = {
+            "title": title,
+            "body": {"text": {"text": content}},
+        }
+        if labels:
+            note_body["labels"] = {label: {} for label in labels}
+        return note_body
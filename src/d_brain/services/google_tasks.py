@@ -1,94 +1,166 @@
 """Google Tasks service for creating tasks."""
 
+import json
 import logging
-from typing import Union
+import os
+import threading
+from pathlib import Path
+from typing import Any
 
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
-from d_brain.services.google_auth import GoogleAuthService
+from d_brain.services.google_clients import GoogleClientRegistry
+from d_brain.services.state import ensure_state_dir
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TASKLIST = "Second Brain"
+
+# Requests per batch HTTP call; Google allows up to 1000, fewer is kinder
+BATCH_SIZE = 100
+
+# Lists for GTD routing (Settings.google_tasks_routing = "gtd")
+GTD_TASKLISTS = ("Next Actions", "Projects", "Waiting")
+
 
 class GoogleTasksService:
     """Service for creating tasks in Google Tasks."""
 
-    def __init__(self, credentials_path: str) -> None:
+    def __init__(
+        self,
+        credentials_path: str,
+        registry: GoogleClientRegistry | None = None,
+        cache_path: Path | None = None,
+    ) -> None:
         """Initialize with Google credentials.
 
         Args:
             credentials_path: Path to service account JSON file
+            registry: Shared client registry (default: a private one)
+            cache_path: JSON file remembering tasklist IDs by title, usually
+                under Settings.state_path (default: remember in memory only)
         """
-        self.auth = GoogleAuthService(credentials_path)
-        self.service = build("tasks", "v1", credentials=self.auth.credentials)
-        self._tasklist_id = None
+        self.registry = registry or GoogleClientRegistry(credentials_path)
+        self.auth = self.registry.auth
+        self.cache_path = cache_path
+        self._tasklist_ids: dict[str, str] = self._load_cache()
+        self._lock = threading.Lock()
 
-    def _get_tasklist(self) -> str:
-        """Get or create 'Second Brain' tasklist.
+    @property
+    def service(self) -> Any:
+        """Tasks API client for the calling thread."""
+        return self.registry.service("tasks", "v1")
+
+    def _get_tasklist(self, name: str = DEFAULT_TASKLIST) -> str:
+        """Get or create a tasklist by title.
+
+        The ID comes from the cache when known; it is only checked when a
+        request using it fails with 404 (see create_task).
+
+        Args:
+            name: Tasklist title
 
         Returns:
             Tasklist ID
         """
-        if self._tasklist_id:
-            return self._tasklist_id
+        with self._lock:
+            if name in self._tasklist_ids:
+                return self._tasklist_ids[name]
+
+            try:
+                # One listing resolves every list we may route to later
+                found = self._list_tasklists()
+                for title in (DEFAULT_TASKLIST, *GTD_TASKLISTS):
+                    if title in found:
+                        self._tasklist_ids[title] = found[title]
+
+                if name in self._tasklist_ids:
+                    logger.info("Found existing tasklist %s", name)
+                else:
+                    new_list = self.service.tasklists().insert(
+                        body={"title": name}
+                    ).execute()
+                    self._tasklist_ids[name] = new_list["id"]
+                    logger.info("Created new tasklist %s", name)
+
+                self._save_cache()
+                return self._tasklist_ids[name]
 
+            except Exception as e:
+                logger.error("Failed to get tasklist: %s", e)
+                raise
+
+    def _forget_tasklist(self, name: str) -> None:
+        """Drop a cached ID that the API no longer knows."""
+        with self._lock:
+            if self._tasklist_ids.pop(name, None) is not None:
+                logger.info("Tasklist %s is gone, resolving it again", name)
+                self._save_cache()
+
+    def _list_tasklists(self) -> dict[str, str]:
+        """All tasklist IDs by title, following pagination."""
+        found: dict[str, str] = {}
+        page_token = None
+        while True:
+            results = (
+                self.service.tasklists()
+                .list(maxResults=100, pageToken=page_token)
+                .execute()
+            )
+            for tasklist in results.get("items", []):
+                found.setdefault(tasklist["title"], tasklist["id"])
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                return found
+
+    def _load_cache(self) -> dict[str, str]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
         try:
-            # Get tasklists
-            results = self.service.tasklists().list().execute()
-            tasklists = results.get("items", [])
-
-            # Find or create "Second Brain" list
-            for tasklist in tasklists:
-                if tasklist["title"] == "Second Brain":
-                    self._tasklist_id = tasklist["id"]
-                    logger.info("Found existing tasklist: %s", self._tasklist_id)
-                    return self._tasklist_id
-
-            # Create new tasklist
-            new_list = self.service.tasklists().insert(
-                body={"title": "Second Brain"}
-            ).execute()
-            self._tasklist_id = new_list["id"]
-            logger.info("Created new tasklist: %s", self._tasklist_id)
-            return self._tasklist_id
+            cached = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable tasklist cache: %s", e)
+            return {}
+        return cached if isinstance(cached, dict) else {}
 
-        except Exception as e:
-            logger.error("Failed to get tasklist: %s", e)
-            raise
+    def _save_cache(self) -> None:
+        if self.cache_path is None:
+            return
+        ensure_state_dir(self.cache_path.parent)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._tasklist_ids, ensure_ascii=False), "utf-8")
+        os.replace(tmp, self.cache_path)
 
     def create_task(
-        self, title: str, notes: str = "", due_date: str = ""
-    ) -> dict:
+        self,
+        title: str,
+        notes: str = "",
+        due_date: str = "",
+        list_name: str = DEFAULT_TASKLIST,
+    ) -> dict[str, Any]:
         """Create a task in Google Tasks.
 
+        With the tasklist ID cached this is a single API call. If the
+        cached list was deleted, it is resolved again and the insert retried.
+
         Args:
             title: Task title
             notes: Task notes/description
             due_date: Due date in YYYY-MM-DD format (will be converted to RFC 3339)
+            list_name: Title of the tasklist (created if missing)
 
         Returns:
             Created task object
         """
         try:
-            tasklist_id = self._get_tasklist()
-
-            task_body = {"title": title}
-            if notes:
-                task_body["notes"] = notes
-            if due_date:
-                # Convert YYYY-MM-DD to RFC 3339 format (required by Google Tasks API)
-                # The API expects format like "2026-02-25T00:00:00Z"
-                if len(due_date) == 10:  # YYYY-MM-DD format
-                    task_body["due"] = f"{due_date}T00:00:00Z"
-                else:
-                    task_body["due"] = due_date
-
-            task = (
-                self.service.tasks()
-                .insert(tasklist=tasklist_id, body=task_body)
-                .execute()
-            )
+            task_body = self._task_body(title, notes, due_date)
+            try:
+                task = self._insert_task(list_name, task_body)
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+                self._forget_tasklist(list_name)
+                task = self._insert_task(list_name, task_body)
 
             logger.info("Created task: %s", task["id"])
             return task
@@ -96,3 +168,113 @@ class GoogleTasksService:
         except Exception as e:
             logger.error("Failed to create task: %s", e)
             raise
+
+    def create_tasks(
+        self, tasks: list[dict[str, Any]], batch_size: int = BATCH_SIZE
+    ) -> list[dict[str, Any] | Exception]:
+        """Create many tasks with one batch HTTP request per batch_size tasks.
+
+        Args:
+            tasks: create_task() keyword arguments, one dict per task
+            batch_size: Inserts per batch request
+
+        Returns:
+            For each task, in order, the created task object or the error
+            its insert failed with
+        """
+        bodies = [
+            self._task_body(t["title"], t.get("notes", ""), t.get("due_date", ""))
+            for t in tasks
+        ]
+        names = [t.get("list_name", DEFAULT_TASKLIST) for t in tasks]
+        results: list[dict[str, Any] | Exception | None] = [None] * len(tasks)
+
+        pending = list(range(len(tasks)))
+        for attempt in range(2):
+            self._insert_batches(pending, names, bodies, results, batch_size)
+
+            # Lists deleted since their ID was cached: resolve again, retry once
+            pending = [i for i in pending if _not_found(results[i])]
+            if attempt or not pending:
+                break
+            for name in {names[i] for i in pending}:
+                self._forget_tasklist(name)
+
+        return [
+            RuntimeError("No response to batched task insert")
+            if result is None
+            else result
+            for result in results
+        ]
+
+    def _insert_batches(
+        self,
+        indexes: list[int],
+        names: list[str],
+        bodies: list[dict[str, Any]],
+        results: list[dict[str, Any] | Exception | None],
+        batch_size: int,
+    ) -> None:
+        """Insert the given tasks in batches, storing each outcome in results.
+
+        An insert whose callback never fires leaves its slot None.
+        """
+
+        def collect(
+            request_id: str, response: Any, exception: Exception | None
+        ) -> None:
+            results[int(request_id)] = response if exception is None else exception
+
+        requests = 0
+        for offset in range(0, len(indexes), batch_size):
+            chunk = indexes[offset : offset + batch_size]
+            batch = self.service.new_batch_http_request(callback=collect)
+            queued = []
+            for i in chunk:
+                results[i] = None  # Drop the outcome of an earlier attempt
+                try:
+                    tasklist_id = self._get_tasklist(names[i])
+                except Exception as e:
+                    results[i] = e
+                    continue
+                batch.add(
+                    self.service.tasks().insert(tasklist=tasklist_id, body=bodies[i]),
+                    request_id=str(i),
+                )
+                queued.append(i)
+            if not queued:
+                continue
+            try:
+                batch.execute()
+                requests += 1
+            except Exception as e:
+                logger.error("Batch task insert failed: %s", e)
+                for i in queued:
+                    results[i] = e
+        logger.info("Sent %d task inserts in %d batch requests", len(indexes), requests)
+
+    @staticmethod
+    def _task_body(title: str, notes: str = "", due_date: str = "") -> dict[str, Any]:
+        task_body = {"title": title}
+        if notes:
+            task_body["notes"] = notes
+        if due_date:
+            # Convert YYYY-MM-DD to RFC 3339 format (required by Google Tasks API)
+            # The API expects format like "2026-02-25T00:00:00Z"
+            if len(due_date) == 10:  # YYYY-MM-DD format
+                task_body["due"] = f"{due_date}T00:00:00Z"
+            else:
+                task_body["due"] = due_date
+        return task_body
+
+    def _insert_task(self, list_name: str, task_body: dict[str, Any]) -> dict[str, Any]:
+        task: dict[str, Any] = (
+            self.service.tasks()
+            .insert(tasklist=self._get_tasklist(list_name), body=task_body)
+            .execute()
+        )
+        return task
+
+
+def _not_found(result: Any) -> bool:
+    return isinstance(result, HttpError) and result.resp.status == 404
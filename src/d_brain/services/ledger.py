@@ -0,0 +1,132 @@
+"""Persistent ledger of processed entries.
+
+Keyed by a hash of the user ID and the normalized entry text, so the same
+thought sent twice by one user, or a rerun of the daily processor, finds
+the earlier classification
+and the ID of the task or note created for it instead of calling Claude and
+Google again. Entries expire after a TTL and the oldest are evicted beyond a
+size cap.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from d_brain.services.state import ensure_state_dir
+
+if TYPE_CHECKING:
+    from d_brain.config import Settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed (
+    text_hash TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    item_id TEXT,
+    processed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_processed_at ON processed (processed_at);
+"""
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Case, whitespace and trailing punctuation do not make a new entry."""
+    text = _SPACES.sub(" ", text.lower().replace("ё", "е")).strip()
+    return text.rstrip(".!;")
+
+
+def text_hash(text: str, user_id: int | None = None) -> str:
+    """SHA-256 hex digest of the normalized text, scoped to a user if given."""
+    key = normalize_text(text)
+    if user_id is not None:
+        key = f"{user_id}:{key}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class ProcessingLedger:
+    """SQLite ledger of entries already classified and created.
+
+    Args:
+        db_path: Database file, usually under Settings.state_path
+        ttl_days: Days an entry is remembered
+        max_entries: Number of entries kept
+    """
+
+    def __init__(
+        self,
+        db_path: Path | str,
+        ttl_days: float = 30,
+        max_entries: int = 5000,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        ensure_state_dir(self.db_path.parent)
+
+        self._conn = sqlite3.connect(self.db_path, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def get(self, text: str, user_id: int = 0) -> dict[str, Any] | None:
+        """Earlier result for a user's entry, or None if unseen or expired."""
+        row = self._conn.execute(
+            "SELECT result FROM processed WHERE text_hash = ? AND processed_at >= ?",
+            (text_hash(text, user_id), time.time() - self.ttl),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, text: str, result: dict[str, Any], user_id: int = 0) -> None:
+        """Record a processed entry and evict expired or excess entries.
+
+        Args:
+            text: Entry text
+            result: Processing report; its "item_id" is stored alongside
+            user_id: Telegram user ID the entry came from (0 = system)
+        """
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO processed "
+                "(text_hash, result, item_id, processed_at) VALUES (?, ?, ?, ?)",
+                (
+                    text_hash(text, user_id),
+                    json.dumps(result, ensure_ascii=False),
+                    result.get("item_id"),
+                    now,
+                ),
+            )
+            evicted = self._conn.execute(
+                "DELETE FROM processed WHERE processed_at < ?", (now - self.ttl,)
+            ).rowcount
+            evicted += self._conn.execute(
+                "DELETE FROM processed WHERE text_hash NOT IN ("
+                "SELECT text_hash FROM processed "
+                "ORDER BY processed_at DESC LIMIT ?)",
+                (self.max_entries,),
+            ).rowcount
+        if evicted:
+            logger.debug("Evicted %d ledger entries", evicted)
+
+
+def create_ledger(settings: "Settings") -> ProcessingLedger | None:
+    """Create the ledger configured in settings, or None if disabled."""
+    if settings.ledger_max_entries <= 0:
+        return None
+    return ProcessingLedger(
+        settings.ledger_path,
+        ttl_days=settings.ledger_ttl_days,
+        max_entries=settings.ledger_max_entries,
+    )
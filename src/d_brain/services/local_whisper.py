@@ -0,0 +1,140 @@
+"""Local CPU transcription with faster-whisper (CTranslate2).
+
+Optional: install with ``pip install "agent-second-brain[local]"``. Models
+are loaded from a directory already on disk (a CTranslate2 conversion such
+as Systran/faster-whisper-small) or by name from the local model cache.
+
+Inference runs in a dedicated process pool so it never blocks the bot's
+event loop. Each worker process loads the model once, in its initializer,
+and keeps it for its whole life.
+"""
+
+import asyncio
+import importlib.util
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Model loaded in each worker process by _init_worker
+_model: Any = None
+
+
+def _init_worker(model: str, cpu_threads: int, compute_type: str) -> None:
+    global _model
+    from faster_whisper import WhisperModel
+
+    _model = WhisperModel(
+        model,
+        device="cpu",
+        cpu_threads=cpu_threads,
+        compute_type=compute_type,
+        local_files_only=True,
+    )
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _transcribe(audio: bytes | str, language: str, beam_size: int) -> str:
+    source = io.BytesIO(audio) if isinstance(audio, bytes) else audio
+    segments, _ = _model.transcribe(
+        source, language=language, beam_size=beam_size, vad_filter=True
+    )
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+class LocalWhisperBackend:
+    """faster-whisper running in a pool of warm worker processes.
+
+    Args:
+        model: Path to a model directory, or a model name in the local cache
+        workers: Number of worker processes (each holds its own model copy)
+        cpu_threads: Inference threads per worker
+        compute_type: CTranslate2 quantization, e.g. "int8" or "float32"
+        language: Spoken language
+        beam_size: Beam search width (1 is greedy and fastest)
+    """
+
+    def __init__(
+        self,
+        model: str,
+        workers: int = 1,
+        cpu_threads: int = 4,
+        compute_type: str = "int8",
+        language: str = "ru",
+        beam_size: int = 5,
+    ) -> None:
+        if importlib.util.find_spec("faster_whisper") is None:
+            raise RuntimeError(
+                "Local transcription needs faster-whisper: "
+                'pip install "agent-second-brain[local]"'
+            )
+        if Path(model).expanduser().exists():
+            model = str(Path(model).expanduser())
+
+        self.model = model
+        self.workers = workers
+        self.cpu_threads = cpu_threads
+        self.compute_type = compute_type
+        self.language = language
+        self.beam_size = beam_size
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def start(self) -> None:
+        """Spawn the worker processes and wait until every model is loaded."""
+        if self._executor is not None:
+            return
+
+        # spawn, not fork: the bot process has an event loop and threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model, self.cpu_threads, self.compute_type),
+        )
+
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(
+            *(
+                loop.run_in_executor(self._executor, _ping)
+                for _ in range(self.workers)
+            )
+        )
+        logger.info(
+            "Local Whisper model %s loaded in %d worker(s): %s",
+            self.model,
+            len(set(pids)),
+            sorted(set(pids)),
+        )
+
+    async def transcribe(self, audio: bytes | Path) -> str:
+        """Transcribe audio in a worker process.
+
+        Args:
+            audio: Audio content, or an audio file (read by the worker)
+
+        Returns:
+            Transcribed text
+        """
+        if self._executor is None:
+            await self.start()
+        assert self._executor is not None
+
+        source = str(audio) if isinstance(audio, Path) else audio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, _transcribe, source, self.language, self.beam_size
+        )
+
+    async def aclose(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
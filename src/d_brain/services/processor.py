@@ -1,5 +1,6 @@
 """Claude processing service."""
 
+import json
 import logging
 import os
 import subprocess
@@ -8,6 +9,7 @@ from pathlib import Path
 from typing import Any, Union, Optional
 
 from d_brain.services.session import SessionStore
+from d_brain.services.session_sqlite import SQLiteSessionStore
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +19,20 @@ DEFAULT_TIMEOUT = 1200  # 20 minutes
 class ClaudeProcessor:
     """Service for triggering Claude Code processing."""
 
-    def __init__(self, vault_path: Path) -> None:
+    def __init__(
+        self,
+        vault_path: Path,
+        session: SessionStore | SQLiteSessionStore | None = None,
+    ) -> None:
+        """Initialize with vault path.
+
+        Args:
+            vault_path: Path to vault directory
+            session: Session store for context, usually from
+                create_session_store() (default: JSONL store in vault)
+        """
         self.vault_path = Path(vault_path)
+        self.session = session or SessionStore(self.vault_path)
         self._mcp_config_path = (self.vault_path.parent / "mcp-config.json").resolve()
 
     def _load_skill_content(self) -> str:
@@ -58,8 +72,7 @@ class ClaudeProcessor:
         if user_id == 0:
             return ""
 
-        session = SessionStore(self.vault_path)
-        today_entries = session.get_today(user_id)
+        today_entries = self.session.get_today(user_id)
         if not today_entries:
             return ""
 
@@ -73,6 +86,28 @@ class ClaudeProcessor:
         lines.append("=== END SESSION ===\n")
         return "\n".join(lines)
 
+    def _parse_json_output(self, stdout: str) -> str:
+        """Extract the reply from `claude --output-format json` and log usage.
+
+        Falls back to the raw output if it is not the expected JSON.
+        """
+        try:
+            data = json.loads(stdout)
+        except json.JSONDecodeError:
+            return stdout.strip()
+        if not isinstance(data, dict) or "result" not in data:
+            return stdout.strip()
+
+        usage = data.get("usage") or {}
+        logger.info(
+            "Claude usage: %d input, %d cache read, %d cache write, %d output tokens",
+            usage.get("input_tokens", 0),
+            usage.get("cache_read_input_tokens", 0),
+            usage.get("cache_creation_input_tokens", 0),
+            usage.get("output_tokens", 0),
+        )
+        return str(data["result"]).strip()
+
     def _html_to_markdown(self, html: str) -> str:
         """Convert Telegram HTML to Markdown."""
         import re
@@ -234,13 +269,12 @@ CRITICAL OUTPUT FORMAT:
         notes_ref = self._load_apple_notes_reference()
         session_context = self._get_session_context(user_id)
 
-        prompt = f"""Ты - персональный ассистент d-brain. Используешь GTD-методологию.
+        # Static instructions go into the system prompt, which Claude caches
+        # between calls; only the date, session and request below it change
+        system_prompt = f"""Ты - персональный ассистент d-brain. Используешь \
+GTD-методологию.
 
-CONTEXT:
-- Текущая дата: {today}
-- Vault path: {self.vault_path}
-
-{session_context}=== APPLE REMINDERS REFERENCE ===
+=== APPLE REMINDERS REFERENCE ===
 {reminders_ref}
 === END REFERENCE ===
 
@@ -248,16 +282,15 @@ CONTEXT:
 {notes_ref}
 === END REFERENCE ===
 
-ПЕРВЫМ ДЕЛОМ: вызови mcp__apple-events__reminders_lists action:read чтобы убедиться что MCP работает.
+ПЕРВЫМ ДЕЛОМ: вызови mcp__apple-events__reminders_lists action:read чтобы убедиться \
+что MCP работает.
 
 CRITICAL MCP RULE:
-- ТЫ ИМЕЕШЬ ДОСТУП к mcp__apple-events__* и mcp__Read_and_Write_Apple_Notes__* tools — ВЫЗЫВАЙ ИХ НАПРЯМУЮ
+- ТЫ ИМЕЕШЬ ДОСТУП к mcp__apple-events__* и mcp__Read_and_Write_Apple_Notes__* tools — \
+ВЫЗЫВАЙ ИХ НАПРЯМУЮ
 - НИКОГДА не пиши "MCP недоступен" или "добавь вручную"
 - Если tool вернул ошибку — покажи ТОЧНУЮ ошибку в отчёте
 
-USER REQUEST:
-{user_prompt}
-
 CRITICAL OUTPUT FORMAT:
 - Return ONLY raw HTML for Telegram (parse_mode=HTML)
 - NO markdown: no **, no ##, no ```, no tables, no -
@@ -267,9 +300,17 @@ CRITICAL OUTPUT FORMAT:
 
 EXECUTION:
 1. Analyze the request
-2. Call MCP tools directly (mcp__apple-events__*, mcp__Read_and_Write_Apple_Notes__*, read/write files)
+2. Call MCP tools directly (mcp__apple-events__*, mcp__Read_and_Write_Apple_Notes__*, \
+read/write files)
 3. Return HTML status report with results"""
 
+        prompt = f"""CONTEXT:
+- Текущая дата: {today}
+- Vault path: {self.vault_path}
+
+{session_context}USER REQUEST:
+{user_prompt}"""
+
         try:
             env = os.environ.copy()
 
@@ -280,6 +321,10 @@ EXECUTION:
                     "--dangerously-skip-permissions",
                     "--mcp-config",
                     str(self._mcp_config_path),
+                    "--append-system-prompt",
+                    system_prompt,
+                    "--output-format",
+                    "json",
                     "-p",
                     prompt,
                 ],
@@ -299,7 +344,7 @@ EXECUTION:
                 }
 
             return {
-                "report": result.stdout.strip(),
+                "report": self._parse_json_output(result.stdout),
                 "processed_entries": 1,
             }
 
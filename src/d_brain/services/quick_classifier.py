@@ -0,0 +1,193 @@
+"""Deterministic fast-path classifier for obvious entries.
+
+Entries like "купить молоко", "позвонить Ивану завтра" or "Контакт: ..."
+don't need a language model. quick_classify() applies keyword, verb and
+date-phrase rules and returns a classification in the same schema as the
+Claude prompt (task/note/waiting/someday) plus a confidence score; callers
+send the entry to Claude only when the confidence is below their threshold.
+"""
+
+import re
+from datetime import date, timedelta
+from typing import Any
+
+# Infinitives and common imperatives that make an entry actionable
+ACTION_VERBS = {
+    "купить", "купи", "позвонить", "позвони", "набрать", "написать", "напиши",
+    "оплатить", "оплати", "заплатить", "отправить", "отправь", "заказать",
+    "закажи", "забрать", "забери", "записаться", "запиши", "сделать", "сделай",
+    "починить", "проверить", "проверь", "ответить", "ответь", "встретиться",
+    "назначить", "отнести", "отвезти", "подготовить", "подготовь",
+    "отменить", "продлить", "сдать", "получить", "договориться", "уточнить",
+    "спросить", "узнать", "поменять", "заменить", "установить", "обновить",
+    "скачать", "распечатать", "помыть", "убрать", "постирать", "приготовить",
+    "почистить", "вернуть", "перевести", "сходить", "съездить", "прочитать",
+    "посмотреть", "забронировать", "зарегистрироваться", "напомнить",
+}  # fmt: skip
+
+PHONE_VERBS = {"позвонить", "позвони", "набрать"}
+COMPUTER_VERBS = {
+    "написать", "напиши", "отправить", "отправь", "скачать", "обновить",
+    "установить", "забронировать", "зарегистрироваться",
+}  # fmt: skip
+
+# Lead-ins that are followed by an action ("надо купить ...")
+OBLIGATION_WORDS = {"надо", "нужно", "необходимо", "не забыть", "не забудь"}
+
+NOTE_PREFIXES = ("контакт:", "идея:", "заметка:", "справка:", "ссылка:", "инфо:")
+SOMEDAY_MARKERS = ("когда-нибудь", "может быть", "в будущем", "было бы неплохо")
+WAITING_MARKERS = ("жду ", "ждём ", "ждем ", "ждать ответ", "ожидаю", "как только")
+HIGH_PRIORITY_MARKERS = ("срочно", "важно", "asap", "горит")
+
+WEEKDAYS = {
+    "понедельник": 0, "вторник": 1, "сред": 2, "четверг": 3,
+    "пятниц": 4, "суббот": 5, "воскресень": 6,
+}  # fmt: skip
+
+_WORD = re.compile(r"[а-яёa-z-]+", re.IGNORECASE)
+_DAY_OF_MONTH = re.compile(r"\bдо (\d{1,2})(?:-?го)?(?: числа)?\b")
+_IN_DAYS = re.compile(r"\bчерез (\d{1,2}) (?:день|дня|дней)\b")
+_WAITING_FROM = re.compile(r"\bот ([А-ЯЁA-Z][\w-]+)")
+_URL = re.compile(r"https?://\S+")
+
+
+def _next_weekday(today: date, weekday: int) -> date:
+    """Next date with the given weekday, today excluded."""
+    days = (weekday - today.weekday()) % 7 or 7
+    return today + timedelta(days=days)
+
+
+def parse_due_date(text: str, today: date) -> date | None:
+    """Resolve a Russian due-date phrase the way the Claude prompt asks to.
+
+    Args:
+        text: Entry text, lowercased
+        today: Reference date
+
+    Returns:
+        Due date, or None if the text has no recognized date phrase
+    """
+    if "послезавтра" in text:
+        return today + timedelta(days=2)
+    if "завтра" in text:
+        return today + timedelta(days=1)
+    if "сегодня" in text:
+        return today
+    if "на следующей неделе" in text:
+        return _next_weekday(today, 0)
+    if "на этой неделе" in text:
+        return today + timedelta(days=6 - today.weekday())
+
+    if match := _IN_DAYS.search(text):
+        return today + timedelta(days=int(match.group(1)))
+
+    if match := _DAY_OF_MONTH.search(text):
+        day = int(match.group(1))
+        year, month = today.year, today.month
+        if day < today.day:
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
+
+    for stem, weekday in WEEKDAYS.items():
+        if re.search(rf"\b(?:до|в|во|к|на) {stem}", text):
+            return _next_weekday(today, weekday)
+    return None
+
+
+def _title(text: str) -> str:
+    title = text.strip().rstrip(".!")
+    if len(title) > 60:
+        title = title[:57].rstrip() + "..."
+    return title[:1].upper() + title[1:]
+
+
+def quick_classify(text: str, today: date | None = None) -> dict[str, Any] | None:
+    """Classify an entry with deterministic rules.
+
+    Args:
+        text: Entry text
+        today: Reference date for due dates (default: today)
+
+    Returns:
+        Classification dict with a "confidence" between 0 and 1, or None if
+        no rule applies
+    """
+    today = today or date.today()
+    stripped = text.strip()
+    lowered = stripped.lower()
+    words = _WORD.findall(lowered)
+    if not words:
+        return None
+
+    result: dict[str, Any] | None = None
+
+    if lowered.startswith("проект:"):
+        result = {"type": "task", "is_project": True, "confidence": 0.9}
+    elif lowered.startswith(NOTE_PREFIXES):
+        result = {"type": "note", "tags": [lowered.split(":", 1)[0]], "confidence": 0.9}
+    elif any(marker in lowered for marker in SOMEDAY_MARKERS):
+        result = {"type": "someday", "tags": ["идея"], "confidence": 0.85}
+    elif any(lowered.startswith(m) or f" {m}" in lowered for m in WAITING_MARKERS):
+        match = _WAITING_FROM.search(stripped)
+        result = {
+            "type": "waiting",
+            "waiting_for": match.group(1) if match else "ответ",
+            "confidence": 0.85,
+        }
+    else:
+        lead = " ".join(words[:2])
+        verb_index = next(
+            (i for i, word in enumerate(words[:4]) if word in ACTION_VERBS), None
+        )
+        if verb_index == 0:
+            confidence = 0.9
+        elif verb_index is not None and (
+            words[0] in OBLIGATION_WORDS or lead in OBLIGATION_WORDS
+        ):
+            confidence = 0.85
+        elif verb_index is not None:
+            confidence = 0.7
+        else:
+            confidence = 0.0
+
+        if verb_index is not None:
+            verb = words[verb_index]
+            result = {
+                "type": "task",
+                "is_project": False,
+                "context": "@phone" if verb in PHONE_VERBS
+                else "@computer" if verb in COMPUTER_VERBS
+                else None,
+                "confidence": confidence,
+            }
+        elif _URL.fullmatch(stripped):
+            result = {"type": "note", "tags": ["ссылка"], "confidence": 0.85}
+
+    if result is None:
+        return None
+
+    # Long, multi-sentence or questioning entries are where rules go wrong
+    sentences = [s for s in re.split(r"[.!?]+\s", stripped) if s]
+    if len(sentences) > 1 or len(stripped) > 140:
+        result["confidence"] *= 0.7
+    if "?" in stripped:
+        result["confidence"] *= 0.8
+
+    result["title"] = _title(stripped)
+    result["content"] = stripped
+
+    if result["type"] in ("task", "waiting"):
+        due = parse_due_date(lowered, today)
+        result["due_date"] = due.isoformat() if due else None
+    if result["type"] == "task":
+        high = any(marker in lowered for marker in HIGH_PRIORITY_MARKERS)
+        result["priority"] = "high" if high else "medium"
+        if result.get("context") is None:
+            result.pop("context", None)
+
+    result["confidence"] = round(result["confidence"], 2)
+    result["classifier"] = "rules"
+    return result
@@ -2,46 +2,192 @@
 
 Stores all bot interactions in JSONL format for history and analytics.
 Inspired by Clawdbot's session persistence pattern.
+
+Layout (one directory per user, one segment per local day):
+
+    vault/.sessions/{user_id}/YYYY-MM-DD.jsonl
+    vault/.sessions/{user_id}/index.json   # segment time ranges and counters
+    vault/.sessions/{user_id}/unparsed.jsonl  # legacy lines without a ts
 """
 
+import hashlib
 import json
-from datetime import datetime
+import logging
+import os
+import shutil
+from collections.abc import Awaitable, Iterable, Iterator
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any, Union
+from typing import TYPE_CHECKING, Any, Union
+
+from d_brain.services.writer import ALREADY_DURABLE, VaultWriter
+
+if TYPE_CHECKING:
+    from d_brain.config import Settings
+    from d_brain.services.session_sqlite import SQLiteSessionStore
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_SIZE = 8192
+INDEX_FILENAME = "index.json"
+# Legacy lines without a usable timestamp, kept verbatim during migration
+UNPARSED_FILENAME = "unparsed.jsonl"
+# Written into a migrated directory until the legacy file is removed
+MIGRATED_MARKER = ".migrated-from"
+
+
+def read_lines_reversed(path: Path, block_size: int = READ_BLOCK_SIZE) -> Iterator[str]:
+    """Yield lines of a file from last to first.
+
+    Reads fixed-size blocks backwards from the end of the file, so the cost
+    depends on how many lines the caller consumes, not on the file size.
+    """
+    with path.open("rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + remainder).split(b"\n")
+            # First piece may be the tail of a line that starts in an earlier block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                yield line.decode("utf-8", errors="replace")
+        yield remainder.decode("utf-8", errors="replace")
+
+
+def _parse_ts(value: str) -> datetime | None:
+    """Parse entry timestamp as an aware datetime (naive = local time)."""
+    try:
+        ts = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return ts if ts.tzinfo else ts.astimezone()
+
+
+def _as_aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.astimezone()
+
+
+def create_session_store(
+    settings: "Settings",
+    writer: VaultWriter | None = None,
+) -> "SessionStore | SQLiteSessionStore":
+    """Create the session store backend selected in settings.
+
+    The bot creates one store at startup and shares it between handlers.
+
+    Args:
+        settings: Application settings (uses session_backend)
+        writer: Batched writer for JSONL appends (ignored by SQLite)
+
+    Returns:
+        JSONL or SQLite session store with the same query API
+    """
+    if settings.session_backend == "sqlite":
+        from d_brain.services.session_sqlite import SQLiteSessionStore
+
+        return SQLiteSessionStore(settings.session_db_path)
+    return SessionStore(settings.vault_path, writer=writer)
 
 
 class SessionStore:
     """Persistent session storage in JSONL format.
 
-    Each user gets their own session file at vault/.sessions/{user_id}.jsonl.
+    Each user's history is split into daily segments under
+    vault/.sessions/{user_id}/, with a small index of each segment's time
+    range. Range queries open only the segments that overlap the range.
     Entries are append-only for reliability and simplicity.
+
+    The index also keeps per-day counts by entry type, updated on every
+    append, so usage statistics never need to read the segments.
+
+    Legacy single-file histories (vault/.sessions/{user_id}.jsonl) are
+    migrated to segments on first access.
+
+    With a VaultWriter attached, segment appends are group-committed by the
+    writer task; the index is still updated synchronously so counters never
+    lag behind appends.
+
+    One store is shared by all handlers; take_touched_paths() hands each
+    handler the files written for its user since the last call.
     """
 
-    def __init__(self, vault_path: Union[Path, str]) -> None:
+    def __init__(
+        self, vault_path: Union[Path, str], writer: VaultWriter | None = None
+    ) -> None:
         self.sessions_dir = Path(vault_path) / ".sessions"
+        self.writer = writer
         self.sessions_dir.mkdir(exist_ok=True)
+        # Files written per user, for path-scoped git commits
+        self._touched: dict[int, set[Path]] = {}
+
+    def close(self) -> None:
+        """Nothing to release; segments are opened per call."""
+
+    def take_touched_paths(self, user_id: int) -> set[Path]:
+        """Files written for a user since the last call, for git commits."""
+        return self._touched.pop(user_id, set())
 
-    def _get_session_file(self, user_id: int) -> Path:
+    def _touch(self, user_id: int, path: Path) -> None:
+        self._touched.setdefault(user_id, set()).add(path)
+
+    def _get_legacy_file(self, user_id: int) -> Path:
         return self.sessions_dir / f"{user_id}.jsonl"
 
-    def append(self, user_id: int, entry_type: str, **data: Any) -> None:
-        """Append entry to user's session file.
+    def _get_user_dir(self, user_id: int) -> Path:
+        legacy = self._get_legacy_file(user_id)
+        if legacy.exists():
+            self.migrate_legacy(user_id)
+        return self.sessions_dir / str(user_id)
+
+    def _get_segment_file(self, user_dir: Path, day: str) -> Path:
+        return user_dir / f"{day}.jsonl"
+
+    def append(self, user_id: int, entry_type: str, **data: Any) -> Awaitable[None]:
+        """Append entry to user's session segment for today.
 
         Args:
             user_id: Telegram user ID
             entry_type: Type of entry (voice, text, photo, forward, command, etc.)
             **data: Additional data to store (text, duration, msg_id, etc.)
+
+        Returns:
+            Awaitable that completes once the entry is durable
         """
         entry = {
             "ts": datetime.now().astimezone().isoformat(),
             "type": entry_type,
             **data,
         }
-        path = self._get_session_file(user_id)
-        with path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        user_dir = self._get_user_dir(user_id)
+        user_dir.mkdir(exist_ok=True)
+        # Load before writing so a rebuilt index doesn't count this entry twice
+        index = self._load_index(user_dir)
+
+        day = entry["ts"][:10]
+        path = self._get_segment_file(user_dir, day)
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        self._touch(user_id, path)
+        written: Awaitable[None]
+        if self.writer is not None:
+            written = self.writer.append(path, line)
+        else:
+            with path.open("a", encoding="utf-8") as f:
+                f.write(line)
+            written = ALREADY_DURABLE
+
+        segment = index.setdefault(
+            day, {"first": entry["ts"], "count": 0, "types": {}}
+        )
+        segment["last"] = entry["ts"]
+        segment["count"] += 1
+        segment["types"][entry_type] = segment["types"].get(entry_type, 0) + 1
+        self._save_index(user_dir, index)
+        return written
 
-    def get_recent(self, user_id: int, limit: int = 50) -> list[dict]:
+    def get_recent(self, user_id: int, limit: int = 50) -> list[dict[str, Any]]:
         """Get recent session entries.
 
         Args:
@@ -51,22 +197,54 @@ class SessionStore:
         Returns:
             List of session entries, most recent last
         """
-        path = self._get_session_file(user_id)
-        if not path.exists():
-            return []
+        user_dir = self._get_user_dir(user_id)
+        entries: list[dict[str, Any]] = []
+        for day in sorted(self._load_index(user_dir), reverse=True):
+            path = self._get_segment_file(user_dir, day)
+            for entry in self._read_segment_reversed(path):
+                if len(entries) >= limit:
+                    break
+                entries.append(entry)
+            if len(entries) >= limit:
+                break
 
-        entries = []
-        with path.open("r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        entries.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue  # Skip malformed lines
+        entries.reverse()
+        return entries
 
-        return entries[-limit:]
+    def get_range(
+        self, user_id: int, start: datetime, end: datetime
+    ) -> list[dict[str, Any]]:
+        """Get session entries with start <= ts < end.
 
-    def get_today(self, user_id: int) -> list[dict]:
+        Only segments whose indexed time range overlaps the query are opened.
+
+        Args:
+            user_id: Telegram user ID
+            start: Range start (naive datetimes are treated as local time)
+            end: Range end, exclusive
+
+        Returns:
+            List of session entries, oldest first
+        """
+        start, end = _as_aware(start), _as_aware(end)
+        user_dir = self._get_user_dir(user_id)
+
+        entries: list[dict[str, Any]] = []
+        for day, segment in sorted(self._load_index(user_dir).items()):
+            first = _parse_ts(segment.get("first", ""))
+            last = _parse_ts(segment.get("last", ""))
+            if first is None or last is None or last < start or first >= end:
+                continue
+
+            path = self._get_segment_file(user_dir, day)
+            for entry in self._read_segment(path):
+                ts = _parse_ts(entry.get("ts", ""))
+                if ts is not None and start <= ts < end:
+                    entries.append(entry)
+
+        return entries
+
+    def get_today(self, user_id: int) -> list[dict[str, Any]]:
         """Get today's session entries.
 
         Args:
@@ -75,32 +253,297 @@ class SessionStore:
         Returns:
             List of today's entries
         """
-        today = datetime.now().date().isoformat()
-        return [
-            e
-            for e in self.get_recent(user_id, limit=200)
-            if e.get("ts", "").startswith(today)
-        ]
+        today = datetime.combine(date.today(), datetime.min.time())
+        return self.get_range(user_id, today, today + timedelta(days=1))
+
+    def get_counts(self, user_id: int, day: date) -> dict[str, int]:
+        """Get entry counts by type for a single day.
+
+        Args:
+            user_id: Telegram user ID
+            day: Local date
+
+        Returns:
+            Dict with counts by entry type
+        """
+        index = self._load_index(self._get_user_dir(user_id))
+        return dict(index.get(day.isoformat(), {}).get("types", {}))
 
     def get_stats(self, user_id: int, days: int = 7) -> dict[str, int]:
         """Get usage statistics for the last N days.
 
+        Read from the index counters in O(days), without opening segments.
+
         Args:
             user_id: Telegram user ID
-            days: Number of days to analyze
+            days: Number of calendar days to analyze, including today
 
         Returns:
             Dict with counts by entry type
         """
-        from datetime import timedelta
-
-        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
-        entries = self.get_recent(user_id, limit=1000)
+        today = date.today()
+        index = self._load_index(self._get_user_dir(user_id))
 
         stats: dict[str, int] = {}
+        for offset in range(days):
+            day = (today - timedelta(days=offset)).isoformat()
+            for entry_type, count in index.get(day, {}).get("types", {}).items():
+                stats[entry_type] = stats.get(entry_type, 0) + count
+
+        return stats
+
+    def migrate_legacy(self, user_id: int) -> int:
+        """Split a legacy {user_id}.jsonl history into daily segments.
+
+        The new directory (existing segments plus the legacy entries) is
+        built next to the old one and swapped in with renames, and it
+        records the hash of the legacy file it came from. An interrupted
+        migration is rolled back or finished on the next call, so entries
+        are never appended twice. Lines whose timestamp cannot be parsed
+        are kept verbatim in unparsed.jsonl.
+
+        Args:
+            user_id: Telegram user ID
+
+        Returns:
+            Number of entries migrated
+        """
+        legacy = self._get_legacy_file(user_id)
+        user_dir = self.sessions_dir / str(user_id)
+        building = self.sessions_dir / f"{user_id}.migrating"
+        replaced = self.sessions_dir / f"{user_id}.replaced"
+
+        # Roll back a migration interrupted before the swap
+        if building.exists():
+            shutil.rmtree(building)
+        if replaced.exists() and not user_dir.exists():
+            replaced.rename(user_dir)
+        if not legacy.exists():
+            return 0
+
+        legacy_bytes = legacy.read_bytes()
+        digest = hashlib.sha256(legacy_bytes).hexdigest()
+        marker = user_dir / MIGRATED_MARKER
+        if marker.exists() and marker.read_text(encoding="utf-8") == digest:
+            # Swapped in already; only the cleanup was interrupted
+            self._finish_migration(user_id, legacy, marker, replaced)
+            return 0
+
+        by_day: dict[str, list[str]] = {}
+        unparsed: list[str] = []
+        for line in legacy_bytes.decode("utf-8", errors="replace").splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                ts = entry.get("ts", "")
+            except (json.JSONDecodeError, AttributeError):
+                ts = None
+            if not isinstance(ts, str) or _parse_ts(ts) is None:
+                unparsed.append(line + "\n")
+                continue
+            by_day.setdefault(ts[:10], []).append(
+                json.dumps(entry, ensure_ascii=False) + "\n"
+            )
+
+        # Existing segments first, then the legacy entries; the index is
+        # left out and rebuilt from the segments
+        if user_dir.exists():
+            shutil.copytree(
+                user_dir,
+                building,
+                ignore=shutil.ignore_patterns(INDEX_FILENAME, MIGRATED_MARKER),
+            )
+        else:
+            building.mkdir()
+        groups = [
+            (self._get_segment_file(building, day), lines)
+            for day, lines in by_day.items()
+        ]
+        if unparsed:
+            groups.append((building / UNPARSED_FILENAME, unparsed))
+        for path, lines in groups:
+            with path.open("a", encoding="utf-8") as f:
+                f.writelines(lines)
+            self._touch(user_id, user_dir / path.name)
+        (building / MIGRATED_MARKER).write_text(digest, encoding="utf-8")
+
+        if user_dir.exists():
+            user_dir.rename(replaced)
+        building.rename(user_dir)
+        self._finish_migration(user_id, legacy, marker, replaced)
+
+        migrated = sum(len(lines) for lines in by_day.values())
+        logger.info(
+            "Migrated %d session entries for user %s into %d segments "
+            "(%d lines without a timestamp kept in %s)",
+            migrated,
+            user_id,
+            len(by_day),
+            len(unparsed),
+            UNPARSED_FILENAME,
+        )
+        return migrated
+
+    def _finish_migration(
+        self, user_id: int, legacy: Path, marker: Path, replaced: Path
+    ) -> None:
+        """Remove what a swapped-in migration left behind and reindex."""
+        legacy.unlink(missing_ok=True)
+        self._touch(user_id, legacy)
+        marker.unlink(missing_ok=True)
+        if replaced.exists():
+            shutil.rmtree(replaced)
+        self.reindex(user_id)
+
+    def migrate_all(self) -> dict[int, int]:
+        """Migrate every legacy session file in the sessions directory.
+
+        Returns:
+            Dict of user ID to number of entries migrated
+        """
+        migrated = {}
+        for legacy in sorted(self.sessions_dir.glob("*.jsonl")):
+            if legacy.stem.lstrip("-").isdigit():
+                user_id = int(legacy.stem)
+                migrated[user_id] = self.migrate_legacy(user_id)
+        return migrated
+
+    def user_ids(self) -> list[int]:
+        """List users that have session history."""
+        self.migrate_all()
+        return sorted(
+            int(path.name)
+            for path in self.sessions_dir.iterdir()
+            if path.is_dir() and path.name.lstrip("-").isdigit()
+        )
+
+    def iter_entries(self, user_id: int) -> Iterator[dict[str, Any]]:
+        """Iterate over all of a user's entries, oldest first."""
+        user_dir = self._get_user_dir(user_id)
+        for day in sorted(self._load_index(user_dir)):
+            yield from self._read_segment(self._get_segment_file(user_dir, day))
+
+    def replace_entries(
+        self, user_id: int, entries: Iterable[dict[str, Any]]
+    ) -> int:
+        """Replace a user's whole history with the given entries.
+
+        Args:
+            user_id: Telegram user ID
+            entries: Entries in chronological order
+
+        Returns:
+            Number of entries written
+        """
+        user_dir = self._get_user_dir(user_id)
+        user_dir.mkdir(exist_ok=True)
+
+        by_day: dict[str, list[str]] = {}
         for entry in entries:
-            if entry.get("ts", "") >= cutoff:
+            by_day.setdefault(entry["ts"][:10], []).append(
+                json.dumps(entry, ensure_ascii=False) + "\n"
+            )
+
+        for path in user_dir.glob("????-??-??.jsonl"):
+            if path.stem not in by_day:
+                path.unlink()
+                self._touch(user_id, path)
+        for day, lines in by_day.items():
+            path = self._get_segment_file(user_dir, day)
+            with path.open("w", encoding="utf-8") as f:
+                f.writelines(lines)
+            self._touch(user_id, path)
+
+        self.reindex(user_id)
+        return sum(len(lines) for lines in by_day.values())
+
+    def reindex(self, user_id: int) -> dict[str, dict[str, Any]]:
+        """Rebuild a user's segment index and counters from the segment files.
+
+        Use when the counters drift from the raw JSONL (e.g. after manual edits).
+
+        Args:
+            user_id: Telegram user ID
+
+        Returns:
+            The rebuilt index
+        """
+        user_dir = self.sessions_dir / str(user_id)
+        index: dict[str, dict[str, Any]] = {}
+        for path in sorted(user_dir.glob("????-??-??.jsonl")):
+            # (parsed, as written) so first/last keep the original string
+            timestamps: list[tuple[datetime, str]] = []
+            types: dict[str, int] = {}
+            for entry in self._read_segment(path):
+                ts = _parse_ts(entry.get("ts", ""))
+                if ts is None:
+                    continue
+                timestamps.append((ts, entry["ts"]))
                 entry_type = entry.get("type", "unknown")
-                stats[entry_type] = stats.get(entry_type, 0) + 1
+                types[entry_type] = types.get(entry_type, 0) + 1
 
-        return stats
+            if timestamps:
+                index[path.stem] = {
+                    "first": min(timestamps)[1],
+                    "last": max(timestamps)[1],
+                    "count": len(timestamps),
+                    "types": types,
+                }
+
+        self._save_index(user_dir, index)
+        return index
+
+    def _load_index(self, user_dir: Path) -> dict[str, dict[str, Any]]:
+        """Load segment index, rebuilding it if missing, unreadable or outdated."""
+        index_path = user_dir / INDEX_FILENAME
+        if not user_dir.exists():
+            return {}
+        try:
+            index: dict[str, dict[str, Any]] = json.loads(
+                index_path.read_text(encoding="utf-8")
+            )
+            if all("types" in segment for segment in index.values()):
+                return index
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            logger.warning("Corrupt session index %s, rebuilding", index_path)
+        return self.reindex(int(user_dir.name))
+
+    def _save_index(self, user_dir: Path, index: dict[str, dict[str, Any]]) -> None:
+        """Atomically write segment index."""
+        index_path = user_dir / INDEX_FILENAME
+        tmp_path = index_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(index, ensure_ascii=False, sort_keys=True), encoding="utf-8"
+        )
+        os.replace(tmp_path, index_path)
+        self._touch(int(user_dir.name), index_path)
+
+    @staticmethod
+    def _read_segment(path: Path) -> Iterator[dict[str, Any]]:
+        """Iterate over entries of a JSONL file, oldest first."""
+        if not path.exists():
+            return
+
+        with path.open("r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Skip malformed lines
+
+    @staticmethod
+    def _read_segment_reversed(path: Path) -> Iterator[dict[str, Any]]:
+        """Iterate over entries of a JSONL file, newest first."""
+        if not path.exists():
+            return
+
+        for line in read_lines_reversed(path):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Skip malformed lines
@@ -0,0 +1,268 @@
+"""SQLite session backend.
+
+Same query API as the JSONL SessionStore, backed by a single WAL-mode
+database with indexes on (user_id, ts) and (user_id, type). The JSONL
+layout stays the portable format: use import_jsonl/export_jsonl (or
+``python -m d_brain.scripts.sessions import-sqlite|export-jsonl``) to move
+history between the two.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from collections.abc import Awaitable
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from d_brain.services.session import SessionStore, _as_aware, _parse_ts
+from d_brain.services.state import ensure_state_dir
+from d_brain.services.writer import ALREADY_DURABLE
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    type TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_user_ts ON entries (user_id, ts);
+CREATE INDEX IF NOT EXISTS idx_entries_user_type ON entries (user_id, type);
+"""
+
+INSERT_ENTRY = "INSERT INTO entries (user_id, ts, type, entry) VALUES (?, ?, ?, ?)"
+
+
+def _day_start(day: date) -> float:
+    """Epoch seconds of local midnight at the start of day."""
+    return datetime.combine(day, datetime.min.time()).astimezone().timestamp()
+
+
+class SQLiteSessionStore:
+    """Persistent session storage in SQLite.
+
+    ``ts`` is stored as epoch seconds for indexed range queries; ``entry``
+    holds the full entry JSON exactly as it appears in the JSONL files.
+
+    One store (and connection) is shared by all handlers. Inserts made from
+    the event loop run in a worker thread, so the commit never blocks it;
+    a lock serializes use of the connection across threads.
+    """
+
+    def __init__(self, db_path: Path | str) -> None:
+        self.db_path = Path(db_path)
+        ensure_state_dir(self.db_path.parent)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path, timeout=10.0, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def take_touched_paths(self, user_id: int) -> set[Path]:
+        """Always empty: the database is not committed to git.
+
+        The JSONL export is the portable copy.
+        """
+        return set()
+
+    def append(self, user_id: int, entry_type: str, **data: Any) -> Awaitable[None]:
+        """Append entry to user's session history.
+
+        Args:
+            user_id: Telegram user ID
+            entry_type: Type of entry (voice, text, photo, forward, command, etc.)
+            **data: Additional data to store (text, duration, msg_id, etc.)
+
+        Returns:
+            Awaitable that completes once the insert is committed (at once
+            when called outside an event loop)
+        """
+        now = datetime.now().astimezone()
+        entry = {"ts": now.isoformat(), "type": entry_type, **data}
+        row = (
+            user_id,
+            now.timestamp(),
+            entry_type,
+            json.dumps(entry, ensure_ascii=False),
+        )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._insert(row)
+            return ALREADY_DURABLE
+        return asyncio.ensure_future(asyncio.to_thread(self._insert, row))
+
+    def _insert(self, row: tuple[int, float, str, str]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(INSERT_ENTRY, row)
+
+    def _query(self, sql: str, params: tuple[Any, ...] = ()) -> list[Any]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get_recent(self, user_id: int, limit: int = 50) -> list[dict[str, Any]]:
+        """Get recent session entries.
+
+        Args:
+            user_id: Telegram user ID
+            limit: Maximum number of entries to return
+
+        Returns:
+            List of session entries, most recent last
+        """
+        rows = self._query(
+            "SELECT entry FROM entries WHERE user_id = ? "
+            "ORDER BY ts DESC, id DESC LIMIT ?",
+            (user_id, limit),
+        )
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def get_range(
+        self, user_id: int, start: datetime, end: datetime
+    ) -> list[dict[str, Any]]:
+        """Get session entries with start <= ts < end.
+
+        Args:
+            user_id: Telegram user ID
+            start: Range start (naive datetimes are treated as local time)
+            end: Range end, exclusive
+
+        Returns:
+            List of session entries, oldest first
+        """
+        rows = self._query(
+            "SELECT entry FROM entries WHERE user_id = ? AND ts >= ? AND ts < ? "
+            "ORDER BY ts, id",
+            (user_id, _as_aware(start).timestamp(), _as_aware(end).timestamp()),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def get_today(self, user_id: int) -> list[dict[str, Any]]:
+        """Get today's session entries.
+
+        Args:
+            user_id: Telegram user ID
+
+        Returns:
+            List of today's entries
+        """
+        today = datetime.combine(date.today(), datetime.min.time())
+        return self.get_range(user_id, today, today + timedelta(days=1))
+
+    def get_counts(self, user_id: int, day: date) -> dict[str, int]:
+        """Get entry counts by type for a single day.
+
+        Args:
+            user_id: Telegram user ID
+            day: Local date
+
+        Returns:
+            Dict with counts by entry type
+        """
+        return self._count_types(
+            user_id, _day_start(day), _day_start(day + timedelta(days=1))
+        )
+
+    def get_stats(self, user_id: int, days: int = 7) -> dict[str, int]:
+        """Get usage statistics for the last N days.
+
+        Args:
+            user_id: Telegram user ID
+            days: Number of calendar days to analyze, including today
+
+        Returns:
+            Dict with counts by entry type
+        """
+        today = date.today()
+        return self._count_types(
+            user_id,
+            _day_start(today - timedelta(days=days - 1)),
+            _day_start(today + timedelta(days=1)),
+        )
+
+    def _count_types(self, user_id: int, start: float, end: float) -> dict[str, int]:
+        rows = self._query(
+            "SELECT type, COUNT(*) FROM entries "
+            "WHERE user_id = ? AND ts >= ? AND ts < ? GROUP BY type",
+            (user_id, start, end),
+        )
+        return dict(rows)
+
+    def import_jsonl(self, store: SessionStore) -> dict[int, int]:
+        """Replace database contents with the history of a JSONL store.
+
+        Args:
+            store: Source JSONL session store
+
+        Returns:
+            Dict of user ID to number of entries imported
+        """
+        imported = {}
+        with self._lock, self._conn:
+            for user_id in store.user_ids():
+                self._conn.execute(
+                    "DELETE FROM entries WHERE user_id = ?", (user_id,)
+                )
+                rows = []
+                for entry in store.iter_entries(user_id):
+                    ts = _parse_ts(entry.get("ts", ""))
+                    if ts is None:
+                        continue
+                    rows.append(
+                        (
+                            user_id,
+                            ts.timestamp(),
+                            entry.get("type", "unknown"),
+                            json.dumps(entry, ensure_ascii=False),
+                        )
+                    )
+                self._conn.executemany(INSERT_ENTRY, rows)
+                imported[user_id] = len(rows)
+                logger.info(
+                    "Imported %d session entries for user %s", len(rows), user_id
+                )
+        return imported
+
+    def export_jsonl(self, store: SessionStore) -> dict[int, int]:
+        """Write every user's history from the database to a JSONL store.
+
+        Existing JSONL history of exported users is replaced.
+
+        Args:
+            store: Destination JSONL session store
+
+        Returns:
+            Dict of user ID to number of entries exported
+        """
+        exported = {}
+        user_ids = [
+            row[0]
+            for row in self._query(
+                "SELECT DISTINCT user_id FROM entries ORDER BY user_id"
+            )
+        ]
+        for user_id in user_ids:
+            rows = self._query(
+                "SELECT entry FROM entries WHERE user_id = ? ORDER BY ts, id",
+                (user_id,),
+            )
+            exported[user_id] = store.replace_entries(
+                user_id, (json.loads(row[0]) for row in rows)
+            )
+            logger.info(
+                "Exported %d session entries for user %s", exported[user_id], user_id
+            )
+        return exported
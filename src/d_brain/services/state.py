@@ -0,0 +1,24 @@
+"""Hidden per-vault state directory for caches and databases.
+
+Everything under vault/.state is machine-local (SQLite databases, caches)
+and is kept out of git by a .gitignore written into the directory itself,
+so it works whether the vault is its own repository or a subdirectory.
+"""
+
+from pathlib import Path
+
+
+def ensure_state_dir(path: Path) -> Path:
+    """Create the state directory (and its .gitignore) if missing.
+
+    Args:
+        path: State directory, usually Settings.state_path
+
+    Returns:
+        The same path, for chaining
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    gitignore = path / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("*\n", encoding="utf-8")
+    return path
@@ -1,16 +1,80 @@
 """Vault storage service for saving entries."""
 
+import hashlib
+import itertools
+import json
+import os
+import re
+import uuid
+from collections.abc import Awaitable, Iterator
 from datetime import date, datetime
 from pathlib import Path
+from typing import NamedTuple
+
+from d_brain.services.state import ensure_state_dir
+from d_brain.services.writer import ALREADY_DURABLE, VaultWriter
+
+# Characters that break file paths or Obsidian [[links]]
+UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|#^\[\]\x00-\x1f]')
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def _candidate_names(filename: str) -> Iterator[str]:
+    """Yield a sanitized file name, then name-1.ext, name-2.ext, ..."""
+    name = UNSAFE_FILENAME_CHARS.sub("_", Path(filename).name) or "file"
+    yield name
+
+    stem, dot, extension = name.rpartition(".")
+    if not dot:
+        stem, extension = name, ""
+    for counter in itertools.count(1):
+        yield f"{stem}-{counter}{dot}{extension}"
+
+
+class StoredAttachment(NamedTuple):
+    """Where an attachment was stored and the name it goes by."""
+
+    path: str  # Relative path for Obsidian embed
+    name: str  # Friendly file name, unique within its day
+
+    @property
+    def embed(self) -> str:
+        """Obsidian embed; shows the friendly name if the path hides it."""
+        if Path(self.path).name == self.name:
+            return f"![[{self.path}]]"
+        return f"![[{self.path}|{self.name}]]"
 
 
 class VaultStorage:
-    """Service for storing entries in Obsidian vault."""
+    """Service for storing entries in Obsidian vault.
+
+    Attachments are stored either by date (attachments/YYYY-MM-DD/name.ext)
+    or, with ``content_addressed``, once per distinct content under
+    attachments/objects/{sha[:2]}/{sha}.ext. In content-addressed mode each
+    day's directory holds only a manifest.json that maps the friendly file
+    name to the object, so identical bytes are stored and pushed once while
+    embeds keep the name the file was sent with.
+
+    Downloads are staged in vault/.state/incoming (git-ignored) and moved
+    into place with an atomic rename.
+    """
 
-    def __init__(self, vault_path: Path) -> None:
+    def __init__(
+        self,
+        vault_path: Path,
+        writer: VaultWriter | None = None,
+        content_addressed: bool = False,
+    ) -> None:
         self.vault_path = Path(vault_path)
+        self.writer = writer
+        self.content_addressed = content_addressed
         self.daily_path = self.vault_path / "daily"
         self.attachments_path = self.vault_path / "attachments"
+        self.objects_path = self.attachments_path / "objects"
+        self.incoming_path = self.vault_path / ".state" / "incoming"
+        # Files written by this instance, for path-scoped git commits
+        self.touched_paths: set[Path] = set()
 
     def _ensure_dirs(self) -> None:
         """Ensure required directories exist."""
@@ -34,13 +98,17 @@ class VaultStorage:
         text: str,
         timestamp: datetime,
         msg_type: str,
-    ) -> None:
+    ) -> Awaitable[None]:
         """Append entry to daily file.
 
         Args:
             text: Content to append
             timestamp: Entry timestamp
             msg_type: Type marker like [voice], [text], [photo], [forward from: Name]
+
+        Returns:
+            Awaitable that completes once the entry is durable (immediately
+            when no writer is attached, since the write is synchronous)
         """
         self._ensure_dirs()
         file_path = self.get_daily_file(timestamp.date())
@@ -48,8 +116,13 @@ class VaultStorage:
         time_str = timestamp.strftime("%H:%M")
         entry = f"\n## {time_str} {msg_type}\n{text}\n"
 
+        self.touched_paths.add(file_path)
+        if self.writer is not None:
+            return self.writer.append(file_path, entry)
+
         with file_path.open("a", encoding="utf-8") as f:
             f.write(entry)
+        return ALREADY_DURABLE
 
     def get_attachments_dir(self, day: date) -> Path:
         """Get attachments directory for given date."""
@@ -57,6 +130,139 @@ class VaultStorage:
         dir_path.mkdir(parents=True, exist_ok=True)
         return dir_path
 
+    def reserve_attachment(self, day: date, filename: str) -> Path:
+        """Get a free path for a new attachment in attachments/YYYY-MM-DD/.
+
+        Unsafe characters are replaced and "-1", "-2", ... is added before
+        the extension when the name is already taken, so attachments
+        received in the same second never overwrite each other.
+
+        Args:
+            day: Date for organizing
+            filename: Desired file name
+
+        Returns:
+            Absolute path that does not exist yet
+        """
+        dir_path = self.get_attachments_dir(day)
+        for name in _candidate_names(filename):
+            file_path = dir_path / name
+            if not file_path.exists():
+                return file_path
+        raise AssertionError("unreachable")
+
+    def register_attachment(self, file_path: Path) -> str:
+        """Record a written attachment and return its path for Obsidian embed.
+
+        Args:
+            file_path: Attachment written inside the vault
+
+        Returns:
+            Relative path like attachments/YYYY-MM-DD/name.ext
+        """
+        self.touched_paths.add(file_path)
+        return file_path.relative_to(self.vault_path).as_posix()
+
+    def staging_path(self) -> Path:
+        """Get a temp path in the vault's state directory for a new attachment.
+
+        The state directory is git-ignored, so a half-written download is
+        never committed, and being inside the vault lets store_attachment
+        publish it with an atomic rename.
+        """
+        ensure_state_dir(self.incoming_path.parent)
+        self.incoming_path.mkdir(exist_ok=True)
+        return self.incoming_path / f"{uuid.uuid4().hex}.part"
+
+    def store_attachment(
+        self, staged: Path, day: date, filename: str, sha256: str
+    ) -> StoredAttachment:
+        """Move a fully written staged file into the attachment store.
+
+        Args:
+            staged: File from staging_path(), consumed by this call
+            day: Date for organizing
+            filename: Friendly file name
+            sha256: Hex digest of the file content
+
+        Returns:
+            Stored path and friendly name, for the Obsidian embed
+        """
+        if not self.content_addressed:
+            file_path = self.reserve_attachment(day, filename)
+            os.replace(staged, file_path)
+            return StoredAttachment(self.register_attachment(file_path), file_path.name)
+
+        extension = Path(UNSAFE_FILENAME_CHARS.sub("_", filename)).suffix.lower()
+        object_path = self.objects_path / sha256[:2] / f"{sha256}{extension}"
+        if object_path.exists():
+            staged.unlink()  # Same bytes already stored
+        else:
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(staged, object_path)
+            self.touched_paths.add(object_path)
+
+        relative_path = object_path.relative_to(self.vault_path).as_posix()
+        name = self._add_to_manifest(day, filename, sha256, relative_path)
+        return StoredAttachment(relative_path, name)
+
+    def resolve_attachment(self, day: date, filename: str) -> StoredAttachment | None:
+        """Look up a stored attachment by its friendly name.
+
+        Args:
+            day: Date the attachment was saved
+            filename: Friendly file name as returned by store_attachment
+
+        Returns:
+            Stored path and name, or None if unknown
+        """
+        if not self.content_addressed:
+            file_path = self.attachments_path / day.isoformat() / filename
+            if file_path.exists():
+                relative_path = file_path.relative_to(self.vault_path).as_posix()
+                return StoredAttachment(relative_path, filename)
+            return None
+
+        entry = self._load_manifest(day).get(filename)
+        return StoredAttachment(entry["path"], filename) if entry else None
+
+    def _load_manifest(self, day: date) -> dict[str, dict[str, str]]:
+        manifest_path = self.attachments_path / day.isoformat() / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return {}
+        manifest: dict[str, dict[str, str]] = json.loads(
+            manifest_path.read_text(encoding="utf-8")
+        )
+        return manifest
+
+    def _add_to_manifest(
+        self, day: date, filename: str, sha256: str, relative_path: str
+    ) -> str:
+        """Record friendly name -> object in the day's manifest.
+
+        Returns:
+            The name recorded: filename, or name-1.ext, ... if a different
+            file already has it that day
+        """
+        manifest = self._load_manifest(day)
+
+        for name in _candidate_names(filename):
+            if name not in manifest:
+                break
+            if manifest[name]["sha256"] == sha256:
+                return name  # Same content under the same name, nothing to record
+
+        manifest[name] = {"sha256": sha256, "path": relative_path}
+        manifest_path = self.get_attachments_dir(day) / MANIFEST_FILENAME
+        tmp_path = manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, manifest_path)
+        self.touched_paths.add(manifest_path)
+        return name
+
     def save_attachment(
         self,
         data: bytes,
@@ -74,12 +280,13 @@ class VaultStorage:
 
         Returns:
             Relative path for Obsidian embed: attachments/YYYY-MM-DD/img-HHMMSS.ext
+            (or attachments/objects/... in content-addressed mode)
         """
-        dir_path = self.get_attachments_dir(day)
-        time_str = timestamp.strftime("%H%M%S")
-        filename = f"img-{time_str}.{extension}"
-        file_path = dir_path / filename
-
-        file_path.write_bytes(data)
-
-        return f"attachments/{day.isoformat()}/{filename}"
+        staged = self.staging_path()
+        staged.write_bytes(data)
+        return self.store_attachment(
+            staged,
+            day,
+            f"img-{timestamp:%H%M%S}.{extension}",
+            hashlib.sha256(data).hexdigest(),
+        ).path
@@ -0,0 +1,97 @@
+"""Persistent cache of voice transcripts.
+
+Keyed by Telegram's file_unique_id, which stays the same when a voice
+message is forwarded or sent again, so a repeat can skip both the download
+and the transcription. The SHA-256 of the audio is stored as a second key
+for audio that reaches the bot under a different file_unique_id.
+"""
+
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+from d_brain.services.state import ensure_state_dir
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    file_unique_id TEXT PRIMARY KEY,
+    sha256 TEXT,
+    text TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transcripts_sha256 ON transcripts (sha256);
+CREATE INDEX IF NOT EXISTS idx_transcripts_last_used ON transcripts (last_used);
+"""
+
+
+class TranscriptCache:
+    """SQLite transcript cache with least-recently-used eviction.
+
+    Args:
+        db_path: Database file, usually under Settings.state_path
+        max_entries: Number of transcripts kept
+    """
+
+    def __init__(self, db_path: Path | str, max_entries: int = 2000) -> None:
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        ensure_state_dir(self.db_path.parent)
+
+        self._conn = sqlite3.connect(self.db_path, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def get(self, file_unique_id: str) -> str | None:
+        """Look up a transcript by Telegram file_unique_id."""
+        return self._lookup("file_unique_id", file_unique_id)
+
+    def get_by_hash(self, sha256: str) -> str | None:
+        """Look up a transcript by SHA-256 of the audio."""
+        return self._lookup("sha256", sha256)
+
+    def put(self, file_unique_id: str, sha256: str | None, text: str) -> None:
+        """Store a transcript, evicting the least recently used beyond the cap.
+
+        Args:
+            file_unique_id: Telegram file_unique_id of the voice message
+            sha256: SHA-256 hex digest of the audio, if known
+            text: Transcript
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts "
+                "(file_unique_id, sha256, text, last_used) VALUES (?, ?, ?, ?)",
+                (file_unique_id, sha256, text, time.time()),
+            )
+            evicted = self._conn.execute(
+                "DELETE FROM transcripts WHERE file_unique_id NOT IN ("
+                "SELECT file_unique_id FROM transcripts "
+                "ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            ).rowcount
+        if evicted:
+            logger.debug("Evicted %d cached transcripts", evicted)
+
+    def _lookup(self, column: str, key: str) -> str | None:
+        row = self._conn.execute(
+            f"SELECT file_unique_id, text FROM transcripts WHERE {column} = ? LIMIT 1",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        with self._conn:
+            self._conn.execute(
+                "UPDATE transcripts SET last_used = ? WHERE file_unique_id = ?",
+                (time.time(), row[0]),
+            )
+        text: str = row[1]
+        return text
@@ -1,23 +1,201 @@
-"""OpenAI Whisper transcription service."""
+"""Voice transcription: OpenAI Whisper API or a local CPU engine."""
 
+import asyncio
+import importlib.util
 import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Protocol
 
 import httpx
 
+from d_brain.services.audio import (
+    AudioToolError,
+    detect_silences,
+    extract_chunk,
+    ffmpeg_available,
+    merge_transcripts,
+    plan_chunks,
+    probe_duration,
+    transcode_to_opus,
+)
+
+if TYPE_CHECKING:
+    from d_brain.config import Settings
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
 
-class WhisperTranscriber:
-    """Service for transcribing audio using OpenAI Whisper."""
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class TranscriptionBackend(Protocol):
+    """Engine that turns one audio file into text."""
+
+    async def start(self) -> None:
+        """Acquire resources (connections, worker processes, models)."""
+
+    async def transcribe(self, audio: bytes | Path) -> str:
+        """Transcribe a whole audio file or its content."""
 
-    def __init__(self, api_key: str) -> None:
+    async def aclose(self) -> None:
+        """Release resources."""
+
+
+class OpenAIWhisperBackend:
+    """OpenAI Whisper API over a pooled, keep-alive HTTP client.
+
+    Consecutive requests reuse an open connection instead of paying a TCP
+    and TLS handshake each time.
+
+    Args:
+        api_key: OpenAI API key
+        base_url: API root, e.g. a proxy or a local stand-in server
+        timeout: Read/write timeout per request in seconds
+        connect_timeout: Timeout for establishing a connection in seconds
+        max_connections: Maximum number of pooled connections
+        keepalive_expiry: Seconds an idle connection is kept open
+        http2: Negotiate HTTP/2 when the h2 package is installed
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        max_connections: int = 4,
+        keepalive_expiry: float = 60.0,
+        http2: bool = True,
+    ) -> None:
         self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        # No pool timeout: the connection limit doubles as the cap on
+        # concurrent API requests, and waiting for a slot is not an error
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout, pool=None)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+            )
+            logger.debug(
+                "Created Whisper HTTP client (http2=%s, max_connections=%s)",
+                self.http2,
+                self.limits.max_connections,
+            )
+        return self._client
+
+    async def start(self) -> None:
+        """Nothing to do: the client connects on first use."""
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def transcribe(self, audio: bytes | Path) -> str:
+        """Upload audio to the transcription endpoint.
+
+        Args:
+            audio: Audio content, or a file that is streamed from disk
+
+        Returns:
+            Transcribed text
+        """
+        if isinstance(audio, Path):
+            with audio.open("rb") as f:
+                response = await self._post(f, audio.name)
+        else:
+            response = await self._post(audio, "voice.ogg")
+        response.raise_for_status()
+        text: str = response.json().get("text", "")
+        return text
+
+    async def _post(self, audio: bytes | BinaryIO, filename: str) -> httpx.Response:
+        return await self.client.post(
+            "/audio/transcriptions",
+            files={"file": (filename, audio, "audio/ogg")},
+            data={"model": "whisper-1", "language": "ru"},
+        )
+
 
-    async def transcribe(self, audio_bytes: bytes) -> str:
-        """Transcribe audio bytes to text.
+class WhisperTranscriber:
+    """Service for transcribing voice messages.
+
+    One instance is meant to live for the whole process; call start() on
+    startup and aclose() on shutdown. Speech recognition itself is done by
+    a backend: the OpenAI API or a local CPU engine.
+
+    With chunking enabled, recordings longer than ``chunk_seconds`` are
+    split at silences (ffmpeg required) and the chunks are transcribed
+    concurrently, so a long memo takes about as long as its slowest chunk.
+
+    With transcoding enabled, files of at least ``transcode_min_bytes`` are
+    first re-encoded to low-bitrate 16 kHz mono Opus (ffmpeg required);
+    the smaller file feeds both the upload and the chunker.
+
+    Args:
+        backend: Transcription engine
+        chunk_seconds: Split longer audio into chunks of at most this length;
+            0 disables chunking
+        chunk_overlap: Overlap in seconds after a cut that found no silence
+        chunk_concurrency: Maximum chunks transcribed at once
+        transcode_min_bytes: Transcode files at least this large; 0 disables
+        transcode_bitrate: Opus bitrate for transcoding, e.g. "16k"
+    """
+
+    def __init__(
+        self,
+        backend: TranscriptionBackend,
+        chunk_seconds: float = 0.0,
+        chunk_overlap: float = 1.0,
+        chunk_concurrency: int = 4,
+        transcode_min_bytes: int = 0,
+        transcode_bitrate: str = "16k",
+    ) -> None:
+        self.backend = backend
+        self.chunk_seconds = chunk_seconds
+        self.chunk_overlap = chunk_overlap
+        self.chunk_concurrency = chunk_concurrency
+        self.transcode_min_bytes = transcode_min_bytes
+        self.transcode_bitrate = transcode_bitrate
+
+        # ffmpeg runs as a subprocess; bound how many encode at once
+        self._transcode_slots = asyncio.Semaphore(os.cpu_count() or 1)
+        self.transcode_stats = {"files": 0, "bytes_in": 0, "bytes_out": 0}
+
+    async def start(self) -> None:
+        """Start the backend."""
+        await self.backend.start()
+
+    async def aclose(self) -> None:
+        """Shut the backend down."""
+        await self.backend.aclose()
+
+    async def transcribe(self, audio: bytes | Path) -> str:
+        """Transcribe audio to text.
 
         Args:
-            audio_bytes: Audio file content
+            audio: Audio file content, or path to an audio file (streamed
+                from disk instead of being loaded into memory)
 
         Returns:
             Transcribed text
@@ -25,17 +203,145 @@ class WhisperTranscriber:
         Raises:
             Exception: If transcription fails
         """
-        logger.info("Starting transcription, audio size: %d bytes", len(audio_bytes))
-
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/audio/transcriptions",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                files={"file": ("voice.ogg", audio_bytes, "audio/ogg")},
-                data={"model": "whisper-1", "language": "ru"},
-            )
-            response.raise_for_status()
-            transcript = response.json().get("text", "")
+        if isinstance(audio, Path):
+            size = audio.stat().st_size
+            logger.info("Starting transcription, audio size: %d bytes", size)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                audio = await self._maybe_transcode(audio, size, Path(tmp_dir))
+                duration = await self._chunkable_duration(audio)
+                if duration is not None:
+                    transcript = await self._transcribe_chunked(audio, duration)
+                else:
+                    transcript = await self.backend.transcribe(audio)
+        else:
+            logger.info("Starting transcription, audio size: %d bytes", len(audio))
+            transcript = await self.backend.transcribe(audio)
 
         logger.info("Transcription complete: %d chars", len(transcript))
         return transcript
+
+    async def _maybe_transcode(self, path: Path, size: int, tmp_dir: Path) -> Path:
+        """Transcoded copy of the audio if it is worth it, else the original."""
+        if not self.transcode_min_bytes or size < self.transcode_min_bytes:
+            return path
+        if not ffmpeg_available():
+            return path
+
+        destination = tmp_dir / "transcoded.ogg"
+        try:
+            async with self._transcode_slots:
+                await transcode_to_opus(path, destination, self.transcode_bitrate)
+        except AudioToolError as e:
+            logger.warning("Transcoding failed, using original audio: %s", e)
+            return path
+
+        transcoded_size = destination.stat().st_size
+        if transcoded_size >= size:
+            logger.info("Transcoding did not shrink audio (%d bytes)", size)
+            return path
+
+        self.transcode_stats["files"] += 1
+        self.transcode_stats["bytes_in"] += size
+        self.transcode_stats["bytes_out"] += transcoded_size
+        logger.info(
+            "Transcoded audio %d -> %d bytes (saved %d, %.0f%%)",
+            size,
+            transcoded_size,
+            size - transcoded_size,
+            100 * (size - transcoded_size) / size,
+        )
+        return destination
+
+    async def _chunkable_duration(self, path: Path) -> float | None:
+        """Duration of audio that should be chunked, or None for one pass."""
+        if not self.chunk_seconds or not ffmpeg_available():
+            return None
+        try:
+            duration = await probe_duration(path)
+        except (AudioToolError, ValueError) as e:
+            logger.warning("Could not probe %s, transcribing whole: %s", path, e)
+            return None
+        return duration if duration > self.chunk_seconds else None
+
+    async def _transcribe_chunked(self, path: Path, duration: float) -> str:
+        silences = await detect_silences(path)
+        chunks = plan_chunks(
+            duration, silences, self.chunk_seconds, self.chunk_overlap
+        )
+        logger.info(
+            "Transcribing %.0f s of audio in %d chunks (%d silences found)",
+            duration,
+            len(chunks),
+            len(silences),
+        )
+
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+
+        async def transcribe_chunk(chunk_path: Path, start: float, end: float) -> str:
+            async with semaphore:
+                await extract_chunk(path, start, end, chunk_path)
+                text = await self.backend.transcribe(chunk_path)
+                chunk_path.unlink()
+                logger.debug("Chunk %.1f-%.1f s: %d chars", start, end, len(text))
+                return text
+
+        # A failed chunk cancels the others, and all of them have finished
+        # before the temporary directory is removed
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            try:
+                async with asyncio.TaskGroup() as group:
+                    tasks = [
+                        group.create_task(
+                            transcribe_chunk(
+                                Path(tmp_dir) / f"chunk-{i:03d}{path.suffix}",
+                                start,
+                                end,
+                            )
+                        )
+                        for i, (start, end) in enumerate(chunks)
+                    ]
+            except ExceptionGroup as e:
+                # Report the first failure like a single-pass transcription
+                raise e.exceptions[0] from e
+        parts = [task.result() for task in tasks]
+
+        # Only seams of hard cuts overlap and need de-duplication
+        overlapping = [False] + [
+            start < prev_end
+            for (_, prev_end), (start, _) in zip(chunks, chunks[1:], strict=False)
+        ]
+        return merge_transcripts(parts, overlapping)
+
+
+def create_transcriber(settings: "Settings") -> WhisperTranscriber:
+    """Create a transcriber with the backend selected in settings."""
+    backend: TranscriptionBackend
+    if settings.transcription_backend == "local":
+        # Optional dependency: only imported when selected
+        from d_brain.services.local_whisper import LocalWhisperBackend
+
+        backend = LocalWhisperBackend(
+            settings.local_whisper_model,
+            workers=settings.local_whisper_workers,
+            cpu_threads=settings.local_whisper_cpu_threads,
+            compute_type=settings.local_whisper_compute_type,
+        )
+    else:
+        backend = OpenAIWhisperBackend(
+            settings.openai_api_key,
+            base_url=settings.whisper_base_url,
+            timeout=settings.whisper_timeout_seconds,
+            connect_timeout=settings.whisper_connect_timeout_seconds,
+            max_connections=settings.whisper_max_connections,
+            keepalive_expiry=settings.whisper_keepalive_seconds,
+            http2=settings.whisper_http2,
+        )
+
+    return WhisperTranscriber(
+        backend,
+        chunk_seconds=settings.whisper_chunk_seconds,
+        chunk_overlap=settings.whisper_chunk_overlap_seconds,
+        chunk_concurrency=settings.whisper_chunk_concurrency,
+        transcode_min_bytes=settings.whisper_transcode_min_bytes,
+        transcode_bitrate=settings.whisper_transcode_bitrate,
+    )
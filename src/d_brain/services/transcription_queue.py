@@ -0,0 +1,225 @@
+"""Process-wide transcription scheduler.
+
+All voice transcriptions go through one bounded pool of workers instead of
+calling the backend straight from each handler. Waiting jobs are grouped
+per user and served round-robin, so one person sending a stack of long
+memos does not starve everyone else, and /do requests (someone is waiting
+for an answer) are served before passive capture.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+from enum import IntEnum
+from pathlib import Path
+from typing import Any
+
+from d_brain.services.transcription import WhisperTranscriber
+
+logger = logging.getLogger(__name__)
+
+PositionCallback = Callable[[int], Awaitable[None]]
+
+
+class Priority(IntEnum):
+    """Job priority; lower values are served first."""
+
+    INTERACTIVE = 0  # /do: the user waits for a reply
+    CAPTURE = 1  # plain voice notes
+
+
+@dataclass
+class _Job:
+    user_id: int
+    audio: Path
+    priority: Priority
+    future: "asyncio.Future[str]"
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class TranscriptionScheduler:
+    """Bounded worker pool with per-user fair queues and two priorities.
+
+    Args:
+        transcriber: Shared transcriber doing the actual work
+        workers: Number of transcriptions running at once
+    """
+
+    def __init__(self, transcriber: WhisperTranscriber, workers: int = 2) -> None:
+        self.transcriber = transcriber
+        self.workers = workers
+
+        # priority -> user_id -> that user's waiting jobs, users in serving order
+        self._queues: dict[Priority, OrderedDict[int, deque[_Job]]] = {
+            priority: OrderedDict() for priority in Priority
+        }
+        self._pending = asyncio.Semaphore(0)
+        # Replaced on every queue change; waiters use it to refresh positions
+        self._moved = asyncio.Event()
+        self._tasks: list[asyncio.Task[None]] = []
+
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def start(self) -> None:
+        """Start the worker tasks."""
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"transcription-{i}")
+                for i in range(self.workers)
+            ]
+
+    async def stop(self) -> None:
+        """Stop the workers; waiting jobs fail with CancelledError."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        for job in self._iter_dispatch_order():
+            job.future.cancel()
+        for queues in self._queues.values():
+            queues.clear()
+
+    async def transcribe(
+        self,
+        user_id: int,
+        audio: Path,
+        priority: Priority = Priority.CAPTURE,
+        on_position: PositionCallback | None = None,
+    ) -> str:
+        """Queue audio for transcription and wait for the transcript.
+
+        Args:
+            user_id: Telegram user ID, for fair sharing between users
+            audio: Audio file; must exist until this call returns
+            priority: Job priority
+            on_position: Called with the number of jobs ahead whenever it
+                changes while the job waits (not called if it starts at once)
+
+        Returns:
+            Transcribed text
+        """
+        job = _Job(
+            user_id,
+            audio,
+            priority,
+            asyncio.get_running_loop().create_future(),
+        )
+        self._queues[priority].setdefault(user_id, deque()).append(job)
+        self._pending.release()
+        self._notify_moved()
+
+        try:
+            last_position = None
+            while not job.future.done():
+                moved = self._moved
+                position = self._position(job)
+                if position is not None and position != last_position:
+                    last_position = position
+                    if on_position is not None and (position > 0 or self._busy):
+                        await on_position(position)
+
+                waiter = asyncio.ensure_future(moved.wait())
+                watched: set[asyncio.Future[Any]] = {waiter, job.future}
+                try:
+                    await asyncio.wait(watched, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    waiter.cancel()
+        except asyncio.CancelledError:
+            # Still queued jobs are skipped by the workers
+            job.future.cancel()
+            raise
+
+        return await job.future
+
+    def metrics(self) -> dict[str, float]:
+        """Queue depth and wait-time metrics."""
+        waited = self._completed + self._failed
+        return {
+            "queued": sum(1 for _ in self._iter_dispatch_order()),
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "wait_avg_seconds": self._wait_total / waited if waited else 0.0,
+            "wait_max_seconds": self._wait_max,
+        }
+
+    @property
+    def _busy(self) -> bool:
+        return self._running >= self.workers
+
+    def _iter_dispatch_order(self) -> Iterator[_Job]:
+        """Waiting jobs in the order workers will take them."""
+        for priority in Priority:
+            lanes = [list(jobs) for jobs in self._queues[priority].values()]
+            for round_index in range(max(map(len, lanes), default=0)):
+                for lane in lanes:
+                    if round_index < len(lane):
+                        yield lane[round_index]
+
+    def _position(self, job: _Job) -> int | None:
+        """Number of waiting jobs ahead of job, or None if it is not waiting."""
+        for position, waiting in enumerate(self._iter_dispatch_order()):
+            if waiting is job:
+                return position
+        return None
+
+    def _notify_moved(self) -> None:
+        self._moved.set()
+        self._moved = asyncio.Event()
+
+    def _take_next(self) -> _Job:
+        for priority in Priority:
+            queues = self._queues[priority]
+            if not queues:
+                continue
+            user_id, jobs = next(iter(queues.items()))
+            job = jobs.popleft()
+            # Round-robin: the user goes to the back of the line
+            del queues[user_id]
+            if jobs:
+                queues[user_id] = jobs
+            return job
+        raise RuntimeError("Transcription queue is empty")
+
+    async def _worker(self) -> None:
+        while True:
+            await self._pending.acquire()
+            job = self._take_next()
+            self._notify_moved()
+
+            if job.future.done():  # caller went away
+                continue
+
+            waited = time.monotonic() - job.enqueued
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            logger.info(
+                "Transcription for user %s started after %.1f s in queue",
+                job.user_id,
+                waited,
+            )
+
+            self._running += 1
+            try:
+                transcript = await self.transcriber.transcribe(job.audio)
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as e:
+                self._failed += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                self._completed += 1
+                if not job.future.done():
+                    job.future.set_result(transcript)
+            finally:
+                self._running -= 1
@@ -0,0 +1,197 @@
+"""Batched, group-committed writer for vault files.
+
+All appends to daily notes and session segments go through one async
+writer task per vault. Entries that arrive within a short window are
+written as one batch through file handles kept open between batches, then
+flushed (and optionally fsynced) once per batch. Callers get a future that
+resolves when their entry is durable at the configured level.
+
+Other processes replace vault files while the bot runs (git pull, the
+Claude CLI editing daily notes), so a kept handle is reopened when its
+path no longer points at the file it has open.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Generator
+from pathlib import Path
+from typing import IO, Literal
+
+logger = logging.getLogger(__name__)
+
+Durability = Literal["flush", "fsync"]
+_Item = tuple[Path, str, "asyncio.Future[None]"]
+
+
+class _AlreadyDurable:
+    """Awaitable returned by synchronous writes, which are durable on return."""
+
+    def __await__(self) -> Generator[None, None, None]:
+        yield from ()
+
+
+ALREADY_DURABLE: Awaitable[None] = _AlreadyDurable()
+
+
+class VaultWriter:
+    """Single writer task that group-commits appends to vault files.
+
+    Args:
+        batch_window: Seconds to wait for more entries after the first one
+        durability: "flush" hands data to the OS; "fsync" also forces it to disk
+        max_open_files: Number of append handles kept open between batches
+    """
+
+    def __init__(
+        self,
+        batch_window: float = 0.005,
+        durability: Durability = "flush",
+        max_open_files: int = 32,
+    ) -> None:
+        self.batch_window = batch_window
+        self.durability = durability
+        self.max_open_files = max_open_files
+
+        # None is the shutdown sentinel
+        self._queue: asyncio.Queue[_Item | None] = asyncio.Queue()
+        self._handles: OrderedDict[Path, IO[str]] = OrderedDict()
+        self._task: asyncio.Task[None] | None = None
+
+    def append(self, path: Path, data: str) -> asyncio.Future[None]:
+        """Queue text to be appended to a file.
+
+        Args:
+            path: Target file (parent directory must exist)
+            data: Text to append
+
+        Returns:
+            Future that resolves once the data is durable
+        """
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((Path(path), data, future))
+        return future
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="vault-writer")
+
+    async def stop(self) -> None:
+        """Write everything still queued, then close all file handles."""
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+
+            # Group everything that arrives within the batch window
+            deadline = time.monotonic() + self.batch_window
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.exception("Vault write batch failed")
+                for _, _, future in batch:
+                    _resolve(future, e)
+
+    def _write_batch(self, batch: list[_Item]) -> None:
+        """Write a batch in queue order, then flush each touched file once."""
+        errors: dict[Path, OSError] = {}
+        touched: list[Path] = []
+        for path, data, _ in batch:
+            if path in errors:
+                continue
+            try:
+                # Check a kept handle once per batch, before its first write
+                self._get_handle(path, check=path not in touched).write(data)
+                if path not in touched:
+                    touched.append(path)
+            except OSError as e:
+                errors[path] = e
+
+        for path in touched:
+            try:
+                handle = self._handles[path]
+                handle.flush()
+                if self.durability == "fsync":
+                    os.fsync(handle.fileno())
+            except OSError as e:
+                errors[path] = e
+
+        for path, error in errors.items():
+            logger.error("Failed to write %s: %s", path, error)
+            if path in self._handles:
+                with contextlib.suppress(OSError):
+                    self._handles.pop(path).close()
+
+        self._close_idle_handles()
+
+        for path, _, future in batch:
+            future.get_loop().call_soon_threadsafe(_resolve, future, errors.get(path))
+
+        logger.debug("Wrote batch of %d entries to %d files", len(batch), len(touched))
+
+    def _get_handle(self, path: Path, check: bool = True) -> IO[str]:
+        handle = self._handles.get(path)
+        if handle is not None and check and _is_replaced(path, handle):
+            logger.info("%s was replaced or removed, reopening it", path)
+            del self._handles[path]
+            with contextlib.suppress(OSError):
+                handle.close()
+            handle = None
+        if handle is not None:
+            self._handles.move_to_end(path)
+            return handle
+
+        handle = path.open("a", encoding="utf-8")
+        self._handles[path] = handle
+        return handle
+
+    def _close_idle_handles(self) -> None:
+        """Close least recently used handles beyond max_open_files."""
+        while len(self._handles) > self.max_open_files:
+            _, oldest = self._handles.popitem(last=False)
+            oldest.close()
+
+
+def _is_replaced(path: Path, handle: IO[str]) -> bool:
+    """Whether path now names a different file than the open handle."""
+    try:
+        current = path.stat()
+    except FileNotFoundError:
+        return True
+    opened = os.fstat(handle.fileno())
+    return (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino)
+
+
+def _resolve(future: asyncio.Future[None], error: BaseException | None) -> None:
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
@@ -0,0 +1,68 @@
+"""Tests for chunk planning and transcript merging."""
+
+import pytest
+
+from d_brain.services.audio import merge_transcripts, plan_chunks
+
+
+def test_short_audio_is_one_chunk() -> None:
+    assert plan_chunks(50.0, [(10.0, 12.0)], max_chunk=60.0) == [(0.0, 50.0)]
+
+
+def test_cuts_in_the_middle_of_the_last_fitting_silence() -> None:
+    silences = [(20.0, 22.0), (50.0, 54.0), (100.0, 102.0)]
+
+    chunks = plan_chunks(130.0, silences, max_chunk=60.0)
+
+    assert chunks == [(0.0, 52.0), (52.0, 101.0), (101.0, 130.0)]
+
+
+def test_ignores_silences_in_the_first_quarter() -> None:
+    # 10 s is inside the first 15 s of the chunk, so the cut is hard
+    chunks = plan_chunks(100.0, [(9.0, 11.0)], max_chunk=60.0, overlap=2.0)
+
+    assert chunks == [(0.0, 60.0), (58.0, 100.0)]
+
+
+def test_hard_cuts_overlap_and_cover_the_audio() -> None:
+    chunks = plan_chunks(200.0, [], max_chunk=60.0, overlap=1.5)
+
+    assert chunks[0] == (0.0, 60.0)
+    assert chunks[-1][1] == 200.0
+    for (_, end), (start, _) in zip(chunks, chunks[1:], strict=False):
+        assert start == pytest.approx(end - 1.5)
+    assert all(end - start <= 60.0 for start, end in chunks)
+
+
+@pytest.mark.parametrize("overlap", [60.0, 1000.0, -5.0])
+def test_out_of_range_overlap_still_moves_forward(overlap: float) -> None:
+    chunks = plan_chunks(300.0, [], max_chunk=60.0, overlap=overlap)
+
+    starts = [start for start, _ in chunks]
+    assert starts == sorted(set(starts))
+    assert chunks[-1][1] == 300.0
+    assert len(chunks) <= 300.0 / (60.0 * 3 / 4) + 1
+
+
+def test_merge_drops_words_repeated_at_overlapping_seams() -> None:
+    parts = ["Купить молоко и хлеб", "и хлеб, потом позвонить маме"]
+
+    assert merge_transcripts(parts) == "Купить молоко и хлеб потом позвонить маме"
+
+
+def test_merge_ignores_case_and_punctuation() -> None:
+    parts = ["meet at the Office.", "the office, then lunch"]
+
+    assert merge_transcripts(parts) == "meet at the Office. then lunch"
+
+
+def test_merge_keeps_silence_seams_as_they_are() -> None:
+    parts = ["one two", "two three", "three four"]
+
+    merged = merge_transcripts(parts, overlapping=[False, False, True])
+
+    assert merged == "one two two three four"
+
+
+def test_merge_skips_empty_parts() -> None:
+    assert merge_transcripts(["a b", "", "b c"]) == "a b c"
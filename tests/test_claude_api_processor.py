@@ -0,0 +1,118 @@
+"""Tests for entry classification and item creation."""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from d_brain.services.claude_api_processor import ClaudeAPIProcessor
+
+
+class FakeMessages:
+    """Answers messages.create with canned response texts, in order."""
+
+    def __init__(self, answers: list[str]) -> None:
+        self.answers = answers
+
+    def create(self, **request: Any) -> SimpleNamespace:
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=self.answers.pop(0))],
+            usage=SimpleNamespace(input_tokens=10, output_tokens=5),
+        )
+
+
+class FakeTasks:
+    def __init__(self) -> None:
+        self.created: list[dict[str, Any]] = []
+
+    def create_task(self, **kwargs: Any) -> dict[str, Any]:
+        self.created.append(kwargs)
+        return {"id": f"t{len(self.created)}"}
+
+    def create_tasks(self, tasks: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [self.create_task(**task) for task in tasks]
+
+
+class FakeKeep:
+    def __init__(self) -> None:
+        self.created: list[dict[str, Any]] = []
+
+    def create_note(self, **kwargs: Any) -> dict[str, Any]:
+        self.created.append(kwargs)
+        return {"name": f"notes/{len(self.created)}"}
+
+    def create_notes(self, notes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [self.create_note(**note) for note in notes]
+
+
+def make_processor(tmp_path: Path, answers: list[str]) -> ClaudeAPIProcessor:
+    processor = ClaudeAPIProcessor(
+        tmp_path, str(tmp_path / "missing.json"), quick_threshold=2.0, fast_model=None
+    )
+    processor._client = SimpleNamespace(messages=FakeMessages(answers))
+    processor.tasks_service = FakeTasks()
+    processor.keep_service = FakeKeep()
+    return processor
+
+
+@pytest.mark.parametrize(
+    "answer",
+    [
+        '{"title": "x"}',
+        '{"type": "meeting", "title": "x"}',
+        '{"type": "task", "title": ""}',
+        '{"type": "task", "title": 5}',
+        "no json here",
+    ],
+)
+def test_bad_answer_falls_back_to_a_note(tmp_path: Path, answer: str) -> None:
+    processor = make_processor(tmp_path, [answer])
+
+    result = processor.process_entry("купить молоко")
+
+    assert result["type"] == "note"
+    assert result["created"]
+    assert processor.keep_service.created == [
+        {"title": "купить молоко", "content": "купить молоко"}
+    ]
+
+
+def test_bad_batch_item_is_classified_again_singly(tmp_path: Path) -> None:
+    batch = [
+        {"index": 0, "type": "task", "title": "Позвонить"},
+        {"index": 1, "title": "no type"},
+    ]
+    single = {"type": "note", "title": "Идея"}
+    processor = make_processor(
+        tmp_path, [json.dumps(batch, ensure_ascii=False), json.dumps(single)]
+    )
+
+    results = processor.process_entries(["позвонить", "идея"])
+
+    assert [r["type"] for r in results] == ["task", "note"]
+    assert all(r["created"] for r in results)
+
+
+@pytest.mark.parametrize(
+    ("routing", "answer", "list_name"),
+    [
+        ("single", {"is_project": True}, "Second Brain"),
+        ("gtd", {"priority": "high", "context": "@phone"}, "Next Actions"),
+        ("gtd", {"priority": "high", "is_project": True}, "Projects"),
+        ("gtd", {}, "Next Actions"),
+    ],
+)
+def test_task_routing(
+    tmp_path: Path, routing: str, answer: dict[str, Any], list_name: str
+) -> None:
+    processor = make_processor(
+        tmp_path, [json.dumps({"type": "task", "title": "Сделать", **answer})]
+    )
+    processor.task_routing = routing
+
+    result = processor.process_entry("сделать")
+
+    assert processor.tasks_service.created[0]["list_name"] == list_name
+    assert result["status"] == f"✓ Создана задача в {list_name}"
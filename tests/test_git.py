@@ -0,0 +1,224 @@
+"""Tests for background vault commits."""
+
+import asyncio
+import subprocess
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from d_brain.services.git import CommitScheduler, VaultGit
+
+
+class FakeGit:
+    """Records the calls CommitScheduler makes instead of running git."""
+
+    def __init__(self) -> None:
+        self.commits: list[tuple[str, set[Path] | None]] = []
+        self.commit_times: list[float] = []
+        self.pushes = 0
+        self.push_results: list[bool] = []
+
+    def commit_changes(self, message: str) -> bool:
+        return self._commit(message, None)
+
+    def commit_paths(self, paths: set[Path], message: str) -> bool:
+        return self._commit(message, set(paths))
+
+    def _commit(self, message: str, paths: set[Path] | None) -> bool:
+        self.commits.append((message, paths))
+        self.commit_times.append(time.monotonic())
+        return True
+
+    def has_changes(self, paths: set[Path] | None = None) -> bool:
+        return False
+
+    def push(self) -> bool:
+        self.pushes += 1
+        return self.push_results.pop(0) if self.push_results else True
+
+
+async def wait_for(condition: Callable[[], bool], timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+async def test_changes_in_quick_succession_make_one_commit() -> None:
+    git = FakeGit()
+    scheduler = CommitScheduler(git, debounce=0.1, max_latency=5.0)
+    scheduler.start()
+    try:
+        for i in range(3):
+            scheduler.mark_dirty(f"entry {i}", [Path(f"/vault/{i}.md")])
+            await asyncio.sleep(0.02)
+        assert git.commits == []
+
+        await wait_for(lambda: git.pushes == 1)
+    finally:
+        await scheduler.stop()
+
+    message, paths = git.commits[0]
+    assert len(git.commits) == 1
+    assert message == "vault: 3 entries\n\n- entry 0\n- entry 1\n- entry 2"
+    assert paths == {Path("/vault/0.md"), Path("/vault/1.md"), Path("/vault/2.md")}
+
+
+async def test_steady_changes_are_committed_after_max_latency() -> None:
+    git = FakeGit()
+    scheduler = CommitScheduler(git, debounce=0.1, max_latency=0.3)
+    scheduler.start()
+    try:
+        started = time.monotonic()
+        # Never quiet for a whole debounce period
+        while time.monotonic() - started < 0.6:
+            scheduler.mark_dirty("entry", [Path("/vault/a.md")])
+            await asyncio.sleep(0.03)
+            if git.commits:
+                break
+    finally:
+        await scheduler.stop()
+
+    assert git.commits
+    assert 0.25 < git.commit_times[0] - started < 0.5
+
+
+async def test_change_without_paths_stages_everything() -> None:
+    git = FakeGit()
+    scheduler = CommitScheduler(git, debounce=0.05)
+    scheduler.mark_dirty("note", [Path("/vault/a.md")])
+    scheduler.mark_dirty("reindex")
+
+    assert await scheduler.flush()
+    assert git.commits == [("vault: 2 entries\n\n- note\n- reindex", None)]
+
+
+async def test_full_staging_mode_ignores_paths() -> None:
+    git = FakeGit()
+    scheduler = CommitScheduler(git, scoped_staging=False)
+    scheduler.mark_dirty("note", [Path("/vault/a.md")])
+
+    assert await scheduler.flush()
+    assert git.commits == [("vault: note", None)]
+
+
+async def test_failed_push_is_retried_with_backoff() -> None:
+    git = FakeGit()
+    git.push_results = [False, False, True]
+    scheduler = CommitScheduler(git, debounce=0.01, push_backoff=0.01)
+    scheduler.start()
+    try:
+        scheduler.mark_dirty("note", [Path("/vault/a.md")])
+        await wait_for(lambda: git.pushes == 3)
+    finally:
+        await scheduler.stop()
+
+    assert len(git.commits) == 1
+
+
+async def test_stop_commits_and_pushes_pending_changes() -> None:
+    git = FakeGit()
+    scheduler = CommitScheduler(git, debounce=60.0)
+    scheduler.start()
+    scheduler.mark_dirty("note", [Path("/vault/a.md")])
+
+    await scheduler.stop()
+
+    assert git.commits == [("vault: note", {Path("/vault/a.md")})]
+    assert git.pushes == 1
+
+
+class FailingGit(FakeGit):
+    """Fails the first commit, leaving the changes uncommitted."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.failures = 1
+
+    def _commit(self, message: str, paths: set[Path] | None) -> bool:
+        if self.failures:
+            self.failures -= 1
+            raise OSError("index.lock exists")
+        return super()._commit(message, paths)
+
+    def has_changes(self, paths: set[Path] | None = None) -> bool:
+        return True
+
+
+async def test_failed_commit_is_retried_with_the_same_changes() -> None:
+    git = FailingGit()
+    scheduler = CommitScheduler(git, debounce=0.05)
+    scheduler.mark_dirty("first", [Path("/vault/a.md")])
+
+    assert not await scheduler.flush()
+    scheduler.mark_dirty("second", [Path("/vault/b.md")])
+    scheduler.start()
+    try:
+        await wait_for(lambda: bool(git.commits))
+    finally:
+        await scheduler.stop()
+
+    assert git.commits == [
+        (
+            "vault: 2 entries\n\n- first\n- second",
+            {Path("/vault/a.md"), Path("/vault/b.md")},
+        )
+    ]
+
+
+def git(vault: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=vault, capture_output=True, text=True, check=True
+    ).stdout
+
+
+@pytest.fixture
+def vault(tmp_path: Path) -> Path:
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    git(vault, "init", "-q")
+    git(vault, "config", "user.email", "bot@example.com")
+    git(vault, "config", "user.name", "bot")
+    (vault / "keep.md").write_text("keep")
+    git(vault, "add", "-A")
+    git(vault, "commit", "-qm", "init")
+    return vault
+
+
+def committed(vault: Path) -> list[str]:
+    return git(vault, "show", "--name-only", "--format=", "HEAD").split()
+
+
+def test_commit_paths_matches_names_literally(vault: Path) -> None:
+    (vault / "a*b.md").write_text("star")
+    (vault / "axb.md").write_text("not staged")
+
+    assert VaultGit(vault).commit_paths([vault / "a*b.md"], "vault: star")
+
+    assert committed(vault) == ["a*b.md"]
+    assert "?? axb.md" in git(vault, "status", "--porcelain")
+
+
+def test_commit_paths_skips_paths_outside_the_vault(
+    vault: Path, tmp_path: Path
+) -> None:
+    outside = tmp_path / "outside.md"
+    outside.write_text("elsewhere")
+    (vault / "inbox.md").write_text("note")
+    vault_git = VaultGit(vault)
+
+    assert not vault_git.commit_paths([outside], "vault: nothing")
+    assert not vault_git.has_changes([outside])
+    assert vault_git.commit_paths([outside, vault / "inbox.md"], "vault: note")
+    assert committed(vault) == ["inbox.md"]
+
+
+def test_commit_paths_records_deletions(vault: Path) -> None:
+    (vault / "keep.md").unlink()
+
+    assert VaultGit(vault).commit_paths([vault / "keep.md"], "vault: delete")
+
+    assert committed(vault) == ["keep.md"]
+    assert git(vault, "status", "--porcelain") == ""
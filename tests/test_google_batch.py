@@ -0,0 +1,207 @@
+"""Tests for batched Google Tasks and Keep creates."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from googleapiclient import discovery
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpMockSequence
+
+from d_brain.services.google_clients import GoogleClientRegistry
+from d_brain.services.google_keep import GoogleKeepService
+from d_brain.services.google_tasks import GoogleTasksService
+
+JSON = {"status": "200", "content-type": "application/json"}
+
+
+def batch_response(parts: dict[int, tuple[int, dict[str, Any]]]) -> tuple:
+    """A multipart batch reply: request ID -> (HTTP status, JSON body)."""
+    chunks = []
+    for request_id, (status, body) in parts.items():
+        chunks.append(
+            "--bb\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <response-x + {request_id}>\r\n\r\n"
+            f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+            "Content-Type: application/json\r\n\r\n"
+            f"{json.dumps(body)}\r\n"
+        )
+    headers = {"status": "200", "content-type": "multipart/mixed; boundary=bb"}
+    return headers, "".join(chunks) + "--bb--"
+
+
+def tasklists(ids: dict[str, str]) -> tuple:
+    """A tasklists.list reply: title -> tasklist ID."""
+    items = [{"title": title, "id": id_} for title, id_ in ids.items()]
+    return JSON, json.dumps({"items": items})
+
+
+@pytest.fixture
+def registry(tmp_path: Path) -> GoogleClientRegistry:
+    return GoogleClientRegistry(tmp_path / "missing.json")
+
+
+def install(
+    registry: GoogleClientRegistry, api: str, responses: list[tuple]
+) -> HttpMockSequence:
+    """Serve the calling thread's client for api from canned responses."""
+    http = HttpMockSequence(responses)
+    registry._local.clients = {
+        (api, "v1"): discovery.build_from_document(
+            registry._document(api, "v1"), http=http
+        )
+    }
+    return http
+
+
+def sent_lists(http: HttpMockSequence) -> list[list[str]]:
+    """Tasklist IDs of the inserts in each batch request, in order."""
+    return [
+        [part.split("/lists/")[1].split("/")[0] for part in body.split("POST ")[1:]]
+        for uri, _, body, _ in http.request_sequence
+        if uri.endswith("/batch")
+    ]
+
+
+def test_create_tasks_keeps_order_and_per_item_errors(
+    registry: GoogleClientRegistry,
+) -> None:
+    http = install(
+        registry,
+        "tasks",
+        [
+            tasklists({"Second Brain": "L1", "Next Actions": "L2"}),
+            # Parts may come back in any order
+            batch_response(
+                {
+                    2: (200, {"id": "t2"}),
+                    0: (200, {"id": "t0"}),
+                    1: (400, {"error": {"code": 400, "message": "Bad"}}),
+                }
+            ),
+        ],
+    )
+    service = GoogleTasksService("", registry=registry)
+
+    results = service.create_tasks(
+        [
+            {"title": "a"},
+            {"title": "b", "due_date": "2026-01-31"},
+            {"title": "c", "list_name": "Next Actions"},
+        ]
+    )
+
+    assert results[0] == {"id": "t0"}
+    assert isinstance(results[1], HttpError)
+    assert results[1].resp.status == 400
+    assert results[2] == {"id": "t2"}
+    assert sent_lists(http) == [["L1", "L1", "L2"]]
+
+
+def test_create_tasks_splits_batches(registry: GoogleClientRegistry) -> None:
+    http = install(
+        registry,
+        "tasks",
+        [
+            tasklists({"Second Brain": "L1"}),
+            batch_response({0: (200, {"id": "t0"}), 1: (200, {"id": "t1"})}),
+            batch_response({2: (200, {"id": "t2"})}),
+        ],
+    )
+    service = GoogleTasksService("", registry=registry)
+
+    results = service.create_tasks([{"title": t} for t in "abc"], batch_size=2)
+
+    assert results == [{"id": "t0"}, {"id": "t1"}, {"id": "t2"}]
+    assert sent_lists(http) == [["L1", "L1"], ["L1"]]
+
+
+def test_create_tasks_resolves_deleted_list_and_retries(
+    registry: GoogleClientRegistry, tmp_path: Path
+) -> None:
+    cache = tmp_path / "tasklists.json"
+    cache.write_text(json.dumps({"Second Brain": "gone", "Next Actions": "L2"}))
+    http = install(
+        registry,
+        "tasks",
+        [
+            batch_response(
+                {
+                    0: (404, {"error": {"code": 404, "message": "Not Found"}}),
+                    1: (200, {"id": "t1"}),
+                }
+            ),
+            tasklists({"Second Brain": "L1", "Next Actions": "L2"}),
+            batch_response({0: (200, {"id": "t0"})}),
+        ],
+    )
+    service = GoogleTasksService("", registry=registry, cache_path=cache)
+
+    results = service.create_tasks(
+        [{"title": "a"}, {"title": "b", "list_name": "Next Actions"}]
+    )
+
+    assert results == [{"id": "t0"}, {"id": "t1"}]
+    assert sent_lists(http) == [["gone", "L2"], ["L1"]]
+    assert json.loads(cache.read_text())["Second Brain"] == "L1"
+
+
+def test_create_tasks_fails_batch_without_all_responses(
+    registry: GoogleClientRegistry,
+) -> None:
+    install(
+        registry,
+        "tasks",
+        [
+            tasklists({"Second Brain": "L1"}),
+            batch_response({0: (200, {"id": "t0"})}),
+            batch_response({2: (200, {"id": "t2"})}),
+        ],
+    )
+    service = GoogleTasksService("", registry=registry)
+
+    results = service.create_tasks([{"title": t} for t in "abc"], batch_size=2)
+
+    # A reply missing a part fails its whole batch, not the next one
+    assert isinstance(results[0], Exception)
+    assert isinstance(results[1], Exception)
+    assert results[2] == {"id": "t2"}
+
+
+def test_create_notes_keeps_order_and_per_item_errors(
+    registry: GoogleClientRegistry,
+) -> None:
+    http = install(
+        registry,
+        "keep",
+        [
+            batch_response(
+                {
+                    1: (200, {"name": "notes/1"}),
+                    0: (403, {"error": {"code": 403, "message": "Denied"}}),
+                }
+            ),
+            batch_response({3: (200, {"name": "notes/3"})}),
+        ],
+    )
+    service = GoogleKeepService("", registry=registry)
+
+    results = service.create_notes(
+        [
+            {"title": "a", "content": "x"},
+            {"title": "b", "content": "y", "labels": ["inbox"]},
+            {"title": "c", "content": "z"},
+            {"title": "d", "content": "w"},
+        ],
+        batch_size=2,
+    )
+
+    assert isinstance(results[0], HttpError)
+    assert results[0].resp.status == 403
+    assert results[1] == {"name": "notes/1"}
+    assert isinstance(results[2], Exception)  # Its batch reply lacked it
+    assert isinstance(results[3], Exception)
+    assert len(http.request_sequence) == 2
+    assert '"labels": {"inbox": {}}' in http.request_sequence[0][2]
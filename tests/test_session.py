@@ -0,0 +1,166 @@
+"""Tests for the JSONL session store."""
+
+import json
+import shutil
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from d_brain.services.session import (
+    MIGRATED_MARKER,
+    UNPARSED_FILENAME,
+    SessionStore,
+    read_lines_reversed,
+)
+
+LEGACY = [
+    {"ts": "2026-01-01T09:00:00+03:00", "type": "text", "text": "a"},
+    {"ts": "2026-01-01T18:00:00+03:00", "type": "voice", "text": "б"},
+    {"ts": "2026-01-02T08:00:00+03:00", "type": "text", "text": "c"},
+]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 7, 8192])
+def test_read_lines_reversed(tmp_path: Path, block_size: int) -> None:
+    path = tmp_path / "lines.jsonl"
+    path.write_text("first\nsecond line\n\nfourth\n", encoding="utf-8")
+
+    lines = list(read_lines_reversed(path, block_size))
+
+    assert lines == ["", "fourth", "", "second line", "first"]
+
+
+@pytest.mark.parametrize("block_size", [1, 4, 8192])
+def test_read_lines_reversed_without_trailing_newline(
+    tmp_path: Path, block_size: int
+) -> None:
+    path = tmp_path / "lines.jsonl"
+    path.write_text("a\nbb\nccc", encoding="utf-8")
+
+    assert list(read_lines_reversed(path, block_size)) == ["ccc", "bb", "a"]
+
+
+def test_read_lines_reversed_empty_file(tmp_path: Path) -> None:
+    path = tmp_path / "lines.jsonl"
+    path.touch()
+
+    assert list(read_lines_reversed(path)) == [""]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 5])
+def test_read_lines_reversed_keeps_multibyte_characters(
+    tmp_path: Path, block_size: int
+) -> None:
+    # Blocks split the two-byte letters; lines are decoded only when whole
+    path = tmp_path / "lines.jsonl"
+    path.write_text("привет\n🙂 мир\n", encoding="utf-8")
+
+    lines = list(read_lines_reversed(path, block_size))
+
+    assert lines == ["", "🙂 мир", "привет"]
+
+
+def test_read_lines_reversed_starts_at_the_end(tmp_path: Path) -> None:
+    path = tmp_path / "lines.jsonl"
+    path.write_text("".join(f"{i}\n" for i in range(10_000)), encoding="utf-8")
+
+    lines = read_lines_reversed(path, block_size=16)
+
+    assert [next(lines) for _ in range(3)] == ["", "9999", "9998"]
+
+
+def write_legacy(store: SessionStore, user_id: int, extra: str = "") -> Path:
+    legacy = store.sessions_dir / f"{user_id}.jsonl"
+    lines = [json.dumps(entry, ensure_ascii=False) for entry in LEGACY]
+    legacy.write_text("\n".join(lines) + "\n" + extra, encoding="utf-8")
+    return legacy
+
+
+def segment(store: SessionStore, user_id: int, day: str) -> list[dict]:
+    path = store.sessions_dir / str(user_id) / f"{day}.jsonl"
+    return [json.loads(line) for line in path.read_text("utf-8").splitlines()]
+
+
+def test_migration_splits_legacy_history_by_day(tmp_path: Path) -> None:
+    store = SessionStore(tmp_path)
+    legacy = write_legacy(store, 1, extra='not json\n{"type": "text"}\n\n')
+
+    assert store.migrate_legacy(1) == 3
+
+    assert not legacy.exists()
+    assert [e["text"] for e in segment(store, 1, "2026-01-01")] == ["a", "б"]
+    assert [e["text"] for e in segment(store, 1, "2026-01-02")] == ["c"]
+    unparsed = store.sessions_dir / "1" / UNPARSED_FILENAME
+    assert unparsed.read_text("utf-8") == 'not json\n{"type": "text"}\n'
+    assert not (store.sessions_dir / "1" / MIGRATED_MARKER).exists()
+    assert store.get_counts(1, date(2026, 1, 1)) == {"text": 1, "voice": 1}
+    assert [e["text"] for e in store.get_recent(1)] == ["a", "б", "c"]
+
+
+def test_migration_merges_with_existing_segments(tmp_path: Path) -> None:
+    store = SessionStore(tmp_path)
+    user_dir = store.sessions_dir / "1"
+    user_dir.mkdir()
+    existing = {"ts": "2026-01-02T20:00:00+03:00", "type": "text", "text": "new"}
+    (user_dir / "2026-01-02.jsonl").write_text(json.dumps(existing) + "\n")
+    write_legacy(store, 1)
+
+    assert store.migrate_legacy(1) == 3
+
+    assert [e["text"] for e in segment(store, 1, "2026-01-02")] == ["new", "c"]
+    assert store.get_counts(1, date(2026, 1, 2)) == {"text": 2}
+
+
+def test_migration_runs_on_first_access(tmp_path: Path) -> None:
+    store = SessionStore(tmp_path)
+    write_legacy(store, 1)
+
+    assert len(store.get_recent(1)) == 3
+    assert store.user_ids() == [1]
+    assert store.migrate_all() == {}
+
+
+def test_migration_interrupted_after_swap_is_not_repeated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = SessionStore(tmp_path)
+    legacy = write_legacy(store, 1)
+
+    def crash(*args: object) -> None:
+        raise OSError("power cut")
+
+    with monkeypatch.context() as m:
+        m.setattr(store, "_finish_migration", crash)
+        with pytest.raises(OSError):
+            store.migrate_legacy(1)
+    assert legacy.exists()
+
+    # The next access finishes the cleanup instead of appending again
+    assert SessionStore(tmp_path).migrate_legacy(1) == 0
+    assert not legacy.exists()
+    assert len(segment(store, 1, "2026-01-01")) == 2
+    assert len(segment(store, 1, "2026-01-02")) == 1
+
+
+def test_migration_interrupted_while_building_is_rolled_back(
+    tmp_path: Path,
+) -> None:
+    store = SessionStore(tmp_path)
+    write_legacy(store, 1)
+    user_dir = store.sessions_dir / "1"
+    user_dir.mkdir()
+    existing = {"ts": "2026-01-02T20:00:00+03:00", "type": "text", "text": "new"}
+    (user_dir / "2026-01-02.jsonl").write_text(json.dumps(existing) + "\n")
+
+    # Half-built copy, and the old directory already moved aside
+    building = store.sessions_dir / "1.migrating"
+    shutil.copytree(user_dir, building)
+    (building / "2026-01-01.jsonl").write_text(json.dumps(LEGACY[0]) + "\n")
+    user_dir.rename(store.sessions_dir / "1.replaced")
+
+    assert store.migrate_legacy(1) == 3
+
+    assert [e["text"] for e in segment(store, 1, "2026-01-01")] == ["a", "б"]
+    assert [e["text"] for e in segment(store, 1, "2026-01-02")] == ["new", "c"]
+    assert sorted(p.name for p in store.sessions_dir.iterdir()) == ["1"]
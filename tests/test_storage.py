@@ -0,0 +1,73 @@
+"""Tests for the attachment store."""
+
+import hashlib
+import json
+from datetime import date
+from pathlib import Path
+
+from d_brain.services.storage import StoredAttachment, VaultStorage
+
+DAY = date(2026, 3, 1)
+
+
+def store(storage: VaultStorage, filename: str, data: bytes) -> StoredAttachment:
+    staged = storage.staging_path()
+    staged.write_bytes(data)
+    return storage.store_attachment(
+        staged, DAY, filename, hashlib.sha256(data).hexdigest()
+    )
+
+
+def test_dated_mode_keeps_both_files_with_the_same_name(tmp_path: Path) -> None:
+    storage = VaultStorage(tmp_path)
+
+    first = store(storage, "scan.pdf", b"one")
+    second = store(storage, "scan.pdf", b"two")
+
+    assert first.path == "attachments/2026-03-01/scan.pdf"
+    assert second.path == "attachments/2026-03-01/scan-1.pdf"
+    assert second.embed == "![[attachments/2026-03-01/scan-1.pdf]]"
+    assert storage.resolve_attachment(DAY, "scan-1.pdf") == second
+
+
+def test_content_mode_stores_identical_bytes_once(tmp_path: Path) -> None:
+    storage = VaultStorage(tmp_path, content_addressed=True)
+    sha = hashlib.sha256(b"photo").hexdigest()
+
+    first = store(storage, "img.JPG", b"photo")
+    again = store(storage, "forwarded.jpg", b"photo")
+
+    assert first.path == again.path == f"attachments/objects/{sha[:2]}/{sha}.jpg"
+    assert list((tmp_path / "attachments" / "objects").rglob("*.jpg")) == [
+        tmp_path / first.path
+    ]
+    assert list((tmp_path / ".state" / "incoming").iterdir()) == []
+
+
+def test_content_mode_embeds_the_friendly_name(tmp_path: Path) -> None:
+    storage = VaultStorage(tmp_path, content_addressed=True)
+
+    stored = store(storage, "Отчёт за март.pdf", b"report")
+
+    assert stored.name == "Отчёт за март.pdf"
+    assert stored.embed == f"![[{stored.path}|Отчёт за март.pdf]]"
+    assert storage.resolve_attachment(DAY, "Отчёт за март.pdf") == stored
+    assert storage.resolve_attachment(DAY, "missing.pdf") is None
+
+
+def test_manifest_maps_names_to_objects(tmp_path: Path) -> None:
+    storage = VaultStorage(tmp_path, content_addressed=True)
+
+    first = store(storage, "scan.pdf", b"one")
+    same = store(storage, "scan.pdf", b"one")
+    other = store(storage, "scan.pdf", b"two")
+
+    assert same == first
+    assert other.name == "scan-1.pdf"
+    manifest_path = tmp_path / "attachments" / "2026-03-01" / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    assert {name: entry["path"] for name, entry in manifest.items()} == {
+        "scan.pdf": first.path,
+        "scan-1.pdf": other.path,
+    }
+    assert manifest_path in storage.touched_paths
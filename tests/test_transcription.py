@@ -0,0 +1,99 @@
+"""Tests for the Whisper API backend against a local stand-in server."""
+
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from d_brain.services.transcription import OpenAIWhisperBackend
+
+
+class WhisperStandIn(BaseHTTPRequestHandler):
+    """Answers /audio/transcriptions and records which connection asked."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    requests: list[tuple[str, int, str]] = []
+
+    def do_POST(self) -> None:
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = self._read_chunked()
+        else:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.requests.append(
+            (self.path, self.client_address[1], self.headers["Authorization"])
+        )
+
+        filename = b'filename="voice.ogg"' in body and "voice.ogg" or "file"
+        payload = json.dumps({"text": f"{filename}: {len(body)} bytes"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_chunked(self) -> bytes:
+        body = b""
+        while size := int(self.rfile.readline().strip(), 16):
+            body += self.rfile.read(size)
+            self.rfile.readline()
+        self.rfile.readline()
+        return body
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def whisper_server() -> Iterator[str]:
+    WhisperStandIn.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WhisperStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+async def test_requests_reuse_one_connection(whisper_server: str) -> None:
+    backend = OpenAIWhisperBackend("sk-test", base_url=whisper_server, http2=False)
+    try:
+        texts = [await backend.transcribe(b"OggS" * 100) for _ in range(3)]
+    finally:
+        await backend.aclose()
+
+    assert all(text.startswith("voice.ogg:") for text in texts)
+    paths = {path for path, _, _ in WhisperStandIn.requests}
+    ports = {port for _, port, _ in WhisperStandIn.requests}
+    auth = {header for _, _, header in WhisperStandIn.requests}
+    assert paths == {"/v1/audio/transcriptions"}
+    assert auth == {"Bearer sk-test"}
+    assert len(WhisperStandIn.requests) == 3
+    assert len(ports) == 1  # One TCP connection for all requests
+
+
+async def test_file_is_streamed_from_disk(whisper_server: str, tmp_path: Path) -> None:
+    audio = tmp_path / "memo.ogg"
+    audio.write_bytes(b"OggS" * 1000)
+    backend = OpenAIWhisperBackend("sk-test", base_url=whisper_server, http2=False)
+    try:
+        text = await backend.transcribe(audio)
+    finally:
+        await backend.aclose()
+
+    assert text.startswith("file:")
+    assert len(WhisperStandIn.requests) == 1
+
+
+async def test_client_is_recreated_after_close(whisper_server: str) -> None:
+    backend = OpenAIWhisperBackend("sk-test", base_url=whisper_server, http2=False)
+    await backend.transcribe(b"OggS")
+    await backend.aclose()
+    await backend.transcribe(b"OggS")
+    await backend.aclose()
+
+    ports = [port for _, port, _ in WhisperStandIn.requests]
+    assert len(ports) == 2
+    assert ports[0] != ports[1]
@@ -0,0 +1,48 @@
+"""Tests for the group-committing vault writer."""
+
+import asyncio
+import os
+from pathlib import Path
+
+from d_brain.services.writer import VaultWriter
+
+
+async def test_appends_are_written_in_order(tmp_path: Path) -> None:
+    writer = VaultWriter(batch_window=0.01)
+    writer.start()
+    a, b = tmp_path / "a.md", tmp_path / "b.md"
+    await writer.append(a, "1\n")
+    await asyncio.gather(writer.append(b, "x\n"), writer.append(a, "2\n"))
+    await writer.stop()
+
+    assert a.read_text() == "1\n2\n"
+    assert b.read_text() == "x\n"
+
+
+async def test_replaced_file_is_reopened(tmp_path: Path) -> None:
+    writer = VaultWriter(batch_window=0)
+    writer.start()
+    path = tmp_path / "daily.md"
+    await writer.append(path, "before\n")
+
+    # Like git checkout or an editor saving: write a new file, rename it over
+    replacement = tmp_path / "daily.md.new"
+    replacement.write_text("edited\n")
+    os.replace(replacement, path)
+    await writer.append(path, "after\n")
+    await writer.stop()
+
+    assert path.read_text() == "edited\nafter\n"
+
+
+async def test_removed_file_is_recreated(tmp_path: Path) -> None:
+    writer = VaultWriter(batch_window=0)
+    writer.start()
+    path = tmp_path / "segment.jsonl"
+    await writer.append(path, "1\n")
+
+    path.unlink()
+    await writer.append(path, "2\n")
+    await writer.stop()
+
+    assert path.read_text() == "2\n"